@@ -0,0 +1,135 @@
+import os
+import time
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+# ==========================================
+# 1. CONFIG
+# ==========================================
+# Degradation levels, mildest first. Every level serves a cached plan when one
+# exists (pages are deterministic per hub version); on a miss it computes what
+# the level allows:
+#   full       transformer encode + semantic scoring (the normal path)
+#   cached     over the SLO, still full on a miss (counted apart, so /stats shows the pressure)
+#   lexical    no encode: BM25 rank stands in for semantic similarity
+#   shortlist  no encode, no FTS: airside picks from a precomputed per-hub table
+# A request that serves nothing ("load more" under load) is deferred, not served.
+FULL, CACHED, LEXICAL, SHORTLIST = range(4)
+LEVELS = ("full", "cached", "lexical", "shortlist")
+DEFERRED = "deferred"
+
+PLAN_SLO_MS = float(os.environ.get("LAYOVER_PLAN_SLO_MS", "800"))
+PLAN_CAPACITY = int(os.environ.get("LAYOVER_PLAN_CAPACITY", str(os.cpu_count() or 2)))
+# Predicted latency / SLO at which each level after FULL kicks in
+DEGRADE_AT = (1.0, 1.5, 2.5)
+EWMA_ALPHA = 0.2
+# A degraded replica still admits one full request as a probe when it is idle or
+# when the estimate is this old, so one slow request cannot pin the level
+PROBE_AFTER_S = float(os.environ.get("LAYOVER_PLAN_PROBE_S", "5"))
+
+# ==========================================
+# 2. ADMISSION CONTROLLER
+# ==========================================
+class AdmissionController:
+    """Picks a degradation level per planning request from the current load.
+
+    A new full request is predicted to take the recent full service time,
+    stretched by how far in-flight work plus the encoder queue exceeds
+    `capacity`. The ratio of that prediction to the SLO selects the level.
+    Only full requests refresh the estimate, so while degraded the controller
+    probes: an idle replica, or one whose estimate is stale, runs one request
+    full.
+    """
+
+    def __init__(self, slo_ms: float = PLAN_SLO_MS, capacity: int = PLAN_CAPACITY,
+                 queue_depth: Optional[Callable[[], int]] = None):
+        self.slo_s = slo_ms / 1000.0
+        self.capacity = max(1, capacity)
+        self.queue_depth = queue_depth or (lambda: 0)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._service_s: Optional[float] = None  # EWMA of full-path latency
+        self._sampled_at = time.monotonic()       # Last full sample (or start)
+        self._probing = False
+        self._probes = 0
+        self._chosen: Counter = Counter()
+        self._served: Counter = Counter()
+        self._deferred = 0
+
+    def predicted_s(self, in_flight: Optional[int] = None) -> float:
+        service = self._service_s if self._service_s is not None else self.slo_s / 4
+        busy = (self._in_flight if in_flight is None else in_flight) + 1 + self.queue_depth()
+        return service * max(1.0, busy / self.capacity)
+
+    def level(self) -> int:
+        ratio = self.predicted_s() / self.slo_s
+        return sum(ratio > t for t in DEGRADE_AT)
+
+    def _probe_due(self) -> bool:
+        if self._probing:
+            return False
+        return self._in_flight == 0 or time.monotonic() - self._sampled_at > PROBE_AFTER_S
+
+    @contextmanager
+    def admit(self) -> Iterator["Ticket"]:
+        with self._lock:
+            ticket = Ticket(self.level())
+            if ticket.level > FULL and self._probe_due():
+                ticket.level, ticket.probe = FULL, True
+                self._probing = True
+                self._probes += 1
+            self._in_flight += 1
+            self._chosen[ticket.level] += 1
+        t0 = time.perf_counter()
+        try:
+            yield ticket
+        finally:
+            elapsed = time.perf_counter() - t0
+            with self._lock:
+                self._in_flight -= 1
+                if ticket.probe:
+                    self._probing = False
+                self._record(ticket, elapsed)
+
+    def _record(self, ticket: "Ticket", elapsed: float) -> None:
+        # Caller holds the lock
+        if ticket.deferred:
+            self._deferred += 1
+            return
+        served = ticket.served if ticket.served is not None else ticket.level
+        self._served[served] += 1
+        if served == FULL:
+            prev = self._service_s
+            self._service_s = elapsed if prev is None else (1 - EWMA_ALPHA) * prev + EWMA_ALPHA * elapsed
+            self._sampled_at = time.monotonic()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "in_flight": self._in_flight,
+                "queue_depth": self.queue_depth(),
+                "service_ms": round(self._service_s * 1000, 1) if self._service_s is not None else None,
+                "predicted_ms": round(self.predicted_s() * 1000, 1),
+                "slo_ms": self.slo_s * 1000,
+                "chosen": {name: self._chosen[i] for i, name in enumerate(LEVELS)},
+                "served": {name: self._served[i] for i, name in enumerate(LEVELS)},
+                "deferred": self._deferred,
+                "probes": self._probes,
+            }
+
+class Ticket:
+    """The level a request was admitted at, and what it ended up serving."""
+
+    def __init__(self, level: int):
+        self.level = level
+        self.served: Optional[int] = None
+        self.deferred = False
+        self.probe = False  # Admitted full to refresh a degraded estimate
+
+    @property
+    def name(self) -> str:
+        if self.deferred:
+            return DEFERRED
+        return LEVELS[self.served if self.served is not None else self.level]
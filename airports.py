@@ -0,0 +1,219 @@
+import os
+import re
+import csv
+import bisect
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# ==========================================
+# 1. CONFIG & NORMALISATION
+# ==========================================
+# Resolves what a traveller types ("Dehli", "sydny", "heathrow", "LON") to an
+# airport from data/airports.csv (scripts/build_airports.py). Every airport is
+# reachable through several keys: IATA/ICAO codes, its metro code, its city
+# and its name, plus each trailing run of words ("new delhi" -> "delhi",
+# "london heathrow" -> "heathrow"). Keys are held two ways:
+#   - sorted, so a prefix is one bisect range; the top of the tree (prefixes
+#     up to PREFIX_DEPTH chars, where ranges are huge) keeps precomputed winners
+#   - a trigram inverted index, shortlisting typo candidates for edit distance
+AIRPORTS_PATH = os.path.join("data", "airports.csv")
+PREFIX_DEPTH = 3
+PREFIX_TOP = 10                 # Winners kept per shallow prefix
+FUZZY_SHORTLIST = 48            # Candidates checked with exact edit distance
+NAME_STOPWORDS = {"airport", "international", "intl", "regional", "municipal", "airfield", "aerodrome", "field"}
+
+# Key kinds, strongest first: they break ties between equally good matches
+ALIAS, CODE, METRO, CITY, NAME = range(5)
+
+def normalize(text: Any) -> str:
+    text = unicodedata.normalize("NFKD", str(text or ""))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    return " ".join(re.findall(r"[a-z0-9]+", text))
+
+def trigrams(key: str) -> List[str]:
+    padded = f"^{key}$"
+    return sorted({padded[i:i + 3] for i in range(len(padded) - 2)})
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance (a swap counts as one edit); anything above `limit` returns limit + 1.
+
+    Only the diagonal band |i - j| <= limit is filled: cells outside it already exceed the limit.
+    """
+    n, m = len(a), len(b)
+    if abs(n - m) > limit:
+        return limit + 1
+    big = limit + 1
+    prev2, prev = None, [j if j <= limit else big for j in range(m + 1)]
+    for i in range(1, n + 1):
+        cur = [big] * (m + 1)
+        if i <= limit:
+            cur[0] = i
+        lo, hi = max(1, i - limit), min(m, i + limit)
+        ai = a[i - 1]
+        for j in range(lo, hi + 1):
+            v = prev[j - 1] + (ai != b[j - 1])
+            if prev[j] + 1 < v:
+                v = prev[j] + 1
+            if cur[j - 1] + 1 < v:
+                v = cur[j - 1] + 1
+            if prev2 is not None and j > 1 and ai == b[j - 2] and a[i - 2] == b[j - 1] and prev2[j - 2] + 1 < v:
+                v = prev2[j - 2] + 1
+            cur[j] = v
+        if min(cur[lo - 1:hi + 1]) > limit:
+            return big
+        prev2, prev = prev, cur
+    return min(prev[m], big)
+
+_ALPHABET = "abcdefghijklmnopqrstuvwxyz0123456789 "
+
+def letter_counts(key: str) -> np.ndarray:
+    counts = np.zeros(len(_ALPHABET), dtype=np.int16)
+    for ch in key:
+        counts[_ALPHABET.index(ch)] += 1
+    return counts
+
+def _typo_budget(key: str) -> int:
+    return 1 if len(key) <= 5 else 2
+
+def _suffixes(text: str, drop: set = frozenset()) -> List[str]:
+    words = [w for w in normalize(text).split() if w not in drop]
+    return [" ".join(words[i:]) for i in range(len(words)) if len(" ".join(words[i:])) >= 3]
+
+# ==========================================
+# 2. RESOLVER
+# ==========================================
+class AirportResolver:
+    def __init__(self, airports: List[Dict[str, Any]], aliases: Optional[Dict[str, str]] = None):
+        # Global order: busiest tier first, then traffic rank, then code
+        self.airports = sorted(airports, key=lambda a: (-a["size"], a["traffic_rank"] or 10 ** 6, a["iata"]))
+        by_code = {a["iata"]: i for i, a in enumerate(self.airports)}
+
+        targets: Dict[str, Dict[int, int]] = {}  # key -> {airport: strongest kind}
+        def add(key: str, idx: int, kind: int):
+            if key:
+                slot = targets.setdefault(key, {})
+                slot[idx] = min(kind, slot.get(idx, kind))
+        for i, a in enumerate(self.airports):
+            add(normalize(a["iata"]), i, CODE)
+            add(normalize(a["icao"]), i, CODE)
+            add(normalize(a["metro"]), i, METRO)
+            for key in _suffixes(a["city"]):
+                add(key, i, CITY)
+            for key in _suffixes(a["name"], NAME_STOPWORDS):
+                add(key, i, NAME)
+        for alias, code in (aliases or {}).items():
+            if code.upper() in by_code:
+                add(normalize(alias), by_code[code.upper()], ALIAS)
+
+        self.keys = sorted(targets)
+        # Per key: (kind, airport) pairs, best first
+        self.targets = [sorted((kind, idx) for idx, kind in targets[k].items()) for k in self.keys]
+        self._key_id = {k: i for i, k in enumerate(self.keys)}
+
+        self._prefix_top: Dict[str, List[int]] = {}
+        for key, pairs in zip(self.keys, self.targets):
+            best = pairs[0][1]
+            for n in range(1, min(PREFIX_DEPTH, len(key)) + 1):
+                self._prefix_top.setdefault(key[:n], []).append(best)
+        for p, idxs in self._prefix_top.items():
+            self._prefix_top[p] = sorted(set(idxs))[:PREFIX_TOP]
+
+        grams: Dict[str, List[int]] = {}
+        for i, key in enumerate(self.keys):
+            for g in trigrams(key):
+                grams.setdefault(g, []).append(i)
+        self._grams = {g: np.array(ids, dtype=np.int32) for g, ids in grams.items()}
+        self._key_len = np.array([len(k) for k in self.keys], dtype=np.int32)
+        self._letters = np.stack([letter_counts(k) for k in self.keys]) if self.keys else np.zeros((0, len(_ALPHABET)), dtype=np.int16)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _describe(self, idx: int, match: str, key: str) -> Dict[str, Any]:
+        a = self.airports[idx]
+        return {"code": a["iata"], "name": a["name"], "city": a["city"], "country": a["country"],
+                "lat": a["lat"], "lon": a["lon"], "match": match, "key": key}
+
+    # ---- the three lookups, each returning airport indices (best first) ----
+    def _exact(self, q: str) -> List[int]:
+        i = self._key_id.get(q)
+        return [] if i is None else [idx for _, idx in self.targets[i]]
+
+    def _prefix(self, q: str, limit: int) -> List[int]:
+        if len(q) <= PREFIX_DEPTH:
+            return self._prefix_top.get(q, [])[:limit]
+        lo = bisect.bisect_left(self.keys, q)
+        hi = bisect.bisect_left(self.keys, q + "\uffff", lo)
+        return sorted({self.targets[i][0][1] for i in range(lo, hi)})[:limit]
+
+    def _fuzzy(self, q: str, limit: int) -> List[Tuple[int, int, str]]:
+        postings = [self._grams[g] for g in trigrams(q) if g in self._grams]
+        if not postings:
+            return []
+        ids, shared = np.unique(np.concatenate(postings), return_counts=True)
+        budget = _typo_budget(q)
+        # Cheap lower bounds before the exact distance: length gap, then the letter-bag
+        # difference (a swap like "dehli"/"delhi" shares few trigrams but no letters differ)
+        keep = np.abs(self._key_len[ids] - len(q)) <= budget
+        ids, shared = ids[keep], shared[keep]
+        diff = self._letters[ids] - letter_counts(q)
+        bag = np.maximum(np.clip(diff, 0, None).sum(axis=1), np.clip(-diff, 0, None).sum(axis=1))
+        keep = bag <= budget
+        ids, shared = ids[keep], shared[keep]
+        top = ids[np.argsort(-shared, kind="stable")[:FUZZY_SHORTLIST]]
+        hits = []
+        for i in top.tolist():
+            key = self.keys[i]
+            d = edit_distance(q, key, budget)
+            if d <= budget:
+                kind, idx = self.targets[i][0]
+                hits.append((d, kind, idx, key))
+        hits.sort()
+        seen, out = set(), []
+        for d, _, idx, key in hits:
+            if idx not in seen:
+                seen.add(idx)
+                out.append((idx, d, key))
+        return out[:limit]
+
+    def resolve(self, text: str) -> Optional[Dict[str, Any]]:
+        """Best airport for `text`: exact key, else a key it starts, else the closest key within a typo or two."""
+        q = normalize(text)
+        if not q:
+            return None
+        hits = self._exact(q)
+        if hits:
+            return self._describe(hits[0], "exact", q)
+        if len(q) >= 3:
+            hits = self._prefix(q, 1)
+            if hits:
+                return self._describe(hits[0], "prefix", q)
+        fuzzy = self._fuzzy(q, 1)
+        return self._describe(fuzzy[0][0], "fuzzy", fuzzy[0][2]) if fuzzy else None
+
+    def suggest(self, text: str, limit: int = 8) -> List[Dict[str, Any]]:
+        """Autocomplete: exact and prefix matches (busiest first), topped up with typo matches."""
+        q = normalize(text)
+        if not q:
+            return []
+        out, seen = [], set()
+        def take(hits):
+            for idx, match, key in hits:
+                if idx not in seen and len(out) < limit:
+                    seen.add(idx)
+                    out.append(self._describe(idx, match, key))
+        take((i, "exact", q) for i in self._exact(q))
+        take((i, "prefix", q) for i in self._prefix(q, limit))
+        if len(out) < limit:
+            take((i, "fuzzy", key) for i, _, key in self._fuzzy(q, limit))
+        return out
+
+def load_airports(path: str = AIRPORTS_PATH) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [
+            {**row, "size": int(row["size"] or 1), "traffic_rank": int(row["traffic_rank"]) if row["traffic_rank"] else None,
+             "lat": float(row["lat"] or 0.0), "lon": float(row["lon"] or 0.0)}
+            for row in csv.DictReader(f)
+        ]
@@ -0,0 +1,196 @@
+import math
+from typing import Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from snapshot import NUMERIC_COLUMNS
+from vectors import Vectors, as_vectors
+
+# ==========================================
+# 1. CONFIG
+# ==========================================
+# Inverted-file (IVF) index over L2-normalised embeddings, so a dot product is
+# cosine similarity. Rows are k-means clustered and stored contiguously per
+# cell (CSR, like geo.GridIndex); a query scans only the `nprobe` cells whose
+# centroids are closest. Small catalogs skip clustering and scan exactly.
+IVF_MIN_ROWS = 20_000       # Below this one exact pass is already ~1 ms
+TRAIN_PER_CELL = 32         # k-means sample size per cell
+KMEANS_ITERS = 8
+DEFAULT_NPROBE = 24
+SCAN_CHUNK = 65_536         # Rows per matmul when assigning cells (bounds temporaries)
+EXACT_LIMIT = 50_000        # A filter leaving fewer rows than this is scanned exactly
+
+HOURS_PER_WEEK = 168
+
+def open_hours_mask(cols: np.ndarray) -> np.ndarray:
+    """24-bit mask per activity: bit h set when open at hour h (same rule as logic._hour_in_window)."""
+    c = {name: cols[:, i] for i, name in enumerate(NUMERIC_COLUMNS)}
+    open_h, close_h = c["opening_hour_24"], c["closing_hour_24"]
+    mask = np.zeros(len(cols), dtype=np.uint32)
+    for h in range(24):
+        same_day = ((open_h <= h) & (h <= close_h)) | ((open_h <= h + 24) & (h + 24 <= close_h))
+        overnight = (h >= open_h) | (h <= close_h)
+        is_open = (c["is_24h"] > 0) | np.where(close_h >= open_h, same_day, overnight)
+        mask |= is_open.astype(np.uint32) << np.uint32(h)
+    return mask
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    # Positions of the k best scores, best first
+    if len(scores) > k:
+        part = np.argpartition(-scores, k - 1)[:k]
+    else:
+        part = np.arange(len(scores))
+    return part[np.argsort(-scores[part], kind="stable")]
+
+# ==========================================
+# 2. K-MEANS (SPHERICAL)
+# ==========================================
+# `x` may be a compact Vectors matrix: slicing it yields decoded float32 rows
+def _assign(x: Union[np.ndarray, Vectors], centroids: np.ndarray) -> np.ndarray:
+    out = np.empty(len(x), dtype=np.int32)
+    for s in range(0, len(x), SCAN_CHUNK):
+        out[s:s + SCAN_CHUNK] = np.argmax(x[s:s + SCAN_CHUNK] @ centroids.T, axis=1)
+    return out
+
+def train_centroids(x: Union[np.ndarray, Vectors], cells: int, iters: int = KMEANS_ITERS, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    sample = x[np.sort(rng.choice(len(x), min(len(x), cells * TRAIN_PER_CELL), replace=False))].astype(np.float32)
+    centroids = sample[rng.choice(len(sample), cells, replace=False)].copy()
+    for _ in range(iters):
+        label = _assign(sample, centroids)
+        order = np.argsort(label, kind="stable")
+        present, starts = np.unique(label[order], return_index=True)
+        sums = np.add.reduceat(sample[order], starts, axis=0)
+        # Empty cells restart on random sample points
+        fresh = sample[rng.choice(len(sample), cells, replace=False)]
+        centroids = fresh.copy()
+        centroids[present] = sums
+        centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+    return centroids
+
+# ==========================================
+# 3. INDEX
+# ==========================================
+class ActivityIndex:
+    """Global vector index over every hub's activities, filterable by hub, zone and hour.
+
+    `hub_of_row` indexes into `hub_ids`; `cols` is the snapshot.NUMERIC_COLUMNS
+    table. The index keeps its own copy of the vectors in cell order (and in
+    their storage precision, see vectors.py), so the caller may drop `embs`
+    afterwards. Results are (row, score) in the
+    caller's original row numbering.
+    """
+
+    def __init__(self, embs: Union[np.ndarray, Vectors], hub_ids: Sequence[str], hub_of_row: np.ndarray, cols: np.ndarray,
+                 cells: Optional[int] = None, seed: int = 0):
+        embs = as_vectors(embs)
+        n = len(embs)
+        if cells is None:
+            cells = int(math.sqrt(n)) if n >= IVF_MIN_ROWS else 1
+        self.hub_ids = list(hub_ids)
+        self._hub_code = {h: i for i, h in enumerate(self.hub_ids)}
+        if cells > 1:
+            self.centroids = train_centroids(embs, cells, seed=seed)
+            label = _assign(embs, self.centroids)
+        else:
+            self.centroids = np.zeros((1, embs.shape[1] if len(embs.shape) == 2 else 0), dtype=np.float32)
+            label = np.zeros(n, dtype=np.int32)
+        order = np.argsort(label, kind="stable")
+        self.ids = order.astype(np.int64)
+        self.embs = embs.take(order)
+        self.cell_start = np.searchsorted(label[order], np.arange(len(self.centroids) + 1)).astype(np.int64)
+
+        # Filter columns, in index order
+        self.hub = np.asarray(hub_of_row, dtype=np.int32)[order]
+        self.landside = np.asarray(cols[:, NUMERIC_COLUMNS.index("is_landside")] > 0)[order]
+        self.open_mask = open_hours_mask(np.asarray(cols))[order]
+        # Index positions per hub (CSR), for filters narrow enough to scan exactly
+        by_hub = np.argsort(self.hub, kind="stable")
+        self.hub_rows = by_hub.astype(np.int64)
+        self.hub_start = np.searchsorted(self.hub[by_hub], np.arange(len(self.hub_ids) + 1)).astype(np.int64)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def cells(self) -> int:
+        return len(self.centroids)
+
+    def _allowed(self, pos: np.ndarray, hubs: Optional[np.ndarray], zone: Optional[str],
+                 hour_of_week: Optional[int]) -> np.ndarray:
+        keep = np.ones(len(pos), dtype=bool)
+        if hubs is not None:
+            keep &= np.isin(self.hub[pos], hubs)
+        if zone is not None:
+            keep &= self.landside[pos] == (zone.upper() == "LANDSIDE")
+        if hour_of_week is not None:
+            # Catalog opening hours are the same every weekday: only the hour of day matters
+            bit = np.uint32(1) << np.uint32(int(hour_of_week) % HOURS_PER_WEEK % 24)
+            keep &= (self.open_mask[pos] & bit) != 0
+        return keep
+
+    def _scan(self, q: np.ndarray, pos: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        scores = self.embs.dot(q, pos)
+        best = _top_k(scores, k)
+        return self.ids[pos[best]], scores[best]
+
+    def search_exact(self, q: np.ndarray, k: int = 10, hubs: Optional[Sequence[str]] = None,
+                     zone: Optional[str] = None, hour_of_week: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Brute-force top-k over every row passing the filters (ground truth for recall)."""
+        q = np.asarray(q, dtype=np.float32)
+        codes = self._codes(hubs)
+        if codes is not None and not len(codes):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        scores = self.embs.dot(q)
+        scores[~self._allowed(np.arange(len(self)), codes, zone, hour_of_week)] = -np.inf
+        best = _top_k(scores, k)
+        best = best[np.isfinite(scores[best])]
+        return self.ids[best], scores[best]
+
+    def _codes(self, hubs: Optional[Sequence[str]]) -> Optional[np.ndarray]:
+        if hubs is None:
+            return None
+        return np.array(sorted({self._hub_code[h] for h in hubs if h in self._hub_code}), dtype=np.int32)
+
+    def search(self, q: np.ndarray, k: int = 10, hubs: Optional[Sequence[str]] = None,
+               zone: Optional[str] = None, hour_of_week: Optional[int] = None,
+               nprobe: int = DEFAULT_NPROBE) -> Tuple[np.ndarray, np.ndarray]:
+        """Approximate top-k rows by cosine similarity to `q`, best first."""
+        q = np.asarray(q, dtype=np.float32)
+        codes = self._codes(hubs)
+        if codes is not None:
+            if not len(codes):
+                return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+            size = int((self.hub_start[codes + 1] - self.hub_start[codes]).sum())
+            if size <= EXACT_LIMIT:
+                # A few hubs: their rows directly, exact and cheaper than probing
+                pos = np.concatenate([self.hub_rows[self.hub_start[c]:self.hub_start[c + 1]] for c in codes])
+                return self._scan(q, pos[self._allowed(pos, None, zone, hour_of_week)], k)
+        if self.cells == 1:
+            pos = np.arange(len(self))
+            return self._scan(q, pos[self._allowed(pos, codes, zone, hour_of_week)], k)
+
+        ranked = np.argsort(-(self.centroids @ q), kind="stable")
+        probe, done = max(1, nprobe), 0
+        pos_parts, score_parts, found = [], [], 0
+        while True:
+            # Widen the probe until the filters leave k rows (or every cell is scanned)
+            for c in ranked[done:probe]:
+                a, b = self.cell_start[c], self.cell_start[c + 1]
+                scores = self.embs.dot(q, slice(a, b))  # Contiguous slice: no gather copy
+                pos = np.arange(a, b)
+                if codes is not None or zone is not None or hour_of_week is not None:
+                    keep = self._allowed(pos, codes, zone, hour_of_week)
+                    pos, scores = pos[keep], scores[keep]
+                pos_parts.append(pos)
+                score_parts.append(scores)
+                found += len(pos)
+            done = min(probe, self.cells)
+            if found >= k or done >= self.cells:
+                break
+            probe *= 2
+        if not found:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        pos, scores = np.concatenate(pos_parts), np.concatenate(score_parts)
+        best = _top_k(scores, k)
+        return self.ids[pos[best]], scores[best]
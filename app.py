@@ -1,22 +1,43 @@
 import streamlit as st
-import pandas as pd
 import base64
+import functools
 import os
+import math
 import requests
 import time
 from urllib.parse import quote
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from streamlit_folium import st_folium
 from streamlit_lottie import st_lottie 
 
+import profiling
+
+# Opt-in profiling (LAYOVER_PROFILE=sample|cprofile): one capture per rerun
+profiling.begin_rerun("app")
+
 # Import your logic engine
 from logic import (
-    filter_and_rank_activities,
+    plan_activities,
+    apply_refinement,
     rank_hubs,          
     analyze_vibe,
     compute_plan_risk,
     check_visa_status,
-    get_real_weather
+    get_real_weather,
+    hub_version,
+    get_timetable,
+    find_layover_windows,
+    map_clusters,
+    sweep_activities,
+    SWEEP_HOURS,
+    DAYS,
+    DEFAULT_QUERY,
+    PASSPORTS,
+    HUB_COORDS,
 )
-from viz import create_timeline
+from airports import AirportResolver, load_airports
+from itinerary import plan_itinerary
+from viz import MAP_ZOOM, create_map, create_map_layer, create_sweep_heatmap, create_timeline
 
 # ────────────────────────────────────────────────
 # 1. PAGE CONFIG & ASSETS
@@ -272,6 +293,71 @@ if "ranked_hubs" not in st.session_state:
     st.session_state.ranked_hubs = []
 if "show_hub_dropdown" not in st.session_state:
     st.session_state.show_hub_dropdown = False
+if "results_sig" not in st.session_state:
+    st.session_state.results_sig = None
+    st.session_state.result_items = []
+    st.session_state.result_token = None
+    st.session_state.result_level = "full"
+if "ui_hours" not in st.session_state:
+    # Detail inputs are seeded here (not via widget defaults) so a picked connection can overwrite them
+    st.session_state.ui_hours = 6.0
+    st.session_state.ui_arrival_time = 14
+    st.session_state.ui_day = "Monday"
+
+RESULTS_PAGE_SIZE = 5
+# Shown above the results when the admission controller (logic.plan_activities) degraded them
+DEGRADED_NOTES = {
+    "lexical": "⚡ Busy right now: these picks are matched on keywords only.",
+    "shortlist": "⚡ Very busy right now: showing a quick airside shortlist.",
+    "deferred": "⚡ Busy right now: more results couldn't load, try again in a moment.",
+}
+
+# Sections are fragments (st.fragment): a widget inside one reruns only that
+# section. Streamlit without fragments gets plain functions and full reruns.
+_st_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+HAS_FRAGMENTS = _st_fragment is not None
+
+def fragment(fn):
+    if not HAS_FRAGMENTS:
+        return fn
+    if not profiling.is_enabled():
+        return _st_fragment(fn)
+
+    # A fragment-only rerun skips the top-level capture (begin_rerun above): give it its own
+    @functools.wraps(fn)
+    def profiled_fn(*args, **kwargs):
+        ctx = get_script_run_ctx()
+        if ctx is None or not ctx.fragment_ids_this_run:
+            return fn(*args, **kwargs)  # Part of a full run, already captured
+        with profiling.rerun_scope(f"fragment-{fn.__name__}"):
+            return fn(*args, **kwargs)
+    return _st_fragment(profiled_fn)
+
+def request_results_rerun():
+    # For deck inputs the results read: a fragment rerun alone would leave them stale
+    if st.session_state.show_results:
+        st.session_state.app_rerun = True
+
+def finish_fragment():
+    # Last line of a fragment: widen to a page rerun if one was requested
+    if st.session_state.pop("app_rerun", False) and HAS_FRAGMENTS:
+        st.rerun()
+
+def start_results():
+    st.session_state.show_results = True
+    st.session_state.play_loader = True
+    st.session_state.app_rerun = True
+
+def memo(name, sig, compute):
+    # Per-session memo that survives fragment reruns: recompute only when `sig` changes
+    slot = st.session_state.get(f"memo_{name}")
+    if slot is None or slot[0] != sig:
+        slot = (sig, compute())
+        st.session_state[f"memo_{name}"] = slot
+    return slot[1]
+
+def memo_put(name, sig, value):
+    st.session_state[f"memo_{name}"] = (sig, value)
 
 # EXTENDED CITY MAPPING (Global Coverage)
 CITY_TO_CODE = {
@@ -328,9 +414,17 @@ CITY_TO_CODE = {
     "calgary": "YYC", "yyc": "YYC"
 }
 
+@st.cache_resource(show_spinner=False)
+def get_airport_resolver() -> AirportResolver:
+    # Bundled airport list (data/airports.csv); the nicknames above win over it
+    return AirportResolver(load_airports(), CITY_TO_CODE)
+
+def resolve_airport(user_input):
+    return get_airport_resolver().resolve(user_input)
+
 def get_airport_code(user_input):
-    clean_input = user_input.strip().lower()
-    return CITY_TO_CODE.get(clean_input, user_input.upper())
+    match = resolve_airport(user_input)
+    return match["code"] if match else None
 
 # RELIABLE UNSPLASH IMAGES (No Hotlink Blocks)
 CITY_IMAGES = {
@@ -362,6 +456,20 @@ city_options = {
 }
 city_keys = list(city_options.keys())
 
+def apply_connection(window):
+    # Fills the detail inputs from a timetable connection; hours round *down* to the input's 0.5h steps
+    st.session_state.ui_hours = min(24.0, max(2.0, math.floor(window["layover_hours"] * 2) / 2))
+    st.session_state.ui_arrival_time = window["arrival_mins"] // 60
+    st.session_state.ui_day = DAYS[window["arrival_day"]]
+    request_results_rerun()
+
+def format_connection(w) -> str:
+    arr = f"{DAYS[w['arrival_day']][:3]} {w['arrival_mins'] // 60:02d}:{w['arrival_mins'] % 60:02d}"
+    dep = f"{w['departure_mins'] % 1440 // 60:02d}:{w['departure_mins'] % 60:02d}"
+    terminal = " + terminal change" if w["terminal_change"] else ""
+    return (f"{w['inbound']} from {w['origin']} ({arr}) → {w['outbound']} to {w['destination']} ({dep}) · "
+            f"{w['layover_hours']:g}h, needs {w['connect_mins']}m{terminal}")
+
 def render_risk_pill(level: str) -> str:
     level = (level or "").upper()
     if level == "LOW":
@@ -372,21 +480,6 @@ def render_risk_pill(level: str) -> str:
         return '<span class="risk-pill risk-high">🚨 HIGH RISK</span>'
     return '<span class="risk-pill risk-med">ℹ️ RISK UNKNOWN</span>'
 
-def apply_refinement(base_query: str, mode: str) -> str:
-    q = (base_query or "").strip()
-    mode = (mode or "DEFAULT").upper()
-    if mode == "ONLY_AIRSIDE":
-        return f"{q}. Prefer airside only, inside airport, no city trips."
-    if mode == "MORE_CHILL":
-        return f"{q}. Prefer relaxing, quiet, lounge, spa, comfy."
-    if mode == "MORE_CULTURE":
-        return f"{q}. Prefer culture, museums, heritage, landmarks, history."
-    if mode == "MAX_SIGHTS":
-        return f"{q}. Prefer sightseeing, viewpoints, iconic spots, photo locations."
-    if mode == "CHEAPER":
-        return f"{q}. Prefer cheap, free, budget friendly."
-    return q
-
 def generate_narrative(ranked_items, hours, user_vibe, visa_valid, arrival_time):
     if not ranked_items:
         return "I scanned the airport, but I couldn't find any safe matches for this specific window. It might be too tight to explore comfortably."
@@ -426,6 +519,20 @@ def generate_narrative(ranked_items, hours, user_vibe, visa_valid, arrival_time)
     {vibe_msg}
     """
 
+def load_results_page(plan_args, page_token=None):
+    # First page replaces the list, later pages (continuation token) extend it
+    page = plan_activities(*plan_args, k=RESULTS_PAGE_SIZE, page_token=page_token)
+    st.session_state.result_level = page["degradation"]
+    if page_token is None:
+        st.session_state.result_items = page["items"]
+    else:
+        st.session_state.result_items = st.session_state.result_items + page["items"]
+    st.session_state.result_token = page["next_page_token"]
+    st.session_state.results_sig = (plan_args, hub_version(plan_args[0]))
+    if "plan" in page:
+        # Materialized plan table hit: itinerary and risk come with the page
+        memo_put("plan", (st.session_state.results_sig, len(page["items"])), (page["plan"], page["risk"]))
+
 def render_safe_time_breakdown(ranked_activities, total_layover_hours):
     if not ranked_activities: return
     
@@ -491,79 +598,18 @@ st.markdown("<div style='height: 2rem;'></div>", unsafe_allow_html=True)
 # ────────────────────────────────────────────────
 # 5. COMMAND DECK (SEARCH)
 # ────────────────────────────────────────────────
-st.markdown('<div class="glass-panel">', unsafe_allow_html=True)
-
-c1, c2, c3 = st.columns([2, 2, 1.3])
-with c1:
-    origin_input = st.text_input("Origin", "Delhi", key="ui_origin")
-with c2:
-    dest_input = st.text_input("Destination", "Sydney", key="ui_dest")
-with c3:
-    st.markdown("<div style='height: 28px;'></div>", unsafe_allow_html=True)
-    find_clicked = st.button("Find Hub 🔎", key="btn_find_hub")
-
-if find_clicked:
-    origin_code = get_airport_code(origin_input)
-    dest_code = get_airport_code(dest_input)
-    ranked = rank_hubs(origin_code, dest_code, 6.0, 14, True, "")
-    st.session_state.ranked_hubs = ranked
-    st.session_state.show_hub_dropdown = True
-
-    if ranked:
-        best = ranked[0]["hub_id"]
-        if best in city_keys:
-            st.session_state.hub_index = city_keys.index(best)
-            st.toast(f"Route: {origin_code} ➝ {dest_code} via {best.upper()}", icon="✈️")
-    else:
-        st.warning("No direct hub match. Select manually below.")
+# The deck is a fragment, with the visa badge nested in it: typing a route,
+# picking a connection or changing a passport reruns only that section. Inputs
+# the results read ask for a page rerun (request_results_rerun), and only while
+# results are showing.
+@fragment
+def visa_badge(selected_code):
+    selected_passport = st.selectbox("My Passport", PASSPORTS, key="ui_passport")
 
-if st.session_state.show_hub_dropdown and st.session_state.ranked_hubs:
-    hub_score = {x["hub_id"]: x["score"] for x in st.session_state.ranked_hubs if "hub_id" in x}
-    hub_ids = [h for h in hub_score.keys() if h in city_options]
-    
-    st.markdown("<div style='height: 10px;'></div>", unsafe_allow_html=True)
-    chosen = st.selectbox(
-        "AI Recommended Hubs",
-        hub_ids,
-        format_func=lambda h: f"{city_options.get(h, h.upper())} ({hub_score.get(h,0)}% Match)",
-        key="hub_reco_dropdown"
-    )
-    if chosen in city_keys:
-        st.session_state.hub_index = city_keys.index(chosen)
-
-# Row 2: Hub + Vibe
-st.markdown("<div style='height: 10px;'></div>", unsafe_allow_html=True)
-col_hub, col_vibe = st.columns([1.6, 2.4])
-with col_hub:
-    selected_code = st.selectbox(
-        "Select Airport",
-        city_keys,
-        index=st.session_state.hub_index,
-        format_func=lambda x: city_options[x],
-        key="ui_selected_hub"
-    )
-    st.session_state.hub_index = city_keys.index(selected_code)
-with col_vibe:
-    user_query = st.text_input("Vibe Check", "I want local food and sightseeing", key="ui_user_query")
-
-# Row 3: Details
-st.markdown("<div style='height: 10px;'></div>", unsafe_allow_html=True)
-c_time, c_arr, c_day, c_visa = st.columns([1, 1, 1, 1.3])
-
-with c_time:
-    hours = st.number_input("Duration (Hours)", 2.0, 24.0, 6.0, 0.5, key="ui_hours")
-with c_arr:
-    arrival_time = st.number_input("Arrival Time (24h)", 0, 23, 14, key="ui_arrival_time")
-with c_day:
-    day_of_week = st.selectbox("Day of Week", ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"], index=0, key="ui_day")
-with c_visa:
-    passport_options = ["India", "USA", "UK", "EU", "Australia", "Japan"]
-    selected_passport = st.selectbox("My Passport", passport_options, key="ui_passport")
-    
     auto_visa, v_title, v_desc = check_visa_status(selected_code, selected_passport)
     visa_valid = auto_visa
     lower_title = v_title.lower()
-    
+
     if "required" in lower_title and "eta" not in lower_title and "evisa" not in lower_title:
             st.markdown(f'<span style="color:#ff4b4b; font-weight:bold;">🛑 {v_title}</span>', unsafe_allow_html=True)
     elif any(x in lower_title for x in ["eta", "evisa", "conditional", "varies", "on arrival"]):
@@ -575,37 +621,347 @@ with c_visa:
             has_visa = st.checkbox("I have a valid Visa", key="ui_manual_visa")
             if has_visa: visa_valid = True
 
-st.markdown("<div style='height: 20px;'></div>", unsafe_allow_html=True)
-if st.button("🚀 GENERATE ITINERARY", key="btn_generate"):
-    st.session_state.show_results = True
+    # Another passport with the same outcome leaves the results alone
+    previous = st.session_state.get("visa_valid")
+    st.session_state.visa_valid = visa_valid
+    if previous is not None and previous != visa_valid:
+        request_results_rerun()
+    finish_fragment()
+
+@fragment
+def command_deck():
+    st.markdown('<div class="glass-panel">', unsafe_allow_html=True)
+
+    c1, c2, c3 = st.columns([2, 2, 1.3])
+    with c1:
+        origin_input = st.text_input("Origin", "Delhi", key="ui_origin")
+    with c2:
+        dest_input = st.text_input("Destination", "Sydney", key="ui_dest")
+    with c3:
+        st.markdown("<div style='height: 28px;'></div>", unsafe_allow_html=True)
+        find_clicked = st.button("Find Hub 🔎", key="btn_find_hub")
+
+    origin_match, dest_match = resolve_airport(origin_input), resolve_airport(dest_input)
+    for label, text, match in (("Origin", origin_input, origin_match), ("Destination", dest_input, dest_match)):
+        if match is None and text.strip():
+            ideas = ", ".join(f"{m['city'] or m['name']} ({m['code']})" for m in get_airport_resolver().suggest(text, 3))
+            st.caption(f"⚠️ {label}: no airport matches '{text}'." + (f" Did you mean {ideas}?" if ideas else ""))
+        elif match is not None and match["match"] != "exact":
+            st.caption(f"{label}: {match['city'] or match['name']} ({match['code']}) · {match['name']}")
+
+    if find_clicked and (origin_match is None or dest_match is None):
+        st.warning("Enter an origin and destination we can find (a city, airport name or IATA code).")
+    elif find_clicked:
+        origin_code, dest_code = origin_match["code"], dest_match["code"]
+        # Compare candidate hubs with the traveller's real details (widgets below keep their last values)
+        with st.spinner("Comparing plans across hubs..."):
+            # "I have a valid Visa" was ticked for the hub on screen, so it only lifts that hub
+            has_visa = st.session_state.get("ui_manual_visa", False)
+            ranked = rank_hubs(
+                origin_code, dest_code,
+                st.session_state.ui_hours, st.session_state.ui_arrival_time,
+                passport=st.session_state.get("ui_passport", "India"),
+                user_query=st.session_state.get("ui_user_query", DEFAULT_QUERY),
+                day_of_week=st.session_state.ui_day,
+                visa_overrides={city_keys[st.session_state.hub_index]: True} if has_visa else None,
+            )
+        st.session_state.ranked_hubs = ranked
+        st.session_state.show_hub_dropdown = True
+
+        if ranked:
+            best = ranked[0]["hub_id"]
+            if best in city_keys:
+                if city_keys.index(best) != st.session_state.hub_index:
+                    request_results_rerun()
+                st.session_state.hub_index = city_keys.index(best)
+                st.toast(f"Route: {origin_code} ➝ {dest_code} via {best.upper()}", icon="✈️")
+        else:
+            st.warning("No direct hub match. Select manually below.")
+
+    if st.session_state.show_hub_dropdown and st.session_state.ranked_hubs:
+        hub_info = {x["hub_id"]: x for x in st.session_state.ranked_hubs if "hub_id" in x}
+        hub_ids = [h for h in hub_info.keys() if h in city_options]
+
+        st.markdown("<div style='height: 10px;'></div>", unsafe_allow_html=True)
+        chosen = st.selectbox(
+            "AI Recommended Hubs (best plan first)",
+            hub_ids,
+            format_func=lambda h: (f"{city_options.get(h, h.upper())} · plan score {hub_info[h]['score']} · "
+                                   f"{hub_info[h]['stops']} stops · {hub_info[h]['risk_level']} risk"),
+            key="hub_reco_dropdown",
+            on_change=request_results_rerun,
+        )
+        if chosen in city_keys:
+            st.session_state.hub_index = city_keys.index(chosen)
+            st.caption(" · ".join(hub_info[chosen]["why"]))
+
+    # Row 2: Hub + Vibe
+    st.markdown("<div style='height: 10px;'></div>", unsafe_allow_html=True)
+    col_hub, col_vibe = st.columns([1.6, 2.4])
+    with col_hub:
+        selected_code = st.selectbox(
+            "Select Airport",
+            city_keys,
+            index=st.session_state.hub_index,
+            format_func=lambda x: city_options[x],
+            key="ui_selected_hub",
+            on_change=request_results_rerun,
+        )
+        st.session_state.hub_index = city_keys.index(selected_code)
+    with col_vibe:
+        st.text_input("Vibe Check", DEFAULT_QUERY, key="ui_user_query",
+                      on_change=request_results_rerun)
+
+    # Optional: real connections from the flight timetable (LAYOVER_TIMETABLE)
+    if get_timetable() is not None:
+        with st.expander("✈️ Pick a real connection"):
+            k_min, k_day = st.columns([1, 1])
+            with k_min:
+                min_layover = st.number_input("Minimum layover (hours)", 2.0, 24.0, 4.0, 0.5, key="ui_min_layover")
+            with k_day:
+                conn_day = st.selectbox("Arriving on", ["Any day"] + DAYS, key="ui_conn_day")
+            windows = find_layover_windows(
+                selected_code, get_airport_code(origin_input), get_airport_code(dest_input),
+                None if conn_day == "Any day" else conn_day, min_layover,
+            )
+            if windows:
+                picked = st.selectbox("Connections (MCT and terminal changes applied)", range(len(windows)),
+                                      format_func=lambda i: format_connection(windows[i]), key="ui_connection")
+                st.button("Use this connection", key="btn_use_connection", on_click=apply_connection, args=(windows[picked],))
+            else:
+                st.caption(f"No feasible connections via {selected_code.upper()} for this route in the timetable.")
+
+    # Row 3: Details
+    st.markdown("<div style='height: 10px;'></div>", unsafe_allow_html=True)
+    c_time, c_arr, c_day, c_visa = st.columns([1, 1, 1, 1.3])
+
+    with c_time:
+        st.number_input("Duration (Hours)", 2.0, 24.0, step=0.5, key="ui_hours", on_change=request_results_rerun)
+    with c_arr:
+        st.number_input("Arrival Time (24h)", 0, 23, key="ui_arrival_time", on_change=request_results_rerun)
+    with c_day:
+        st.selectbox("Day of Week", DAYS, key="ui_day", on_change=request_results_rerun)
+    with c_visa:
+        visa_badge(selected_code)
 
-st.markdown('</div>', unsafe_allow_html=True)
+    st.markdown("<div style='height: 20px;'></div>", unsafe_allow_html=True)
+    st.button("🚀 GENERATE ITINERARY", key="btn_generate", on_click=start_results)
+
+    st.markdown('</div>', unsafe_allow_html=True)
+    finish_fragment()
+
+command_deck()
 
 # ────────────────────────────────────────────────
 # 6. RESULTS DASHBOARD
 # ────────────────────────────────────────────────
+REFINE_BUTTONS = [("😌 More Chill", "MORE_CHILL"), ("🏛️ Culture", "MORE_CULTURE"), ("🛃 Airside", "ONLY_AIRSIDE"),
+                  ("💸 Cheaper", "CHEAPER"), ("📸 Sights", "MAX_SIGHTS")]
+
+def set_refine_mode(mode):
+    st.session_state.refine_mode = mode
+
+def render_recommendations(ranked_activities, selected_code, plan_args):
+    st.markdown("### Top Recommendations")
+    for item in ranked_activities:
+        act = item["activity"]
+        score = item["score"]
+        explain = item.get("explain", {}) or {}
+
+        icon = {"FOOD": "🍜", "RELAX": "💆", "SHOPPING": "🛍️"}.get(act.get("type"), "📍")
+
+        with st.expander(f"{icon} {act['title']}  —  {score}% Match", expanded=(score > 75)):
+            c_desc, c_stats = st.columns([2.5, 1])
+            with c_desc:
+                st.markdown(f"**{act.get('description','')}**")
+                if "founders_tip" in act:
+                    st.info(f"💡 {act['founders_tip']}")
+
+                map_query = quote(f"{act['title']} {city_options[selected_code]}")
+                map_url = f"https://www.google.com/maps/search/?api=1&query={map_query}"
+                st.markdown(f'<a href="{map_url}" target="_blank" class="map-btn">📍 Navigate ↗</a>', unsafe_allow_html=True)
+
+                st.markdown("<div style='margin-top:10px;'></div>", unsafe_allow_html=True)
+                for r in explain.get("reasons", []): st.caption(f"✅ {r}")
+                for t in explain.get("tradeoffs", []): st.caption(f"⚠️ {t}")
+
+            with c_stats:
+                zone_tag = "🛃 AIRSIDE" if act["location"]["zone"] == "AIRSIDE" else "🏙️ LANDSIDE"
+                cost_tag = f"💰 {act.get('cost_tier', 'MEDIUM')}"
+                time_tag = f"⏱️ {act['time_constraints']['min_duration_hours']}h+"
+
+                st.markdown(f"""
+                    <div style="display: flex; flex-direction: column; gap: 6px; align-items: flex-end;">
+                        <span class="stat-pill" style="border-right-color: #00D4FF;">{zone_tag}</span>
+                        <span class="stat-pill" style="border-right-color: #FFD700;">{cost_tag}</span>
+                        <span class="stat-pill" style="border-right-color: #FF4B4B;">{time_tag}</span>
+                    </div>
+                """, unsafe_allow_html=True)
+
+    if st.session_state.result_token:
+        st.button(
+            "➕ Load more",
+            key="btn_load_more",
+            on_click=load_results_page,
+            args=(plan_args, st.session_state.result_token),
+        )
+
+MAP_MAX_PINS = 25  # Top-ranked activities get pins; the rest of the hub is clustered
+
+def map_view(key):
+    # Zoom and bounds the map last reported (st_folium keeps its value under its key),
+    # bounds padded by half a screen so short pans still find their clusters
+    view = st.session_state.get(key) or {}
+    sw, ne = (view.get("bounds") or {}).get("_southWest") or {}, (view.get("bounds") or {}).get("_northEast") or {}
+    bounds = None
+    if None not in (sw.get("lat"), sw.get("lng"), ne.get("lat"), ne.get("lng")):
+        dlat, dlon = (ne["lat"] - sw["lat"]) / 2, (ne["lng"] - sw["lng"]) / 2
+        bounds = tuple(round(v, 4) for v in (sw["lat"] - dlat, sw["lng"] - dlon, ne["lat"] + dlat, ne["lng"] + dlon))
+    return view.get("zoom") or MAP_ZOOM, bounds
+
+# The map is a fragment of its own: panning or zooming reruns only the map. The
+# base map is fixed per hub, so the browser keeps its tiles; only the marker
+# layer (pins + server-side clusters for the view) changes, memoized on the view.
+@fragment
+def render_map(selected_code, ranked_activities):
+    st.markdown("### Map View")
+    pins = [a for a in ranked_activities if a["activity"]["location"].get("lat", 0) != 0][:MAP_MAX_PINS]
+    key = f"results_map_{selected_code}"
+    zoom, bounds = map_view(key)
+    sig = (selected_code, hub_version(selected_code), tuple(p["activity"].get("id") for p in pins), zoom, bounds)
+    def build_layer():
+        clusters = map_clusters(selected_code, pins, zoom, bounds)
+        return clusters, create_map_layer(pins, clusters)
+    clusters, layer = memo("map_layer", sig, build_layer)
+    if not pins and clusters is None:
+        st.info("No coordinates available.")
+        return
+
+    hub = HUB_COORDS.get(selected_code) or pins[0]["activity"]["location"]
+    st_folium(create_map(hub["lat"], hub["lon"]), key=key, height=400, use_container_width=True,
+              feature_group_to_add=layer, returned_objects=["zoom", "bounds"])
+    if clusters is not None and clusters[3]:
+        st.caption(f"🔍 {clusters[3]} more activities in this area, zoom in to see them.")
+
+def render_timeline(ranked_activities, arrival_time, hours, itinerary_plan, plan_sig):
+    st.markdown("### ⏳ Suggested Timeframe")
+    timeline_fig = memo("timeline", plan_sig,
+                        lambda: create_timeline(ranked_activities, arrival_time, hours, itinerary=itinerary_plan))
+    if timeline_fig:
+        st.markdown('<div class="glass-panel" style="padding:10px;">', unsafe_allow_html=True)
+        st.plotly_chart(timeline_fig, use_container_width=True)
+        st.markdown("</div>", unsafe_allow_html=True)
+
+def render_what_if(selected_code, hours, arrival_time, day_of_week, query, visa_valid):
+    st.markdown("### 🔀 What If?")
+    if not st.toggle("Compare other arrival times and layover lengths", key="ui_what_if"):
+        return
+    # One vectorised sweep (logic.sweep_activities) over the day, memoized per query and hub version
+    sweep_hours = sorted(set(SWEEP_HOURS) | {float(hours)})
+    sig = (selected_code, hub_version(selected_code), query, visa_valid, day_of_week, tuple(sweep_hours))
+    cells = memo("sweep", sig, lambda: sweep_activities(selected_code, query, visa_valid,
+                                                        hours=sweep_hours, days=[day_of_week]))
+    sweep_fig = create_sweep_heatmap(cells, float(hours), arrival_time)
+    if sweep_fig:
+        st.markdown('<div class="glass-panel" style="padding:10px;">', unsafe_allow_html=True)
+        st.plotly_chart(sweep_fig, use_container_width=True)
+        st.markdown("</div>", unsafe_allow_html=True)
+
+# Refine bar, recommendations, map and timeline share one fragment: a refine
+# click or "Load more" changes all of them, and nothing above (weather, hero
+# images) reruns. The plan and the timeline figure are memoized on the results.
+@fragment
+def results_panel(selected_code, hours, arrival_time, day_of_week, user_query, visa_valid):
+    # Refine
+    st.markdown("<div style='height: 1.5rem;'></div>", unsafe_allow_html=True)
+    for col, (label, mode) in zip(st.columns(len(REFINE_BUTTONS)), REFINE_BUTTONS):
+        with col:
+            st.button(label, key=f"btn_refine_{mode.lower()}", on_click=set_refine_mode, args=(mode,))
+
+    enriched_query = apply_refinement(user_query, st.session_state.refine_mode)
+
+    # Logic (first page only; more pages load on demand)
+    plan_args = (selected_code, hours, arrival_time, enriched_query, visa_valid, day_of_week)
+    if st.session_state.results_sig != (plan_args, hub_version(selected_code)):
+        load_results_page(plan_args)  # Inputs changed or the hub was hot-reloaded
+    ranked_activities = st.session_state.result_items
+    if st.session_state.result_level in DEGRADED_NOTES:
+        st.caption(DEGRADED_NOTES[st.session_state.result_level])
+
+    # Safe Time
+    render_safe_time_breakdown(ranked_activities, hours)
+
+    # Warning
+    st.markdown('<div class="entry-3">', unsafe_allow_html=True)
+    is_late_night = (arrival_time >= 21 or arrival_time <= 4)
+    is_long_sleep = (hours >= 7 and hours < 14)
+    is_full_day = (hours >= 14)
+
+    if is_late_night and is_long_sleep:
+        st.info("🌙 **Sleep First:** You have a decent overnight break, but the city is closed. Prioritise an airport hotel!")
+    elif is_late_night and is_full_day:
+        st.success("🌙 **Overnight + Day:** You arrive late, but have the whole next day. Get a hotel, then explore!")
+    elif is_late_night:
+        st.warning("🌙 **Late Night:** Most city spots are closed. Stick to Airside options.")
+
+    # Narrative
+    if ranked_activities:
+        narrative = generate_narrative(ranked_activities, hours, user_query, visa_valid, arrival_time)
+        st.markdown(f'<div class="ai-box">{narrative}</div>', unsafe_allow_html=True)
+    st.markdown('</div>', unsafe_allow_html=True)
+
+    # Recommendations
+    if not ranked_activities:
+        st.error("No matches found. Try increasing duration or changing the vibe.")
+        return
+
+    st.markdown('<div class="entry-3">', unsafe_allow_html=True)
+    plan_sig = (st.session_state.results_sig, len(ranked_activities))
+    def build_plan():
+        plan = plan_itinerary(ranked_activities, arrival_time, hours)
+        return plan, compute_plan_risk(ranked_activities, hours, visa_valid, selected_code,
+                                       arrival_time, day_of_week, plan=plan)
+    itinerary_plan, (risk_level, risk_reason) = memo("plan", plan_sig, build_plan)
+    st.markdown(f"{render_risk_pill(risk_level)} <span class='meta-pill'>🧩 {risk_reason}</span>", unsafe_allow_html=True)
+    st.markdown("<div style='height: 1.5rem;'></div>", unsafe_allow_html=True)
+
+    col_left, col_right = st.columns([1.6, 1])
+    with col_left:
+        render_recommendations(ranked_activities, selected_code, plan_args)
+    with col_right:
+        render_map(selected_code, ranked_activities)
+
+    st.markdown("<div style='height: 3.0rem;'></div>", unsafe_allow_html=True)
+    render_timeline(ranked_activities, arrival_time, hours, itinerary_plan, plan_sig)
+    render_what_if(selected_code, hours, arrival_time, day_of_week, enriched_query, visa_valid)
+
+    st.markdown('</div>', unsafe_allow_html=True)
+
 if st.session_state.show_results:
+    selected_code = st.session_state.ui_selected_hub
     current_hub_name = city_options[selected_code]
+    day_of_week = st.session_state.ui_day
 
-    # Loading Theatre
-    lottie_url = "https://assets5.lottiefiles.com/packages/lf20_x62chJ.json"
-    lottie_json = load_lottie_url(lottie_url)
-    
-    if lottie_json:
-        placeholder = st.empty()
-        with placeholder.container():
-            st_lottie(lottie_json, height=200, key="loading")
-            st.markdown("<h3 style='text-align:center;'>Crunching Logistics...</h3>", unsafe_allow_html=True)
-    
-    time.sleep(1.5)
-    if lottie_json: placeholder.empty()
+    # Loading Theatre (only right after Generate, not on every rerun)
+    if st.session_state.pop("play_loader", False):
+        lottie_url = "https://assets5.lottiefiles.com/packages/lf20_x62chJ.json"
+        lottie_json = load_lottie_url(lottie_url)
+
+        if lottie_json:
+            placeholder = st.empty()
+            with placeholder.container():
+                st_lottie(lottie_json, height=200, key="loading")
+                st.markdown("<h3 style='text-align:center;'>Crunching Logistics...</h3>", unsafe_allow_html=True)
 
-    # Weather
+        time.sleep(1.5)
+        if lottie_json: placeholder.empty()
+
+    # Weather (cached per hub in logic.get_real_weather)
     weather = get_real_weather(selected_code)
     weather_html = ""
     if weather:
         weather_html = f"""<div class="hud-stat">{weather['icon']} {weather['temp']}°C {weather['condition']}</div>"""
-    
+
     # Situation Room
     st.markdown(f"""
 <div class="entry-0" style="display:flex; align-items:center; justify-content:space-between; margin: 2rem 0 1.5rem 0; border-bottom: 1px solid rgba(255,255,255,0.1); padding-bottom: 15px;">
@@ -627,112 +983,9 @@ if st.session_state.show_results:
     with img_c2: st.image(airport_img_url, use_container_width=True)
     st.markdown('</div>', unsafe_allow_html=True)
 
-    # Refine
-    st.markdown("<div style='height: 1.5rem;'></div>", unsafe_allow_html=True)
-    r1, r2, r3, r4, r5 = st.columns(5)
-    with r1: 
-        if st.button("😌 More Chill"): st.session_state.refine_mode = "MORE_CHILL"; st.rerun()
-    with r2: 
-        if st.button("🏛️ Culture"): st.session_state.refine_mode = "MORE_CULTURE"; st.rerun()
-    with r3: 
-        if st.button("🛃 Airside"): st.session_state.refine_mode = "ONLY_AIRSIDE"; st.rerun()
-    with r4: 
-        if st.button("💸 Cheaper"): st.session_state.refine_mode = "CHEAPER"; st.rerun()
-    with r5: 
-        if st.button("📸 Sights"): st.session_state.refine_mode = "MAX_SIGHTS"; st.rerun()
-
-    enriched_query = apply_refinement(user_query, st.session_state.refine_mode)
-
-    # Logic
-    ranked_activities = filter_and_rank_activities(
-        selected_code, hours, arrival_time, enriched_query, visa_valid, day_of_week
+    results_panel(
+        selected_code, st.session_state.ui_hours, st.session_state.ui_arrival_time, day_of_week,
+        st.session_state.ui_user_query, st.session_state.visa_valid,
     )
 
-    # Safe Time
-    render_safe_time_breakdown(ranked_activities, hours)
-    
-    # Warning
-    st.markdown('<div class="entry-3">', unsafe_allow_html=True)
-    is_late_night = (arrival_time >= 21 or arrival_time <= 4)
-    is_long_sleep = (hours >= 7 and hours < 14) 
-    is_full_day = (hours >= 14) 
-    
-    if is_late_night and is_long_sleep:
-        st.info("🌙 **Sleep First:** You have a decent overnight break, but the city is closed. Prioritise an airport hotel!")
-    elif is_late_night and is_full_day:
-        st.success("🌙 **Overnight + Day:** You arrive late, but have the whole next day. Get a hotel, then explore!")
-    elif is_late_night:
-        st.warning("🌙 **Late Night:** Most city spots are closed. Stick to Airside options.")
-
-    # Narrative
-    if ranked_activities:
-        narrative = generate_narrative(ranked_activities, hours, user_query, visa_valid, arrival_time)
-        st.markdown(f'<div class="ai-box">{narrative}</div>', unsafe_allow_html=True)
-    st.markdown('</div>', unsafe_allow_html=True)
-
-    # Recommendations
-    if not ranked_activities:
-        st.error("No matches found. Try increasing duration or changing the vibe.")
-    else:
-        st.markdown('<div class="entry-3">', unsafe_allow_html=True)
-        risk_level, risk_reason = compute_plan_risk(ranked_activities, hours, visa_valid)
-        st.markdown(f"{render_risk_pill(risk_level)} <span class='meta-pill'>🧩 {risk_reason}</span>", unsafe_allow_html=True)
-        st.markdown("<div style='height: 1.5rem;'></div>", unsafe_allow_html=True)
-
-        col_left, col_right = st.columns([1.6, 1])
-
-        with col_left:
-            st.markdown("### Top Recommendations")
-            for item in ranked_activities:
-                act = item["activity"]
-                score = item["score"]
-                risk = item.get("risk_level", "LOW")
-                explain = item.get("explain", {}) or {}
-
-                icon = {"FOOD": "🍜", "RELAX": "💆", "SHOPPING": "🛍️"}.get(act.get("type"), "📍")
-                risk_tag = {"LOW": "✅", "MED": "⚠️", "HIGH": "🚨"}.get(risk, "ℹ️")
-
-                with st.expander(f"{icon} {act['title']}  —  {score}% Match", expanded=(score > 75)):
-                    c_desc, c_stats = st.columns([2.5, 1])
-                    with c_desc:
-                        st.markdown(f"**{act.get('description','')}**")
-                        if "founders_tip" in act:
-                            st.info(f"💡 {act['founders_tip']}")
-                        
-                        map_query = quote(f"{act['title']} {city_options[selected_code]}")
-                        map_url = f"https://www.google.com/maps/search/?api=1&query={map_query}"
-                        st.markdown(f'<a href="{map_url}" target="_blank" class="map-btn">📍 Navigate ↗</a>', unsafe_allow_html=True)
-
-                        st.markdown("<div style='margin-top:10px;'></div>", unsafe_allow_html=True)
-                        for r in explain.get("reasons", []): st.caption(f"✅ {r}")
-                        for t in explain.get("tradeoffs", []): st.caption(f"⚠️ {t}")
-
-                    with c_stats:
-                        zone_tag = "🛃 AIRSIDE" if act["location"]["zone"] == "AIRSIDE" else "🏙️ LANDSIDE"
-                        cost_tag = f"💰 {act.get('cost_tier', 'MEDIUM')}"
-                        time_tag = f"⏱️ {act['time_constraints']['min_duration_hours']}h+"
-                        
-                        st.markdown(f"""
-                            <div style="display: flex; flex-direction: column; gap: 6px; align-items: flex-end;">
-                                <span class="stat-pill" style="border-right-color: #00D4FF;">{zone_tag}</span>
-                                <span class="stat-pill" style="border-right-color: #FFD700;">{cost_tag}</span>
-                                <span class="stat-pill" style="border-right-color: #FF4B4B;">{time_tag}</span>
-                            </div>
-                        """, unsafe_allow_html=True)
-
-        with col_right:
-            st.markdown("### Map View")
-            map_data = [{"lat": a["activity"]["location"]["lat"], "lon": a["activity"]["location"]["lon"]} 
-                        for a in ranked_activities if a["activity"]["location"].get("lat", 0) != 0]
-            if map_data: st.map(pd.DataFrame(map_data), zoom=10)
-            else: st.info("No coordinates available.")
-
-        st.markdown("<div style='height: 3.0rem;'></div>", unsafe_allow_html=True)
-        st.markdown("### ⏳ Suggested Timeframe")
-        timeline_fig = create_timeline(ranked_activities, arrival_time, hours)
-        if timeline_fig:
-            st.markdown('<div class="glass-panel" style="padding:10px;">', unsafe_allow_html=True)
-            st.plotly_chart(timeline_fig, use_container_width=True)
-            st.markdown("</div>", unsafe_allow_html=True)
-        
-        st.markdown('</div>', unsafe_allow_html=True)
\ No newline at end of file
+profiling.end_rerun()
@@ -0,0 +1,348 @@
+import os
+import json
+import time
+import sqlite3
+import re
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from vectors import EMBEDDING_DTYPE, Vectors, pack_rows, unpack_rows
+
+# ==========================================
+# 1. DATABASE LOCATION & SCHEMA
+# ==========================================
+DB_PATH = os.environ.get("LAYOVER_DB_PATH", "layover.db")
+POLL_INTERVAL_S = float(os.environ.get("LAYOVER_CATALOG_POLL_SECS", "5"))
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+# Every write to a hub row takes the next value of one global sequence, so a
+# hub's version changes on every write (INSERT OR REPLACE included) and never
+# repeats, even when a hub is deleted and re-created.
+_VERSION_TRIGGER_BODY = """
+    UPDATE catalog_seq SET value = value + 1 WHERE id = 1;
+    UPDATE hubs
+       SET version = (SELECT value FROM catalog_seq WHERE id = 1),
+           updated_at = strftime('%s', 'now')
+     WHERE id = NEW.id;
+"""
+
+def ensure_schema(conn: sqlite3.Connection):
+    """Idempotent migration run by every catalog writer before it writes.
+
+    Hub rows bump their version through triggers. Activity rows do not (a bulk
+    write would fire one trigger per row), so writers of `activities` call
+    bump_hub_versions() for the hubs they touched, inside the same transaction.
+    """
+    conn.execute("CREATE TABLE IF NOT EXISTS hubs (id TEXT PRIMARY KEY, full_data JSON)")
+    cols = {row[1] for row in conn.execute("PRAGMA table_info(hubs)")}
+    for col in ("name", "code"):
+        if col not in cols:
+            conn.execute(f"ALTER TABLE hubs ADD COLUMN {col} TEXT")
+    if "version" not in cols:
+        conn.execute("ALTER TABLE hubs ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+    if "updated_at" not in cols:
+        conn.execute("ALTER TABLE hubs ADD COLUMN updated_at INTEGER")
+    conn.execute("CREATE TABLE IF NOT EXISTS catalog_seq (id INTEGER PRIMARY KEY CHECK (id = 1), value INTEGER NOT NULL)")
+    conn.execute("INSERT OR IGNORE INTO catalog_seq (id, value) VALUES (1, 0)")
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS hubs_version_on_insert AFTER INSERT ON hubs BEGIN {_VERSION_TRIGGER_BODY} END")
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS hubs_version_on_update AFTER UPDATE OF full_data ON hubs BEGIN {_VERSION_TRIGGER_BODY} END")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS activities (
+            id TEXT PRIMARY KEY,
+            hub_id TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            content_hash TEXT NOT NULL,
+            data JSON NOT NULL,
+            embed_hash TEXT,
+            embedding BLOB,
+            embedding_model TEXT,
+            source TEXT NOT NULL DEFAULT 'catalog',
+            embedding_dtype TEXT
+        )
+    """)
+    act_cols = {row[1] for row in conn.execute("PRAGMA table_info(activities)")}
+    if "source" not in act_cols:
+        conn.execute("ALTER TABLE activities ADD COLUMN source TEXT NOT NULL DEFAULT 'catalog'")
+    if "embedding_dtype" not in act_cols:
+        # NULL = float32 (rows written before compact storage existed); see vectors.py
+        conn.execute("ALTER TABLE activities ADD COLUMN embedding_dtype TEXT")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_activities_hub ON activities (hub_id, position)")
+    # Observed logistics times (scripts/ingest_observations.py), one mergeable sketch per hub x metric x hour-of-week
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS live_stats (
+            hub_id TEXT NOT NULL,
+            metric TEXT NOT NULL,
+            hour_of_week INTEGER NOT NULL,
+            n INTEGER NOT NULL,
+            p50 REAL,
+            p90 REAL,
+            sketch BLOB NOT NULL,
+            updated_at INTEGER,
+            PRIMARY KEY (hub_id, metric, hour_of_week)
+        )
+    """)
+    _ensure_fts(conn)
+    # Backfill rows written before versioning existed
+    for (hub_id,) in conn.execute("SELECT id FROM hubs WHERE version = 0").fetchall():
+        conn.execute("UPDATE catalog_seq SET value = value + 1 WHERE id = 1")
+        conn.execute("UPDATE hubs SET version = (SELECT value FROM catalog_seq WHERE id = 1), "
+                     "updated_at = strftime('%s', 'now') WHERE id = ?", (hub_id,))
+    conn.commit()
+
+# Full-text index over the activity rows (FTS5, rowid = activities.rowid). The
+# triggers keep it in step with every writer (build_catalog.py, import_pois.py),
+# so BM25 candidates always match the rows the app loads. hub_id is indexed
+# too: "hub_id:sin AND (...)" narrows to one hub inside the FTS index itself.
+_FTS_COLUMNS = """
+    NEW.rowid, NEW.hub_id,
+    json_extract(NEW.data, '$.title'), json_extract(NEW.data, '$.type'),
+    json_extract(NEW.data, '$.description'), json_extract(NEW.data, '$.founders_tip')
+"""
+
+def _ensure_fts(conn: sqlite3.Connection):
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'activities_fts'").fetchone() is not None:
+        return
+    try:
+        conn.execute("""
+            CREATE VIRTUAL TABLE activities_fts USING fts5(
+                hub_id, title, type, description, founders_tip,
+                tokenize = 'porter unicode61 remove_diacritics 2'
+            )
+        """)
+    except sqlite3.OperationalError:
+        return  # SQLite built without FTS5: the ranker scores every activity
+    cols = "rowid, hub_id, title, type, description, founders_tip"
+    conn.execute(f"CREATE TRIGGER activities_fts_insert AFTER INSERT ON activities BEGIN "
+                 f"INSERT INTO activities_fts ({cols}) VALUES ({_FTS_COLUMNS}); END")
+    conn.execute(f"CREATE TRIGGER activities_fts_update AFTER UPDATE OF hub_id, data ON activities BEGIN "
+                 f"DELETE FROM activities_fts WHERE rowid = OLD.rowid; "
+                 f"INSERT INTO activities_fts ({cols}) VALUES ({_FTS_COLUMNS}); END")
+    conn.execute("CREATE TRIGGER activities_fts_delete AFTER DELETE ON activities BEGIN "
+                 "DELETE FROM activities_fts WHERE rowid = OLD.rowid; END")
+    # Rows written before the index existed
+    conn.execute(f"INSERT INTO activities_fts ({cols}) SELECT {_FTS_COLUMNS.replace('NEW.', 'a.')} FROM activities a")
+
+def bump_hub_versions(conn: sqlite3.Connection, hub_ids: Iterable[str]):
+    for hub_id in hub_ids:
+        conn.execute("UPDATE catalog_seq SET value = value + 1 WHERE id = 1")
+        conn.execute("UPDATE hubs SET version = (SELECT value FROM catalog_seq WHERE id = 1), "
+                     "updated_at = strftime('%s', 'now') WHERE id = ?", (hub_id,))
+
+def read_hub_versions(conn: sqlite3.Connection) -> Dict[str, int]:
+    try:
+        return {hub_id: int(v) for hub_id, v in conn.execute("SELECT id, version FROM hubs")}
+    except sqlite3.OperationalError:
+        # Pre-versioning database: every hub is "version 0" until a writer migrates it
+        return {hub_id: 0 for (hub_id,) in conn.execute("SELECT id FROM hubs")}
+
+def catalog_version(conn: sqlite3.Connection) -> str:
+    # Every hub or activity write moves a hub version, so this names the catalog state
+    h = hashlib.sha1()
+    for hub_id, version in sorted(read_hub_versions(conn).items()):
+        h.update(f"{hub_id}:{version};".encode("utf-8"))
+    return h.hexdigest()[:16]
+
+# ==========================================
+# 2. READING HUBS & ACTIVITIES
+# ==========================================
+def activity_text(act: Dict[str, Any]) -> str:
+    # The text each activity is embedded from (ETL, snapshot and live encode agree on it)
+    return f"{act.get('title','')} {act.get('type','')} {act.get('description','')}"
+
+def _has_activity_rows(conn: sqlite3.Connection) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'activities'").fetchone() is not None
+
+def read_hub(conn: sqlite3.Connection, hub_id: str) -> Optional[Dict[str, Any]]:
+    row = conn.execute("SELECT full_data FROM hubs WHERE id = ?", (hub_id,)).fetchone()
+    if not row:
+        return None
+    data = json.loads(row[0] or "{}")
+    if _has_activity_rows(conn):
+        rows = conn.execute("SELECT data FROM activities WHERE hub_id = ? ORDER BY position", (hub_id,)).fetchall()
+        if rows:
+            # ETL-managed hub: activity rows replace any legacy embedded list.
+            # One parse of the joined array is ~1.7x faster than a loads() per row at POI scale.
+            data["activities"] = json.loads("[" + ",".join(r[0] for r in rows) + "]")
+    return data
+
+def _stored_embeddings(conn: sqlite3.Connection, hub_id: str, model: str):
+    # (activity ids, current vectors, their row positions) in activity order
+    if not _has_activity_rows(conn):
+        return [], None, np.zeros(0, dtype=np.int64)
+    has_dtype = "embedding_dtype" in {row[1] for row in conn.execute("PRAGMA table_info(activities)")}
+    rows = conn.execute(
+        f"SELECT id, embedding, embedding_model, {'embedding_dtype' if has_dtype else 'NULL'} "
+        "FROM activities WHERE hub_id = ? ORDER BY position", (hub_id,)
+    ).fetchall()
+    have = np.array([i for i, (_, blob, m, _) in enumerate(rows) if blob is not None and m == model], dtype=np.int64)
+    if not have.size:
+        return [r[0] for r in rows], None, have
+    dtypes = {rows[i][3] or "float32" for i in have}
+    if len(dtypes) == 1:
+        vecs = unpack_rows((rows[i][1] for i in have), dtypes.pop())
+    else:
+        # Mid-migration between storage types: widen row by row
+        vecs = Vectors(np.stack([unpack_rows([rows[i][1]], rows[i][3] or "float32")[0] for i in have]))
+    return [r[0] for r in rows], vecs, have
+
+def read_hub_embeddings(conn: sqlite3.Connection, hub_id: str, model: str = EMBEDDING_MODEL) -> Optional[Vectors]:
+    """Stored ETL embeddings in activity order, or None if any row lacks a current one."""
+    ids, vecs, have = _stored_embeddings(conn, hub_id, model)
+    return vecs if ids and len(have) == len(ids) else None
+
+def fill_hub_embeddings(conn: sqlite3.Connection, hub_id: str, texts: List[str],
+                        encode_fn: Callable[[List[str]], np.ndarray], model: str = EMBEDDING_MODEL,
+                        dtype: str = EMBEDDING_DTYPE, write_back: bool = True) -> Vectors:
+    """Vectors for `texts` (the hub's activity_text()s, in order): stored rows as is, only the rest encoded.
+
+    With `write_back` (the ETL and snapshot builds) freshly encoded rows are
+    stored, best effort; the serving path passes False and never writes.
+    Hubs without activity rows are encoded whole.
+    """
+    ids, stored, have = _stored_embeddings(conn, hub_id, model)
+    if len(ids) != len(texts):
+        ids, stored, have = [], None, np.zeros(0, dtype=np.int64)
+    if ids and len(have) == len(ids):
+        return stored
+    missing = np.setdiff1d(np.arange(len(texts)), have)
+    fresh = Vectors.quantize(encode_fn([texts[i] for i in missing]), dtype)
+    # DBs from before compact storage have no dtype column: those rows are float32
+    has_dtype = "embedding_dtype" in {row[1] for row in conn.execute("PRAGMA table_info(activities)")}
+    if write_back and ids and (has_dtype or dtype == "float32"):
+        try:
+            with conn:
+                conn.executemany(
+                    "UPDATE activities SET embed_hash = ?, embedding = ?, embedding_model = ?"
+                    f"{', embedding_dtype = ?' if has_dtype else ''} WHERE id = ?",
+                    [(hashlib.sha1(texts[i].encode("utf-8")).hexdigest(), blob, model)
+                     + ((dtype,) if has_dtype else ()) + (ids[i],)
+                     for i, blob in zip(missing, pack_rows(fresh))],
+                )
+        except sqlite3.Error:
+            pass  # Read-only or busy DB: serve the vectors anyway
+    if stored is None:
+        return fresh
+    out = np.empty((len(texts), fresh.shape[1]), dtype=np.float32)
+    out[have], out[missing] = stored.to_float32(), fresh.to_float32()
+    return Vectors.quantize(out, dtype)
+
+_FTS_STOPWORDS = {
+    "a", "an", "and", "the", "or", "of", "to", "in", "on", "at", "for", "with", "near", "by", "from",
+    "i", "me", "my", "we", "want", "like", "some", "something", "place", "good", "best", "get", "go",
+}
+
+def fts_query(text: str) -> Optional[str]:
+    # Free text -> OR of quoted terms (no FTS syntax can leak through from user input)
+    terms = [t for t in re.findall(r"\w+", (text or "").lower()) if t not in _FTS_STOPWORDS]
+    if not terms:
+        return None
+    return " OR ".join(f'"{t}"' for t in dict.fromkeys(terms))
+
+def search_activity_fts(conn: sqlite3.Connection, hub_id: str, text: str, limit: int) -> Optional[List[str]]:
+    """Activity ids of one hub matching `text`, best BM25 first, or None when there is no FTS index.
+
+    Titles and types weigh more than descriptions and tips.
+    """
+    query = fts_query(text)
+    if query is None:
+        return []
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'activities_fts'").fetchone() is None:
+        return None
+    rows = conn.execute(
+        "SELECT a.id FROM activities_fts f JOIN activities a ON a.rowid = f.rowid "
+        "WHERE activities_fts MATCH ? ORDER BY bm25(activities_fts, 0.0, 4.0, 2.0, 1.0, 1.0) LIMIT ?",
+        (f'hub_id : "{hub_id}" AND ({query})', limit),
+    ).fetchall()
+    return [r[0] for r in rows]
+
+def read_live_stats(conn: sqlite3.Connection, hub_id: str) -> Dict[str, Dict[int, Dict[str, float]]]:
+    """{metric: {hour_of_week: {"n", "p50", "p90"}}}, hour_of_week = weekday * 24 + hour (Monday = 0)."""
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'live_stats'").fetchone() is None:
+        return {}
+    out: Dict[str, Dict[int, Dict[str, float]]] = {}
+    for metric, how, n, p50, p90 in conn.execute(
+        "SELECT metric, hour_of_week, n, p50, p90 FROM live_stats WHERE hub_id = ?", (hub_id,)
+    ):
+        out.setdefault(metric, {})[int(how)] = {"n": int(n), "p50": p50, "p90": p90}
+    return out
+
+# ==========================================
+# 3. HOT RELOAD WATCHER
+# ==========================================
+class CatalogWatcher:
+    """Polls hub versions and publishes them as one immutable dict.
+
+    Changed hubs are handed to `on_change` (which preloads their new data and
+    embeddings) before the new version map is swapped in, so readers either
+    see the old version everywhere or the fully-loaded new one.
+    """
+
+    def __init__(self, db_path: str = DB_PATH, interval_s: float = POLL_INTERVAL_S,
+                 on_change: Optional[Callable[[Dict[str, int]], None]] = None):
+        self.db_path = db_path
+        self.interval_s = interval_s
+        self.on_change = on_change
+        self.reloads = 0
+        self._versions: Dict[str, int] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._file_id = None
+        self._data_version = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.poll()
+
+    def versions(self) -> Dict[str, int]:
+        return self._versions
+
+    def version_of(self, hub_id: str) -> int:
+        return self._versions.get(hub_id, 0)
+
+    def start(self):
+        if self._thread is None and self.interval_s > 0:
+            self._thread = threading.Thread(target=self._loop, name="layover-catalog-watch", daemon=True)
+            self._thread.start()
+
+    def _loop(self):
+        while True:
+            time.sleep(self.interval_s)
+            try:
+                self.poll()
+            except Exception:
+                with self._lock:
+                    self._close()  # Retry from a fresh connection next tick
+
+    def _close(self):
+        if self._conn is not None:
+            self._conn.close()
+        self._conn, self._file_id, self._data_version = None, None, None
+
+    def poll(self) -> Dict[str, int]:
+        """Returns the hubs whose version changed since the last poll."""
+        with self._lock:
+            try:
+                stat = os.stat(self.db_path)
+            except OSError:
+                return {}
+            file_id = (stat.st_dev, stat.st_ino)
+            if file_id != self._file_id:
+                # First poll, or the DB file was swapped out underneath us
+                self._close()
+                self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+                self._file_id = file_id
+            # data_version only moves when *another* connection commits: a cheap no-op check
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version == self._data_version:
+                return {}
+            self._data_version = data_version
+
+            latest = read_hub_versions(self._conn)
+            changed = {h: v for h, v in latest.items() if self._versions.get(h) != v}
+            if changed and self._versions and self.on_change is not None:
+                self.on_change(changed)
+            self._versions = latest  # Atomic swap for readers
+            if changed:
+                self.reloads += 1
+            return changed
@@ -0,0 +1,207 @@
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# ==========================================
+# 1. CONFIG & TIMETABLE FORMAT
+# ==========================================
+# One row per scheduled flight (CSV). Required: flight, origin, destination,
+# dep_time, arr_time ("HH:MM", local at each end). Optional:
+#   arr_day_offset   +1 when it lands the next local day (default 0)
+#   days             operating weekdays by departure day, "1234567" = daily (Monday = 1)
+#   dep_terminal / arr_terminal, origin_country / destination_country
+# Only flights touching a known hub are kept. Times become minutes of the
+# week (Monday 00:00 = 0) in the hub's local time.
+MINUTES_PER_DAY = 1440
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+DEFAULT_MCT_MINUTES = 90        # Hubs with no mct_minutes in hubs.json
+PAIR_BLOCK = 512                # Arrivals expanded per step when enumerating windows
+
+def _by_unique(s: pd.Series, fn) -> np.ndarray:
+    # Timetables repeat a few thousand distinct values millions of times: transform each once
+    codes, uniques = pd.factorize(s)
+    mapped = np.array([fn(u) for u in uniques] + [fn(None)], dtype=object)
+    return mapped[codes]  # -1 (missing) picks the trailing fn(None)
+
+def _norm(v) -> Optional[str]:
+    return None if v is None or v != v else (str(v).strip().upper() or None)
+
+def _clock(v) -> float:
+    try:
+        h, m = str(v).split(":", 1)
+        return int(h) * 60 + int(m[:2])
+    except (TypeError, ValueError):
+        return np.nan
+
+def _day_mask(v) -> Tuple[bool, ...]:
+    days = "1234567" if v is None or v != v else str(v)
+    return tuple(str(d + 1) in days for d in range(7))
+
+# ==========================================
+# 2. PER-HUB SORTED ARRAYS
+# ==========================================
+class HubSchedule:
+    """Inbound and outbound flights of one hub, each sorted by minute of the week.
+
+    Rows point into the shared Timetable columns. The outbound arrays are
+    stored twice (the second copy one week later) so a window that crosses
+    Sunday midnight is still one contiguous slice.
+    """
+
+    def __init__(self, hub_id: str, cols: Dict[str, np.ndarray], in_rows: np.ndarray, in_t: np.ndarray,
+                 out_rows: np.ndarray, out_t: np.ndarray, meta: Dict[str, Any]):
+        self.hub_id = hub_id
+        self.cols = cols
+        mct = meta.get("mct_minutes", {})
+        fallback = mct.get("II", DEFAULT_MCT_MINUTES)
+        # Index by (inbound domestic, outbound domestic); DD isn't published, so it gets II
+        self.mct = np.array([[mct.get("II", fallback), mct.get("ID", fallback)],
+                             [mct.get("DI", fallback), mct.get("II", fallback)]], dtype=np.int32)
+        self.terminal_penalty = int(meta.get("terminal_change_penalty_minutes", 0))
+        self.min_connect = int(self.mct.min())
+
+        order = np.argsort(in_t, kind="stable")
+        self.in_t, self.in_row = in_t[order].astype(np.int32), in_rows[order]
+        order = np.argsort(out_t, kind="stable")
+        self.out_t = np.concatenate([out_t[order], out_t[order] + MINUTES_PER_WEEK]).astype(np.int32)
+        self.out_row = np.concatenate([out_rows[order], out_rows[order]])
+
+    def __len__(self):
+        return len(self.in_t) + len(self.out_t) // 2
+
+    def required_minutes(self, r_in: np.ndarray, r_out: np.ndarray) -> np.ndarray:
+        """MCT plus terminal-change penalty between timetable rows `r_in` (arriving) and `r_out` (departing)."""
+        ti, tj = self.cols["arr_terminal"][r_in], self.cols["dep_terminal"][r_out]
+        change = (ti >= 0) & (tj >= 0) & (ti != tj)
+        return self.mct[self.cols["domestic"][r_in], self.cols["domestic"][r_out]] + change * self.terminal_penalty
+
+    def arrivals(self, day: Optional[int] = None, origin: Optional[str] = None) -> np.ndarray:
+        """Positions in the inbound arrays, optionally only landing on weekday `day` (0 = Monday) or from `origin`."""
+        lo, hi = 0, len(self.in_t)
+        if day is not None:
+            lo, hi = np.searchsorted(self.in_t, [day * MINUTES_PER_DAY, (day + 1) * MINUTES_PER_DAY])
+        pos = np.arange(lo, hi)
+        if origin:
+            pos = pos[self.cols["origin"][self.in_row[pos]] == origin.upper()]
+        return pos
+
+    def _pairs(self, pos: np.ndarray, min_gap: float, max_gap: float):
+        # Every (arrival, departure) whose gap lies in [min_gap, max_gap]: two binary searches per arrival
+        t = self.in_t[pos].astype(np.int64)
+        lo = np.searchsorted(self.out_t, t + int(np.ceil(min_gap)), side="left")
+        hi = np.searchsorted(self.out_t, t + int(max_gap), side="right")
+        counts = hi - lo
+        a = np.repeat(pos, counts)
+        d = np.repeat(lo - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        return a, d
+
+    def _feasible(self, pos: np.ndarray, min_hours: float, max_hours: float,
+                  destination: Optional[str]) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """(arrival pos, departure pos, required minutes) blocks, by arrival time then departure time."""
+        min_gap = max(min_hours * 60, self.min_connect)
+        for b in range(0, len(pos), PAIR_BLOCK):
+            a, d = self._pairs(pos[b:b + PAIR_BLOCK], min_gap, max_hours * 60)
+            if destination:
+                keep = self.cols["destination"][self.out_row[d]] == destination.upper()
+                a, d = a[keep], d[keep]
+            need = self.required_minutes(self.in_row[a], self.out_row[d])
+            keep = self.out_t[d] - self.in_t[a] >= need
+            yield a[keep], d[keep], need[keep]
+
+    def _describe(self, a: int, d: int, need: int) -> Dict[str, Any]:
+        r_in, r_out, t = self.in_row[a], self.out_row[d], int(self.in_t[a])
+        return {
+            "inbound": self.cols["flight"][r_in], "origin": self.cols["origin"][r_in],
+            "outbound": self.cols["flight"][r_out], "destination": self.cols["destination"][r_out],
+            "arrival_day": t // MINUTES_PER_DAY, "arrival_mins": t % MINUTES_PER_DAY,
+            "departure_mins": int(self.out_t[d]) % MINUTES_PER_WEEK,
+            "layover_hours": round((int(self.out_t[d]) - t) / 60.0, 2),
+            "connect_mins": int(need),
+            "terminal_change": bool(need > self.mct[self.cols["domestic"][r_in], self.cols["domestic"][r_out]]),
+        }
+
+    def _collect(self, blocks, limit: Optional[int]) -> List[Dict[str, Any]]:
+        out: List[Dict[str, Any]] = []
+        for a, d, need in blocks:
+            take = len(a) if limit is None else min(len(a), limit - len(out))
+            out.extend(self._describe(a[n], d[n], need[n]) for n in range(take))
+            if limit is not None and len(out) >= limit:
+                break
+        return out
+
+    def count_connections(self, pos: int, max_hours: float = 24.0) -> int:
+        return sum(len(a) for a, _, _ in self._feasible(np.array([pos]), 0.0, max_hours, None))
+
+    def connections(self, pos: int, max_hours: float = 24.0, destination: Optional[str] = None,
+                    limit: Optional[int] = 100) -> List[Dict[str, Any]]:
+        """Feasible departures after inbound position `pos`, soonest first."""
+        return self._collect(self._feasible(np.array([pos]), 0.0, max_hours, destination), limit)
+
+    def layover_windows(self, min_hours: float, max_hours: float = 24.0, day: Optional[int] = None,
+                        origin: Optional[str] = None, destination: Optional[str] = None,
+                        limit: Optional[int] = 200) -> List[Dict[str, Any]]:
+        """Feasible connections with a layover between `min_hours` and `max_hours`, by arrival time."""
+        return self._collect(self._feasible(self.arrivals(day, origin), min_hours, max_hours, destination), limit)
+
+# ==========================================
+# 3. LOADING
+# ==========================================
+class Timetable:
+    def __init__(self, hubs: Dict[str, HubSchedule], flights: int):
+        self.hubs = hubs
+        self.flights = flights
+
+    def hub(self, hub_id: str) -> Optional[HubSchedule]:
+        return self.hubs.get(hub_id.lower())
+
+def load_timetable(path: str, hubs_meta: Dict[str, Any], chunk_size: int = 1_000_000) -> Timetable:
+    """Reads the CSV in chunks, keeping only flights into or out of a hub in `hubs_meta`."""
+    code_to_hub = {m.get("code", h).upper(): h for h, m in hubs_meta.items()}
+    hub_codes = np.array(sorted(code_to_hub), dtype=object)
+    parts: Dict[str, list] = {k: [] for k in ("flight", "origin", "destination", "dep", "arr", "days",
+                                               "dep_terminal", "arr_terminal", "domestic")}
+    flights = 0
+    for chunk in pd.read_csv(path, dtype=str, chunksize=chunk_size):
+        flights += len(chunk)
+        origin, dest = _by_unique(chunk["origin"], _norm), _by_unique(chunk["destination"], _norm)
+        keep = np.isin(origin, hub_codes) | np.isin(dest, hub_codes)
+        col = lambda name, fn: _by_unique(chunk[name], fn)[keep] if name in chunk else np.array([fn(None)] * int(keep.sum()), dtype=object)
+        offset = pd.to_numeric(chunk["arr_day_offset"], errors="coerce").fillna(0).to_numpy()[keep] if "arr_day_offset" in chunk else 0
+        parts["flight"].append(chunk["flight"].to_numpy(dtype=object)[keep])
+        parts["origin"].append(origin[keep])
+        parts["destination"].append(dest[keep])
+        parts["dep"].append(col("dep_time", _clock).astype(np.float64))
+        parts["arr"].append(col("arr_time", _clock).astype(np.float64) + offset * MINUTES_PER_DAY)
+        parts["days"].append(np.array(list(col("days", _day_mask)), dtype=bool).reshape(-1, 7))
+        parts["dep_terminal"].append(col("dep_terminal", _norm))
+        parts["arr_terminal"].append(col("arr_terminal", _norm))
+        if "origin_country" in chunk and "destination_country" in chunk:
+            oc, dc = col("origin_country", _norm), col("destination_country", _norm)
+            parts["domestic"].append(((oc != None) & (oc == dc)).astype(np.int8))  # noqa: E711
+        else:
+            parts["domestic"].append(np.zeros(int(keep.sum()), dtype=np.int8))  # International unless told otherwise
+    cols = {k: np.concatenate(v) if v else np.zeros(0) for k, v in parts.items()}
+
+    # One shared code space for terminals; -1 = unknown (never penalised)
+    codes, _ = pd.factorize(np.concatenate([cols["dep_terminal"], cols["arr_terminal"]]))
+    n = len(cols["flight"])
+    cols["dep_terminal"], cols["arr_terminal"] = codes[:n].astype(np.int32), codes[n:].astype(np.int32)
+
+    # One instance per operating weekday
+    valid = ~(np.isnan(cols["dep"]) | np.isnan(cols["arr"]))
+    rows, day = np.nonzero(cols.pop("days") & valid[:, None])
+    dep_t = (day * MINUTES_PER_DAY + cols["dep"][rows]).astype(np.int64)
+    arr_t = ((day * MINUTES_PER_DAY + cols["arr"][rows]) % MINUTES_PER_WEEK).astype(np.int64)
+    # Integer hub index per instance (-1 = not a hub) instead of repeated string compares
+    index = pd.Index(hub_codes)
+    from_hub = index.get_indexer(cols["origin"])[rows]
+    to_hub = index.get_indexer(cols["destination"])[rows]
+
+    hubs = {}
+    for h, code in enumerate(hub_codes):
+        hub_id = code_to_hub[code]
+        inb, outb = to_hub == h, from_hub == h
+        if inb.any() or outb.any():
+            hubs[hub_id] = HubSchedule(hub_id, cols, rows[inb], arr_t[inb], rows[outb], dep_t[outb], hubs_meta.get(hub_id, {}))
+    return Timetable(hubs, flights)
@@ -0,0 +1,98 @@
+import os
+import time
+import queue
+import threading
+from collections import Counter
+from concurrent.futures import Future
+from typing import Callable, Dict, List
+
+import numpy as np
+
+# ==========================================
+# 1. CONFIG
+# ==========================================
+# LAYOVER_ENCODE_WINDOW_MS=0 disables batching (every caller encodes directly)
+ENCODE_WINDOW_MS = float(os.environ.get("LAYOVER_ENCODE_WINDOW_MS", "3"))
+ENCODE_MAX_BATCH = int(os.environ.get("LAYOVER_ENCODE_MAX_BATCH", "32"))
+
+# ==========================================
+# 2. DYNAMIC MICRO-BATCHER
+# ==========================================
+class EncodeBatcher:
+    """Coalesces concurrent single-text encode calls into one batched forward pass.
+
+    The first request in an empty queue opens a window of `window_ms`; every
+    request arriving before it closes (or until `max_batch` is reached) rides
+    the same `encode_fn` call and gets its row back through a Future.
+    """
+
+    def __init__(self, encode_fn: Callable[[List[str]], np.ndarray], window_ms: float, max_batch: int):
+        self.encode_fn = encode_fn
+        self.window_s = max(0.0, window_ms) / 1000.0
+        self.max_batch = max(1, max_batch)
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._batch_sizes: Counter = Counter()
+        self._items = 0
+
+    def submit(self, text: str) -> Future:
+        self._ensure_worker()
+        fut: Future = Future()
+        self._queue.put((text, fut))
+        return fut
+
+    def encode(self, text: str) -> np.ndarray:
+        return self.submit(text).result()
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> Dict[str, float]:
+        with self._stats_lock:
+            batches = sum(self._batch_sizes.values())
+            return {
+                "batches": batches,
+                "items": self._items,
+                "mean_batch": round(self._items / batches, 2) if batches else 0.0,
+                "max_batch_seen": max(self._batch_sizes) if self._batch_sizes else 0,
+            }
+
+    def _ensure_worker(self):
+        if self._thread is not None:
+            return
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="layover-encoder", daemon=True)
+                self._thread.start()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window_s
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            # Identical queries (e.g. the default vibe) share one row
+            unique: Dict[str, int] = {}
+            for text, _ in batch:
+                unique.setdefault(text, len(unique))
+            try:
+                embs = self.encode_fn(list(unique))
+            except Exception as e:
+                for _, fut in batch:
+                    fut.set_exception(e)
+                continue
+            for text, fut in batch:
+                fut.set_result(embs[unique[text]])
+            with self._stats_lock:
+                self._batch_sizes[len(batch)] += 1
+                self._items += len(batch)
@@ -0,0 +1,205 @@
+import math
+from typing import Optional, Tuple
+
+import numpy as np
+
+from snapshot import NUMERIC_COLUMNS
+
+# ==========================================
+# 1. DISTANCE -> TRAVEL TIME BANDS
+# ==========================================
+EARTH_RADIUS_KM = 6371.0
+
+# Door-to-door minutes by straight-line distance from the terminal, before
+# hub calibration: walk/shuttle, taxi or metro, airport express, regional rail.
+BAND_KM = np.array([0.0, 3.0, 10.0, 30.0, 60.0, 200.0])
+BAND_MINUTES = np.array([5.0, 20.0, 35.0, 55.0, 80.0, 190.0])
+BEYOND_MINUTES_PER_KM = 0.8
+
+NEAR_AIRPORT_KM = 3.0       # Landside spots inside this are terminal-adjacent, not "the city"
+SCALE_LIMITS = (0.5, 2.0)   # Guard against odd transit_to_city_mins values
+
+def haversine_km(lat, lon, lat0: float, lon0: float) -> np.ndarray:
+    lat, lon = np.radians(np.asarray(lat, dtype=np.float64)), np.radians(np.asarray(lon, dtype=np.float64))
+    lat0, lon0 = math.radians(lat0), math.radians(lon0)
+    a = np.sin((lat - lat0) / 2) ** 2 + math.cos(lat0) * np.cos(lat) * np.sin((lon - lon0) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+def band_minutes(dist_km) -> np.ndarray:
+    d = np.asarray(dist_km, dtype=np.float64)
+    return np.interp(d, BAND_KM, BAND_MINUTES) + np.maximum(d - BAND_KM[-1], 0.0) * BEYOND_MINUTES_PER_KM
+
+def band_radius_km(minutes: float) -> float:
+    # Inverse of band_minutes (it is strictly increasing); negative = nothing is that close
+    if minutes < BAND_MINUTES[0]:
+        return -1.0
+    if minutes > BAND_MINUTES[-1]:
+        return float(BAND_KM[-1] + (minutes - BAND_MINUTES[-1]) / BEYOND_MINUTES_PER_KM)
+    return float(np.interp(minutes, BAND_MINUTES, BAND_KM))
+
+def hub_time_scale(dist_km: np.ndarray, is_landside: np.ndarray, city_mins: Optional[float]) -> float:
+    """Stretches the bands so the hub's typical city activity takes `transit_to_city_mins`."""
+    city = dist_km[is_landside & (dist_km > NEAR_AIRPORT_KM)]
+    if not city.size or not city_mins:
+        return 1.0
+    scale = float(city_mins) / float(band_minutes(np.median(city)))
+    return float(np.clip(scale, *SCALE_LIMITS))
+
+# ==========================================
+# 2. GRID INDEX
+# ==========================================
+class GridIndex:
+    """Uniform lat/lon grid in CSR form: points sorted by cell, one slice per occupied cell.
+
+    Longitudes are not wrapped at +/-180 (no hub sits near the antimeridian).
+    """
+
+    _SPAN = 1 << 24
+
+    def __init__(self, lat: np.ndarray, lon: np.ndarray, ids: np.ndarray, cell_deg: float = 0.05):
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.cell_deg = cell_deg
+        keys = self._key(np.floor(self.lat / cell_deg), np.floor(self.lon / cell_deg))
+        self.order = np.argsort(keys, kind="stable")
+        self.cells, self.starts, self.counts = np.unique(keys[self.order], return_index=True, return_counts=True)
+
+    def _key(self, row, col):
+        return (np.asarray(row, dtype=np.int64) + self._SPAN // 2) * self._SPAN + (np.asarray(col, dtype=np.int64) + self._SPAN // 2)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def within(self, lat0: float, lon0: float, radius_km: float) -> np.ndarray:
+        """Sorted ids of points within `radius_km` of (lat0, lon0)."""
+        if not len(self.ids) or radius_km < 0:
+            return np.zeros(0, dtype=np.int64)
+        dlat = radius_km / 111.0
+        dlon = radius_km / (111.0 * max(math.cos(math.radians(lat0)), 0.01))
+        r0, r1 = int(math.floor((lat0 - dlat) / self.cell_deg)), int(math.floor((lat0 + dlat) / self.cell_deg))
+        c0, c1 = int(math.floor((lon0 - dlon) / self.cell_deg)), int(math.floor((lon0 + dlon) / self.cell_deg))
+        if (r1 - r0 + 1) * (c1 - c0 + 1) >= len(self.cells):
+            rows = self.order  # Box covers more cells than are occupied: test every point
+        else:
+            rr, cc = np.meshgrid(np.arange(r0, r1 + 1), np.arange(c0, c1 + 1), indexing="ij")
+            hit = np.flatnonzero(np.isin(self.cells, self._key(rr.ravel(), cc.ravel())))
+            if not hit.size:
+                return np.zeros(0, dtype=np.int64)
+            rows = np.concatenate([self.order[self.starts[h]:self.starts[h] + self.counts[h]] for h in hit])
+        keep = haversine_km(self.lat[rows], self.lon[rows], lat0, lon0) <= radius_km
+        return np.sort(self.ids[rows[keep]])
+
+# ==========================================
+# 3. PER-HUB REACHABILITY
+# ==========================================
+_LAT, _LON, _LANDSIDE, _MIN_DUR = (NUMERIC_COLUMNS.index(c) for c in ("lat", "lon", "is_landside", "min_duration_hours"))
+
+class HubGeo:
+    """Distance, free-flow transit time and a landside grid for one hub version."""
+
+    def __init__(self, columns: np.ndarray, hub_lat: float, hub_lon: float, city_mins: Optional[float]):
+        self.hub_lat, self.hub_lon = hub_lat, hub_lon
+        lat, lon = columns[:, _LAT], columns[:, _LON]
+        is_landside = columns[:, _LANDSIDE] > 0.5
+        self.min_duration_hours = columns[:, _MIN_DUR].astype(np.float64)
+        self.dist_km = haversine_km(lat, lon, hub_lat, hub_lon)
+        self.scale = hub_time_scale(self.dist_km, is_landside, city_mins)
+        # One-way minutes before time-of-day traffic; airside spots need no city transit
+        self.transit_mins = np.where(is_landside, self.scale * band_minutes(self.dist_km), 0.0)
+        self.airside_idx = np.flatnonzero(~is_landside)
+        landside_idx = np.flatnonzero(is_landside)
+        self.grid = GridIndex(lat[landside_idx], lon[landside_idx], landside_idx)
+        for arr in (self.min_duration_hours, self.dist_km, self.transit_mins, self.airside_idx):
+            arr.setflags(write=False)  # Shared across sessions
+
+    def landside_within_minutes(self, one_way_mins: float) -> np.ndarray:
+        """Landside activities whose free-flow one-way transit fits in `one_way_mins`."""
+        radius = band_radius_km(one_way_mins / self.scale)
+        return self.grid.within(self.hub_lat, self.hub_lon, radius + 1e-6 if radius >= 0 else radius)
+
+    def landside_fitting(self, hours_after_fixed: float, traffic: float) -> np.ndarray:
+        """Landside activities whose own round trip (at `traffic`) plus minimum stay fits the budget."""
+        near = self.landside_within_minutes(hours_after_fixed * 30 / traffic)
+        trip = 2 * self.transit_mins[near] * (traffic / 60.0) + self.min_duration_hours[near]
+        return near[trip <= hours_after_fixed + 1e-4]  # Slack for float32 durations; the ranker re-checks exactly
+
+# ==========================================
+# 4. ZOOM CLUSTERS (MAP AGGREGATION)
+# ==========================================
+# Points are binned on a Web Mercator pixel grid per zoom level, so one
+# cluster covers about CLUSTER_PX screen pixels at the zoom it is shown at.
+TILE_PX = 256
+CLUSTER_PX = 64
+MIN_ZOOM, MAX_ZOOM = 2, 17  # Above MAX_ZOOM the finest level is reused
+MAX_CLUSTERS = 150  # Per map view, whatever the catalog size
+_CELL_BITS = 24
+
+def mercator_px(lat, lon) -> Tuple[np.ndarray, np.ndarray]:
+    """World pixel coordinates at zoom 0 (multiply by 2 ** zoom for other levels)."""
+    lat = np.clip(np.asarray(lat, dtype=np.float64), -85.05112878, 85.05112878)
+    x = (np.asarray(lon, dtype=np.float64) + 180.0) / 360.0 * TILE_PX
+    s = np.sin(np.radians(lat))
+    y = (0.5 - np.log((1 + s) / (1 - s)) / (4 * math.pi)) * TILE_PX
+    return x, y
+
+class ZoomClusters:
+    """Per-zoom grid aggregation of one hub's points, built once per hub version.
+
+    Each level keeps the occupied cells sorted by key with their point count
+    and coordinate sums, so a query can take a page's own markers out of the
+    counts and centroids without touching the other points.
+    """
+
+    def __init__(self, lat: np.ndarray, lon: np.ndarray, min_zoom: int = MIN_ZOOM, max_zoom: int = MAX_ZOOM,
+                 cell_px: int = CLUSTER_PX):
+        lat, lon = np.asarray(lat, dtype=np.float64), np.asarray(lon, dtype=np.float64)
+        self.ids = np.flatnonzero(lat != 0)  # lat 0 = no coordinates
+        self.lat, self.lon = lat[self.ids], lon[self.ids]
+        self.x, self.y = mercator_px(self.lat, self.lon)
+        self.min_zoom, self.max_zoom, self.cell_px = min_zoom, max_zoom, cell_px
+        self.levels = {}
+        for zoom in range(min_zoom, max_zoom + 1):
+            keys, inv, counts = np.unique(self._keys(self.x, self.y, zoom), return_inverse=True, return_counts=True)
+            self.levels[zoom] = (keys, counts, np.bincount(inv, weights=self.lat), np.bincount(inv, weights=self.lon))
+        for arr in (self.ids, self.lat, self.lon, self.x, self.y):
+            arr.setflags(write=False)  # Shared across sessions
+
+    def _keys(self, x, y, zoom):
+        scale = (1 << zoom) / self.cell_px
+        return (np.floor(x * scale).astype(np.int64) << _CELL_BITS) | np.floor(y * scale).astype(np.int64)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def level_of(self, zoom) -> int:
+        return int(min(max(round(zoom), self.min_zoom), self.max_zoom))
+
+    def query(self, zoom, bounds: Optional[Tuple[float, float, float, float]] = None,
+              exclude: Optional[np.ndarray] = None, limit: int = MAX_CLUSTERS):
+        """Largest clusters at `zoom` inside (south, west, north, east), without the `exclude` points.
+
+        Returns (lat, lon, count) arrays of at most `limit` clusters, largest
+        first, and how many points in the bounds were left out by the limit.
+        """
+        zoom = self.level_of(zoom)
+        keys, counts, lat_sum, lon_sum = self.levels[zoom]
+        if exclude is not None and len(exclude):
+            rows = np.searchsorted(self.ids, exclude)
+            rows = rows[(rows < len(self.ids)) & (self.ids[np.minimum(rows, len(self.ids) - 1)] == exclude)]
+            if rows.size:
+                at = np.searchsorted(keys, self._keys(self.x[rows], self.y[rows], zoom))
+                counts, lat_sum, lon_sum = counts.copy(), lat_sum.copy(), lon_sum.copy()
+                np.subtract.at(counts, at, 1)
+                np.subtract.at(lat_sum, at, self.lat[rows])
+                np.subtract.at(lon_sum, at, self.lon[rows])
+        keep = np.flatnonzero(counts > 0)
+        lat = lat_sum[keep] / counts[keep]
+        lon = lon_sum[keep] / counts[keep]
+        if bounds is not None:
+            south, west, north, east = bounds
+            inside = (lat >= south) & (lat <= north) & (lon >= west) & (lon <= east)
+            keep, lat, lon = keep[inside], lat[inside], lon[inside]
+        n = counts[keep]
+        top = np.argsort(-n, kind="stable")[:limit]
+        return lat[top], lon[top], n[top], int(n.sum() - n[top].sum())
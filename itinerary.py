@@ -0,0 +1,252 @@
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from geo import band_minutes, haversine_km
+
+# ==========================================
+# 1. CONFIG
+# ==========================================
+EXACT_MAX_STOPS = 10        # Subset DP is 2^n * n^2: ~100k steps at 10
+HEURISTIC_MAX_STOPS = 40    # Larger candidate lists are cut to their best-scored 40
+TIME_BUDGET_MS = 50.0       # Hard cap on solver wall time per plan
+BOARDING_BUFFER_MINS = 15
+DEFAULT_LOGISTICS_MINS = 60 # Same fallback the timeline always used for missing engine data
+
+INF = float("inf")
+
+# ==========================================
+# 2. STOPS & TIME WINDOWS
+# ==========================================
+# All times are minutes after arrival. A stop may be visited once, can be
+# waited for until it opens, and must fit inside one opening window.
+def _open_intervals(tc: Dict[str, Any], arrival_hour: float, horizon_mins: float) -> List[Tuple[float, float]]:
+    if tc.get("is_24h", False):
+        return [(-INF, INF)]
+    open_h = tc.get("opening_hour_24", 0)
+    close_h = tc.get("closing_hour_24", 24)
+    span_h = (close_h - open_h) % 24 or 24  # close < open wraps past midnight
+    if span_h >= 24:
+        return [(-INF, INF)]
+    out = []
+    for day in range(-1, int(horizon_mins // 1440) + 2):
+        start = (open_h - arrival_hour) * 60 + day * 1440
+        out.append((start, start + span_h * 60))
+    return out
+
+def _earliest_start(intervals: List[Tuple[float, float]], t: float, duration: float) -> Optional[float]:
+    for open_t, close_t in intervals:
+        start = max(t, open_t)
+        if start + duration <= close_t:
+            return start
+    return None
+
+def _build_stops(items: List[Dict[str, Any]], arrival_hour: float, horizon_mins: float, default_access: float):
+    stops = []
+    for item in items:
+        act = item["activity"]
+        meta = item.get("explain", {}).get("v3_meta", {})
+        landside = act["location"]["zone"] == "LANDSIDE"
+        stops.append({
+            "item": item,
+            "score": float(item.get("score", 0.0)),
+            "duration": act["time_constraints"]["min_duration_hours"] * 60,
+            "windows": _open_intervals(act.get("time_constraints", {}), arrival_hour, horizon_mins),
+            "lat": act["location"].get("lat", 0.0),
+            "lon": act["location"].get("lon", 0.0),
+            # One-way airport <-> stop: the ranker's per-activity trip for landside, none airside
+            "access": (meta.get("transit_mins", default_access * 2) / 2) if landside else 0.0,
+        })
+    return stops
+
+def _hop_matrix(stops) -> List[List[float]]:
+    # Door-to-door minutes between stops from their coordinates (uncalibrated city bands)
+    n = len(stops)
+    hops = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        dists = haversine_km([s["lat"] for s in stops], [s["lon"] for s in stops], stops[i]["lat"], stops[i]["lon"])
+        mins = band_minutes(dists)
+        for j in range(n):
+            hops[i][j] = 0.0 if i == j else float(mins[j])
+    return hops
+
+# ==========================================
+# 3. SOLVERS
+# ==========================================
+def _simulate(route: List[int], stops, hops, start_t: float, deadline: float) -> Optional[List[Tuple[float, float, float]]]:
+    """(arrive, start, end) per stop, or None if the route misses a window or the return deadline."""
+    out, t, prev = [], start_t, None
+    for i in route:
+        arrive = t + (stops[i]["access"] if prev is None else hops[prev][i])
+        start = _earliest_start(stops[i]["windows"], arrive, stops[i]["duration"])
+        if start is None:
+            return None
+        t = start + stops[i]["duration"]
+        out.append((arrive, start, t))
+        prev = i
+    if prev is not None and t + stops[prev]["access"] > deadline:
+        return None
+    return out
+
+def _route_value(route, stops, timing) -> Tuple[float, float]:
+    # More score first, then more slack (earlier return)
+    back = timing[-1][2] + stops[route[-1]]["access"] if route else 0.0
+    return sum(stops[i]["score"] for i in route), -back
+
+def _solve_exact(stops, hops, start_t: float, deadline: float, cutoff: float) -> Optional[List[int]]:
+    """Bitmask DP over (visited set, last stop) -> earliest finish.
+
+    Waiting for an opening is allowed, so finishing earlier never hurts and
+    the earliest finish per state is enough to stay exact.
+    """
+    n = len(stops)
+    finish = [[INF] * n for _ in range(1 << n)]
+    parent = [[-1] * n for _ in range(1 << n)]
+    for i, s in enumerate(stops):
+        st = _earliest_start(s["windows"], start_t + s["access"], s["duration"])
+        if st is not None and st + s["duration"] + s["access"] <= deadline:
+            finish[1 << i][i] = st + s["duration"]
+
+    best_mask, best_val = 0, (0.0, 0.0)
+    mask_score = [0.0] * (1 << n)
+    for mask in range(1, 1 << n):
+        if time.perf_counter() > cutoff:
+            return None
+        low = mask & -mask
+        mask_score[mask] = mask_score[mask ^ low] + stops[low.bit_length() - 1]["score"]
+        row = finish[mask]
+        for last in range(n):
+            t = row[last]
+            if t == INF:
+                continue
+            val = (mask_score[mask], -(t + stops[last]["access"]))
+            if val > best_val:
+                best_mask, best_val = mask, val
+            for j in range(n):
+                if mask >> j & 1:
+                    continue
+                s = stops[j]
+                st = _earliest_start(s["windows"], t + hops[last][j], s["duration"])
+                if st is None:
+                    continue
+                end = st + s["duration"]
+                nxt = mask | (1 << j)
+                if end + s["access"] <= deadline and end < finish[nxt][j]:
+                    finish[nxt][j] = end
+                    parent[nxt][j] = last
+
+    if not best_mask:
+        return []
+    last = min(range(n), key=lambda i: finish[best_mask][i] + stops[i]["access"])
+    route, mask = [], best_mask
+    while last != -1:
+        route.append(last)
+        last, mask = parent[mask][last], mask ^ (1 << last)
+    return route[::-1]
+
+def _best_insertion(route, j, stops, hops, start_t, deadline):
+    best = None
+    for pos in range(len(route) + 1):
+        cand = route[:pos] + [j] + route[pos:]
+        timing = _simulate(cand, stops, hops, start_t, deadline)
+        if timing is not None:
+            back = timing[-1][2] + stops[cand[-1]]["access"]
+            if best is None or back < best[0]:
+                best = (back, cand)
+    return None if best is None else best[1]
+
+def _solve_greedy(stops, hops, start_t: float, deadline: float) -> List[int]:
+    # Best-position insertion in score order: O(n * L^2) simulations, always affordable
+    route: List[int] = []
+    for j in sorted(range(len(stops)), key=lambda i: -stops[i]["score"]):
+        cand = _best_insertion(route, j, stops, hops, start_t, deadline)
+        if cand is not None:
+            route = cand
+    return route
+
+def _improve(route: List[int], stops, hops, start_t: float, deadline: float, cutoff: float) -> List[int]:
+    """1-for-1 swaps of a visited stop for a better unvisited one while time allows."""
+    order = sorted(range(len(stops)), key=lambda i: -stops[i]["score"])
+    improved = True
+    while improved and time.perf_counter() <= cutoff:
+        improved = False
+        for j in order:
+            if j in route:
+                continue
+            for k in sorted(route, key=lambda i: stops[i]["score"]):
+                if stops[k]["score"] >= stops[j]["score"] or time.perf_counter() > cutoff:
+                    break
+                cand = _best_insertion([i for i in route if i != k], j, stops, hops, start_t, deadline)
+                if cand is not None:
+                    route, improved = cand, True
+                    break
+            if improved:
+                break
+    return route
+
+# ==========================================
+# 4. PUBLIC API
+# ==========================================
+def plan_itinerary(items: List[Dict[str, Any]], arrival_hour: float, total_layover_hours: float,
+                   time_budget_ms: float = TIME_BUDGET_MS) -> Dict[str, Any]:
+    """Highest-scoring sequence of ranked items that fits the layover (orienteering with time windows).
+
+    Airside and landside plans are solved separately (a city trip means
+    immigration and transit, the terminal does not) and the better one wins.
+    Returns minute offsets from arrival for every stop and logistics block.
+    """
+    t0 = time.perf_counter()
+    cutoff = t0 + time_budget_ms / 1000.0
+    meta = items[0].get("explain", {}).get("v3_meta", {}) if items else {}
+    imm = meta.get("immigration_mins", DEFAULT_LOGISTICS_MINS)
+    sec = meta.get("security_mins", DEFAULT_LOGISTICS_MINS)
+    city_transit = meta.get("transit_mins", DEFAULT_LOGISTICS_MINS * 2) / 2
+    horizon = total_layover_hours * 60
+    deadline = horizon - sec - BOARDING_BUFFER_MINS
+
+    best = None
+    for zone, start_t in (("AIRSIDE", 0.0), ("LANDSIDE", float(imm))):
+        pool = [it for it in items if it["activity"]["location"]["zone"] == zone]
+        pool = sorted(pool, key=lambda it: -float(it.get("score", 0.0)))[:HEURISTIC_MAX_STOPS]
+        if not pool:
+            continue
+        stops = _build_stops(pool, arrival_hour, horizon, city_transit)
+        hops = _hop_matrix(stops)
+        route, exact = _solve_greedy(stops, hops, start_t, deadline), False
+        if len(stops) <= EXACT_MAX_STOPS:
+            optimal = _solve_exact(stops, hops, start_t, deadline, cutoff)
+            if optimal is not None:
+                route, exact = optimal, True
+        if not exact:
+            # Too many stops, or the DP ran out of budget: polish the greedy plan instead
+            route = _improve(route, stops, hops, start_t, deadline, cutoff)
+        timing = _simulate(route, stops, hops, start_t, deadline) or []
+        value = _route_value(route, stops, timing)
+        # Ties go to the zone of the top-ranked pick, like the old timeline
+        is_top_zone = items[0]["activity"]["location"]["zone"] == zone
+        key = (value, is_top_zone)
+        if best is None or key > best[0]:
+            best = (key, zone, start_t, route, stops, timing, exact)
+
+    plan = {
+        "zone": "AIRSIDE", "stops": [], "total_score": 0.0, "exact": True,
+        "immigration_mins": imm, "security_mins": sec, "start_mins": 0.0,
+        "return_by_mins": deadline, "departure_mins": horizon, "solve_ms": 0.0,
+    }
+    if best is not None:
+        _, zone, start_t, route, stops, timing, exact = best
+        plan.update(zone=zone, start_mins=start_t, exact=exact,
+                    total_score=round(sum(stops[i]["score"] for i in route), 1))
+        prev_end = start_t
+        for i, (arrive, start, end) in zip(route, timing):
+            plan["stops"].append({
+                "item": stops[i]["item"],
+                "travel_mins": arrive - prev_end,
+                "wait_mins": start - arrive,
+                "start_mins": start,
+                "end_mins": end,
+            })
+            prev_end = end
+        if route:
+            plan["return_transit_mins"] = stops[route[-1]]["access"]
+    plan["solve_ms"] = round((time.perf_counter() - t0) * 1000, 2)
+    return plan
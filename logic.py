@@ -1,33 +1,81 @@
 import sqlite3
 import json
 import os
-from typing import Dict, List, Tuple, Any
+import base64
+import hashlib
+import heapq
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Any
+import numpy as np
 import streamlit as st
 import requests
-from sentence_transformers import SentenceTransformer, util
+from sentence_transformers import SentenceTransformer
+import profiling
+from admission import CACHED, FULL, LEVELS, LEXICAL, AdmissionController
+from catalog import (DB_PATH, EMBEDDING_MODEL, CatalogWatcher, activity_text, fill_hub_embeddings, read_hub,
+                     read_live_stats, search_activity_fts)
+from encoder import ENCODE_MAX_BATCH, ENCODE_WINDOW_MS, EncodeBatcher
+from ann import ActivityIndex
+from connections import Timetable, load_timetable
+from geo import MAX_CLUSTERS, HubGeo, ZoomClusters
+from itinerary import plan_itinerary
+from risk import DEFAULT_CONFIDENCE, DEFAULT_RELIABILITY, RiskModel, lognormal_from_quantiles
+from plantable import get_plan_table
+from snapshot import NUMERIC_COLUMNS, activities_fingerprint, activity_columns, get_snapshot
+from vectors import Vectors
 
 # ==========================================
 # 1. CACHING & DATA LOADING
 # ==========================================
 
+MODEL_NAME = EMBEDDING_MODEL
+
 @st.cache_resource
 def get_model():
-    return SentenceTransformer("all-MiniLM-L6-v2")
+    return SentenceTransformer(MODEL_NAME)
 
-@st.cache_data(show_spinner=False)
-def load_hub_data(hub_id: str):
-    db_path = "layover.db"
-    if not os.path.exists(db_path):
+HUB_CACHE_ENTRIES = 64  # Old hub versions fall out of the caches after a reload
+
+@st.cache_resource(show_spinner=False)
+def get_catalog_watcher() -> CatalogWatcher:
+    watcher = CatalogWatcher(DB_PATH, on_change=_preload_hub_versions)
+    watcher.start()
+    return watcher
+
+def _preload_hub_versions(changed: Dict[str, int]):
+    # Runs on the watcher thread before the new versions become visible
+    for hub_id, version in changed.items():
+        _load_hub_data_at(hub_id, version)
+        _activity_embeddings_at(hub_id, version)
+        _hub_geo_at(hub_id, version)
+        _map_clusters_at(hub_id, version)
+
+def hub_version(hub_id: str) -> int:
+    return get_catalog_watcher().version_of(hub_id)
+
+@st.cache_resource(show_spinner=False, max_entries=HUB_CACHE_ENTRIES)
+def _load_hub_data_at(hub_id: str, version: int):
+    # Keyed by version: a rewrite of one hub never evicts the others.
+    # Shared across sessions, so callers must treat the dict as read-only.
+    if not os.path.exists(DB_PATH):
         return None
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row 
-    c = conn.cursor()
-    c.execute("SELECT full_data FROM hubs WHERE id = ?", (hub_id,))
-    row = c.fetchone()
-    conn.close()
-    if row:
-        return json.loads(row['full_data'])
-    return None
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        data = read_hub(conn, hub_id)
+        if data is not None:
+            data["live_stats"] = read_live_stats(conn, hub_id)  # Observed p50/p90 (ingest_observations.py)
+        return data
+    finally:
+        conn.close()
+
+def load_hub_data(hub_id: str, version: Optional[int] = None):
+    return _load_hub_data_at(hub_id, hub_version(hub_id) if version is None else version)
+
+def list_hub_ids() -> List[str]:
+    return sorted(get_catalog_watcher().versions())
 
 @st.cache_data(show_spinner=False)
 def load_hubs_meta() -> Dict[str, Any]:
@@ -37,6 +85,132 @@ def load_hubs_meta() -> Dict[str, Any]:
             return json.load(f)
     return {}
 
+# Embeddings are L2-normalised float32 rows, so cosine similarity is a dot product.
+def encode_texts(texts: List[str]) -> np.ndarray:
+    embs = get_model().encode(texts, convert_to_numpy=True, normalize_embeddings=True)
+    return np.asarray(embs, dtype=np.float32)
+
+@st.cache_resource(show_spinner=False)
+def get_query_batcher() -> EncodeBatcher:
+    # One queue per process: concurrent sessions share a forward pass
+    return EncodeBatcher(encode_texts, ENCODE_WINDOW_MS, ENCODE_MAX_BATCH)
+
+def encode_query(text: str) -> np.ndarray:
+    if ENCODE_WINDOW_MS <= 0:
+        return encode_texts([text])[0]
+    return get_query_batcher().encode(text)
+
+@st.cache_resource(show_spinner=False, max_entries=HUB_CACHE_ENTRIES)
+def _activity_embeddings_at(hub_id: str, version: int) -> Vectors:
+    # Kept in whatever precision the snapshot/catalog stores (vectors.py)
+    data = _load_hub_data_at(hub_id, version) or {}
+    activities = data.get("activities", [])
+    if not activities:
+        return Vectors(np.zeros((0, 0), dtype=np.float32))
+    texts = [activity_text(a) for a in activities]
+    # Prefer the host-wide memory-mapped snapshot (scripts/build_snapshot.py)
+    snap = get_snapshot()
+    if snap is not None and snap.model == MODEL_NAME:
+        embs = snap.hub_embeddings(hub_id, activities_fingerprint(texts))
+        if embs is not None:
+            return embs
+    # Then vectors stored by the catalog ETL (scripts/build_catalog.py); only rows without one are encoded.
+    # Serving never writes: storing vectors is the ETL's and snapshot build's job.
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        embs = fill_hub_embeddings(conn, hub_id, texts, encode_texts, MODEL_NAME, write_back=False)
+    finally:
+        conn.close()
+    embs.setflags(write=False)  # Shared across sessions
+    return embs
+
+def get_activity_embeddings(hub_id: str, version: Optional[int] = None) -> Vectors:
+    return _activity_embeddings_at(hub_id, hub_version(hub_id) if version is None else version)
+
+@st.cache_resource(show_spinner=False, max_entries=HUB_CACHE_ENTRIES)
+def _activity_columns_at(hub_id: str, version: int) -> np.ndarray:
+    # Numeric activity table (snapshot.NUMERIC_COLUMNS) for vectorised paths
+    data = _load_hub_data_at(hub_id, version) or {}
+    activities = data.get("activities", [])
+    snap = get_snapshot()
+    if snap is not None and activities:
+        cols = snap.hub_numeric(hub_id, activities_fingerprint([activity_text(a) for a in activities]))
+        if cols is not None:
+            return cols
+    cols = activity_columns(activities)
+    cols.setflags(write=False)
+    return cols
+
+def get_activity_columns(hub_id: str, version: Optional[int] = None) -> np.ndarray:
+    return _activity_columns_at(hub_id, hub_version(hub_id) if version is None else version)
+
+@st.cache_resource(show_spinner=False, max_entries=HUB_CACHE_ENTRIES)
+def _hub_geo_at(hub_id: str, version: int) -> Optional[HubGeo]:
+    # Distance-band transit times + landside grid (geo.py), calibrated to the hub's transit_to_city_mins
+    coords = HUB_COORDS.get(hub_id)
+    data = _load_hub_data_at(hub_id, version) or {}
+    if not coords or not data.get("activities"):
+        return None
+    city_mins = data.get("intelligence_factors", {}).get("transit_to_city_mins")
+    return HubGeo(_activity_columns_at(hub_id, version), coords["lat"], coords["lon"], city_mins)
+
+def get_hub_geo(hub_id: str, version: Optional[int] = None) -> Optional[HubGeo]:
+    return _hub_geo_at(hub_id, hub_version(hub_id) if version is None else version)
+
+@st.cache_resource(show_spinner=False, max_entries=HUB_CACHE_ENTRIES)
+def _map_clusters_at(hub_id: str, version: int) -> Optional[ZoomClusters]:
+    # Every zoom level's clusters for the results map (geo.py); the page only ships the visible ones
+    cols = _activity_columns_at(hub_id, version)
+    clusters = ZoomClusters(cols[:, NUMERIC_COLUMNS.index("lat")], cols[:, NUMERIC_COLUMNS.index("lon")])
+    return clusters if len(clusters) else None
+
+def get_map_clusters(hub_id: str, version: Optional[int] = None) -> Optional[ZoomClusters]:
+    return _map_clusters_at(hub_id, hub_version(hub_id) if version is None else version)
+
+def map_clusters(hub_id, ranked_items, zoom, bounds=None, limit=MAX_CLUSTERS):
+    """(lat, lon, count, left_out) clusters for the hub's other activities at `zoom`.
+
+    `ranked_items` are drawn as their own pins, so they are taken out of the
+    counts. `bounds` is (south, west, north, east); None = the whole hub.
+    """
+    version = hub_version(hub_id)
+    clusters = _map_clusters_at(hub_id, version)
+    if clusters is None:
+        return None
+    pos = _activity_positions_at(hub_id, version)
+    pinned = sorted({pos[it["activity"].get("id")] for it in ranked_items if it["activity"].get("id") in pos})
+    return clusters.query(zoom, bounds, np.array(pinned, dtype=np.int64), limit)
+
+TIMETABLE_PATH = os.environ.get("LAYOVER_TIMETABLE", os.path.join("data", "timetable.csv"))
+
+@st.cache_resource(show_spinner="Loading flight timetable...", max_entries=1)
+def _timetable_at(path: str, mtime_ns: int) -> Timetable:
+    # Reloaded when the file changes; only flights touching our hubs are kept
+    return load_timetable(path, load_hubs_meta())
+
+def get_timetable() -> Optional[Timetable]:
+    try:
+        mtime_ns = os.stat(TIMETABLE_PATH).st_mtime_ns
+    except OSError:
+        return None
+    return _timetable_at(TIMETABLE_PATH, mtime_ns)
+
+VIBE_ANCHORS = [
+    ("FOOD", "local food eat hungry snacks dinner lunch halal street food"),
+    ("SIGHTS", "sightseeing landmarks skyline view photo explore"),
+    ("CULTURE", "culture museum history art heritage mosque temple"),
+    ("RELAX", "relax chill spa shower lounge comfort quiet"),
+    ("SLEEP", "sleep nap rest hotel pod sleeping"),
+    ("SHOPPING", "shopping buy souvenirs duty free mall luxury brands"),
+    ("ADVENTURE", "adventure fun activity skating tour walk"), 
+]
+
+@st.cache_resource(show_spinner=False)
+def get_anchor_embeddings() -> np.ndarray:
+    embs = encode_texts([t for _, t in VIBE_ANCHORS])
+    embs.setflags(write=False)
+    return embs
+
 # ==========================================
 # 2. V3 INTELLIGENCE ENGINE (THE BRAIN)
 # ==========================================
@@ -55,17 +229,33 @@ WEEKEND_MAP = {
     "cdg": ["Saturday", "Sunday"],       # Paris
 }
 
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+LIVE_MIN_OBSERVATIONS = 30  # Fewer samples in an hour-of-week slot: keep the static model
+
 class Airport:
     def __init__(self, data: Dict[str, Any]):
         self.data = data
         self.factors = data.get("intelligence_factors", {})
+        self.live = data.get("live_stats", {})
         self.code = data.get("meta", {}).get("code", "UNKNOWN")
         self.hub_id = data.get("id", "unknown").lower()
 
     def is_v3_ready(self) -> bool:
         return bool(self.factors)
 
-    def get_immigration_time(self, arrival_hour: int) -> float:
+    def live_quantiles(self, metric: str, arrival_hour: int, day_of_week: Optional[str]) -> Optional[Tuple[float, float]]:
+        # 📡 Observed (p50, p90) minutes for this hour of the week, if we have enough of them
+        if day_of_week not in DAYS:
+            return None
+        stat = self.live.get(metric, {}).get(DAYS.index(day_of_week) * 24 + int(arrival_hour) % 24)
+        if not stat or stat["n"] < LIVE_MIN_OBSERVATIONS or not stat["p50"]:
+            return None
+        return stat["p50"], stat["p90"]
+
+    def get_immigration_time(self, arrival_hour: int, day_of_week: Optional[str] = None) -> float:
+        live = self.live_quantiles("immigration", arrival_hour, day_of_week)
+        if live:
+            return live[0] / 60.0
         base_mins = self.factors.get("immigration_avg_mins", 45)
         multiplier = 1.0
         # Rush Hour Immigration (Airport Busy times)
@@ -77,7 +267,14 @@ class Airport:
 
     def get_transit_time_one_way(self, arrival_hour: int, day_of_week: str) -> float:
         base_mins = self.factors.get("transit_to_city_mins", 30)
-        
+        return (base_mins * self.traffic_multiplier(arrival_hour, day_of_week)) / 60.0
+
+    def traffic_multiplier(self, arrival_hour: int, day_of_week: str) -> float:
+        # Observed airport <-> city median vs the typed-in baseline (per-activity transit scales with it)
+        live = self.live_quantiles("transit", arrival_hour, day_of_week)
+        if live:
+            return live[0] / self.factors.get("transit_to_city_mins", 30)
+
         # 🧠 INTELLIGENCE: Traffic & Weekend Logic
         weekends = WEEKEND_MAP.get(self.hub_id, ["Saturday", "Sunday"])
         is_weekend = day_of_week in weekends
@@ -96,11 +293,13 @@ class Airport:
         if self.hub_id == "cdg" and is_rush_hour:
             multiplier = 2.0   # Paris gets severe penalty
             
-        return (base_mins * multiplier) / 60.0
+        return multiplier
 
     def get_security_buffer(self) -> float:
         return self.factors.get("security_check_mins", 45) / 60.0
 
+SAFETY_PADDING_HOURS = 0.5
+
 def calculate_safe_exploration_time(
     airport: Airport, 
     total_layover: float, 
@@ -113,14 +312,14 @@ def calculate_safe_exploration_time(
         overhead = 2.5 
         return max(0.0, total_layover - overhead), {"method": "V2_STATIC", "overhead_used": overhead}
 
-    imm_time = airport.get_immigration_time(arrival_hour)
+    imm_time = airport.get_immigration_time(arrival_hour, day_of_week)
     
     # Pass Day & Hour to Transit Calculation
     transit_one_way = airport.get_transit_time_one_way(arrival_hour, day_of_week)
     transit_total = transit_one_way * 2
     
     security_time = airport.get_security_buffer()
-    safety_padding = 0.5 
+    safety_padding = SAFETY_PADDING_HOURS
     
     total_overhead = imm_time + transit_total + security_time + safety_padding
     safe_time = max(0.0, total_layover - total_overhead)
@@ -220,7 +419,8 @@ HUBS_INFO = {
     "lhr": "EUROPE_WEST", "cdg": "EUROPE_WEST", "ams": "EUROPE_WEST", "icn": "EAST_ASIA"
 }
 
-def rank_hubs(origin, destination, layover_hours, arrival_hour, visa_valid, user_query=""):
+def rank_hubs(origin, destination, layover_hours, arrival_hour, *, passport="India", user_query="",
+              day_of_week="Monday", visa_overrides=None):
     origin, dest = origin.upper().strip(), destination.upper().strip()
     region_a = AIRPORT_REGIONS.get(origin, "UNKNOWN")
     region_b = AIRPORT_REGIONS.get(dest, "UNKNOWN")
@@ -235,26 +435,22 @@ def rank_hubs(origin, destination, layover_hours, arrival_hour, visa_valid, user
     for hub_id, hub_region in HUBS_INFO.items():
         if hub_region not in target_regions: continue
         if hub_id.upper() in [origin, dest]: continue
-        
-        meta = hubs_meta.get(hub_id, {})
-        if not meta: continue 
+        if not hubs_meta.get(hub_id): continue
+        candidates.append(hub_id)
 
-        base = float(meta.get("hub_popularity", 0.5)) * 100
-        
-        if layover_hours > 8: base += 10
-        
-        candidates.append({
-            "hub_id": hub_id,
-            "name": meta.get("name", hub_id.upper()),
-            "score": round(base, 1),
-            "why": ["Strategic location", f"Hub popularity: {meta.get('hub_popularity')}"]
-        })
-    candidates.sort(key=lambda x: x["score"], reverse=True)
-    return candidates[:5]
+    # 🧠 Rank by the plan each hub would actually give this traveller
+    out = []
+    for r in compare_hubs(candidates, layover_hours, arrival_hour, passport, day_of_week, user_query,
+                          visa_overrides=visa_overrides):
+        meta = hubs_meta.get(r["hub_id"], {})
+        why = [f"Top pick: {r['top_pick']} ({r['top_score']}%)",
+               f"{r['stops']} stop{'s' if r['stops'] != 1 else ''} fit ({r['zone'].lower()})",
+               r["risk_reason"]]
+        if not r["visa_valid"]:
+            why.append(f"Visa: {r['visa_type']} (airside only)")
+        out.append({**r, "name": meta.get("name", r["hub_id"].upper()), "score": r["quality"], "why": why})
+    return out[:5]
 
-# ==========================================
-# 4. CORE HELPERS
-# ==========================================
 def _clamp(x, lo=0.0, hi=1.0): return max(lo, min(hi, x))
 
 def _hour_in_window(hour, open_h, close_h):
@@ -263,46 +459,127 @@ def _hour_in_window(hour, open_h, close_h):
         return (open_h <= hour0 <= close_h) or (open_h <= hour1 <= close_h)
     return (hour0 >= open_h) or (hour0 <= close_h)
 
+PASSPORT_KEYS = {"India": "indian", "USA": "us", "UK": "uk", "EU": "eu", "Australia": "australian", "Japan": "japanese"}
+PASSPORTS = list(PASSPORT_KEYS)
+
 def check_visa_status(hub_id, passport):
     data = load_hub_data(hub_id)
     if not data: return True, "Unknown", "Assuming valid."
-    mapping = {"India": "indian", "USA": "us", "UK": "uk", "EU": "eu", "Australia": "australian", "Japan": "japanese"}
-    key = mapping.get(passport, "us")
+    key = PASSPORT_KEYS.get(passport, "us")
     policy = data.get("visa_policy", {}).get(key, {})
     p_type = policy.get("type", "").lower()
     is_valid = not ("required" in p_type and "on arrival" not in p_type and "free" not in p_type)
     return is_valid, policy.get("type", "Unknown"), policy.get("details", "")
 
-def analyze_vibe(user_query):
-    model = get_model()
+def analyze_vibe(user_query, q_emb=None):
     q = (user_query or "").strip()
     if not q: return {"intents": [], "labels": []}
-    anchors = [
-        ("FOOD", "local food eat hungry snacks dinner lunch halal street food"),
-        ("SIGHTS", "sightseeing landmarks skyline view photo explore"),
-        ("CULTURE", "culture museum history art heritage mosque temple"),
-        ("RELAX", "relax chill spa shower lounge comfort quiet"),
-        ("SLEEP", "sleep nap rest hotel pod sleeping"),
-        ("SHOPPING", "shopping buy souvenirs duty free mall luxury brands"),
-        ("ADVENTURE", "adventure fun activity skating tour walk"), 
-    ]
-    q_emb = model.encode(q, convert_to_tensor=True)
-    a_embs = model.encode([t for _, t in anchors], convert_to_tensor=True)
-    sims = util.pytorch_cos_sim(q_emb, a_embs)[0].tolist()
-    scored = sorted([(anchors[i][0], float(sims[i])) for i in range(len(anchors))], key=lambda x: x[1], reverse=True)
+    if q_emb is None:
+        q_emb = encode_query(q)
+    sims = (get_anchor_embeddings() @ q_emb).tolist()
+    scored = sorted([(VIBE_ANCHORS[i][0], float(sims[i])) for i in range(len(VIBE_ANCHORS))], key=lambda x: x[1], reverse=True)
     labels = [k for k, s in scored if s >= 0.35][:3]
     return {"intents": scored[:5], "labels": labels}
 
-def compute_plan_risk(ranked_items, layover_hours, visa_valid):
-    if not ranked_items: return "UNKNOWN", "No activities."
+def keyword_vibe(user_query):
+    # Encoder-free stand-in for analyze_vibe (degraded plans): anchor words present in the query
+    words = set(re.findall(r"[a-z]+", (user_query or "").lower()))
+    labels = [label for label, text in VIBE_ANCHORS if words & set(text.split())][:3]
+    return {"intents": [], "labels": labels}
+
+DEFAULT_QUERY = "I want local food and sightseeing"
+REFINE_MODES = ["DEFAULT", "MORE_CHILL", "MORE_CULTURE", "ONLY_AIRSIDE", "CHEAPER", "MAX_SIGHTS"]
+
+def apply_refinement(base_query: str, mode: str) -> str:
+    q = (base_query or "").strip()
+    mode = (mode or "DEFAULT").upper()
+    if mode == "ONLY_AIRSIDE":
+        return f"{q}. Prefer airside only, inside airport, no city trips."
+    if mode == "MORE_CHILL":
+        return f"{q}. Prefer relaxing, quiet, lounge, spa, comfy."
+    if mode == "MORE_CULTURE":
+        return f"{q}. Prefer culture, museums, heritage, landmarks, history."
+    if mode == "MAX_SIGHTS":
+        return f"{q}. Prefer sightseeing, viewpoints, iconic spots, photo locations."
+    if mode == "CHEAPER":
+        return f"{q}. Prefer cheap, free, budget friendly."
+    return q
+
+def find_layover_windows(hub_id, origin=None, destination=None, day_of_week=None,
+                         min_hours=2.0, max_hours=24.0, limit=50) -> List[Dict[str, Any]]:
+    # ✈️ Real connections at the hub (MCT + terminal penalties from hubs.json), by arrival time
+    timetable = get_timetable()
+    sched = timetable.hub(hub_id) if timetable else None
+    if sched is None:
+        return []
+    day = DAYS.index(day_of_week) if day_of_week in DAYS else None
+    return sched.layover_windows(min_hours, max_hours, day, origin, destination, limit)
+
+RISK_CACHE_ENTRIES = 48  # ~2 MB of samples each; hub x hour x day combos are revisited a lot
+RISK_LEVELS = ((0.02, "LOW"), (0.10, "MED"))  # P(miss security) below each bound
+
+@st.cache_resource(show_spinner=False, max_entries=RISK_CACHE_ENTRIES)
+def _risk_model_at(hub_id: str, version: int, arrival_hour: int, day_of_week: str) -> Optional[RiskModel]:
+    # Monte Carlo logistics for one hub/hour/day (risk.py); shared draws, so reruns agree
+    data = _load_hub_data_at(hub_id, version) or {}
+    airport = Airport(data)
+    if not airport.is_v3_ready():
+        return None
+    f = airport.factors
+    reliability = f.get("transport_reliability_score", f.get("transit_ease", DEFAULT_RELIABILITY))
+    immigration_mins, immigration_cv, transit_cv = airport.get_immigration_time(arrival_hour, day_of_week) * 60, None, None
+    live_imm = airport.live_quantiles("immigration", arrival_hour, day_of_week)
+    if live_imm:
+        immigration_mins, immigration_cv = lognormal_from_quantiles(*live_imm)
+    live_transit = airport.live_quantiles("transit", arrival_hour, day_of_week)
+    if live_transit:
+        transit_cv = lognormal_from_quantiles(*live_transit)[1]
+    return RiskModel(
+        immigration_mins=immigration_mins,
+        security_mins=airport.get_security_buffer() * 60,
+        reliability=reliability,
+        traffic=airport.traffic_multiplier(arrival_hour, day_of_week),
+        efficiency=f.get("efficiency"),
+        immigration_cv=immigration_cv,
+        transit_cv=transit_cv,
+    )
+
+def get_risk_model(hub_id: str, arrival_hour: int, day_of_week: str = "Monday") -> Optional[RiskModel]:
+    return _risk_model_at(hub_id, hub_version(hub_id), int(arrival_hour), day_of_week)
+
+def _fmt_clock(arrival_hour, mins):
+    t = int(arrival_hour * 60 + mins) % 1440
+    return f"{t // 60:02d}:{t % 60:02d}"
+
+def plan_risk(ranked_items, layover_hours, hub_id=None, arrival_hour=None, day_of_week="Monday",
+              plan=None, confidence=DEFAULT_CONFIDENCE) -> Tuple[str, str, Optional[float]]:
+    """(level, reason, P(miss security) or None when only the threshold fallback applies)."""
+    if not ranked_items: return "UNKNOWN", "No activities.", None
     first_meta = ranked_items[0].get("explain", {}).get("v3_meta", {})
+    model = None
+    if hub_id and arrival_hour is not None and first_meta.get("method") == "V3_DYNAMIC":
+        model = get_risk_model(hub_id, arrival_hour, day_of_week)
+    if model is not None:
+        # 🎲 Probability of missing the security cutoff for the plan we'd actually show
+        plan = plan or plan_itinerary(ranked_items, arrival_hour, layover_hours)
+        res = model.assess(plan, layover_hours, confidence)
+        level = next((lvl for bound, lvl in RISK_LEVELS if res["p_miss"] < bound), "HIGH")
+        leave_by = _fmt_clock(arrival_hour, res["recommended_leave_mins"])
+        where = "the city" if plan.get("zone") == "LANDSIDE" else "your last stop"
+        reason = f"{res['p_miss']:.1%} chance of missing security · leave {where} by {leave_by} ({confidence:.0%} safe)"
+        return level, reason, res["p_miss"]
     if first_meta.get("method") == "V3_DYNAMIC":
         safe_time = layover_hours - first_meta.get("total_overhead_hours", 0)
         any_landside = any(it["activity"]["location"]["zone"] == "LANDSIDE" for it in ranked_items[:3])
-        if any_landside and safe_time < 1.0: return "HIGH", "Extremely tight window."
-        if any_landside and safe_time < 2.0: return "MED", "City trip rushed."
-        return "LOW", "Comfortable buffer."
-    return "LOW", "Standard buffer."
+        if any_landside and safe_time < 1.0: return "HIGH", "Extremely tight window.", None
+        if any_landside and safe_time < 2.0: return "MED", "City trip rushed.", None
+        return "LOW", "Comfortable buffer.", None
+    return "LOW", "Standard buffer.", None
+
+def compute_plan_risk(ranked_items, layover_hours, visa_valid, hub_id=None, arrival_hour=None,
+                      day_of_week="Monday", plan=None, confidence=DEFAULT_CONFIDENCE):
+    level, reason, _ = plan_risk(ranked_items, layover_hours, hub_id, arrival_hour, day_of_week, plan, confidence)
+    return level, reason
 
 def _open_score(act, arrival_hour, layover_hours):
     tc = act.get("time_constraints", {})
@@ -343,14 +620,21 @@ HUB_COORDS = {
     "ams": {"lat": 52.31, "lon": 4.76},   # Amsterdam
     "cdg": {"lat": 49.00, "lon": 2.55},   # Paris
 }
+WEATHER_TTL_SECS = 600  # Current conditions: one fetch per hub per 10 minutes, shared by all sessions
+
+@st.cache_data(ttl=WEATHER_TTL_SECS, show_spinner=False)
+def _fetch_current_weather(lat, lon):
+    # Raises on failure, so a failed fetch is retried next time instead of cached
+    url = f"https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={lon}&current=temperature_2m,weather_code,is_day"
+    r = requests.get(url, timeout=2)
+    r.raise_for_status()
+    return r.json().get("current", {})
+
 def get_real_weather(hub_id):
     coords = HUB_COORDS.get(hub_id)
     if not coords: return None
     try:
-        url = f"https://api.open-meteo.com/v1/forecast?latitude={coords['lat']}&longitude={coords['lon']}&current=temperature_2m,weather_code,is_day"
-        r = requests.get(url, timeout=2)
-        data = r.json()
-        current = data.get("current", {})
+        current = _fetch_current_weather(coords["lat"], coords["lon"])
         temp = current.get("temperature_2m", 25)
         code = current.get("weather_code", 0)
         is_day = current.get("is_day", 1)
@@ -366,78 +650,706 @@ def get_real_weather(hub_id):
 # ==========================================
 # 6. MAIN RANKER (UPDATED V3.5)
 # ==========================================
-def filter_and_rank_activities(hub_id, layover_hours, arrival_hour, user_query, visa_valid=False, day_of_week="Monday"):
-    data = load_hub_data(hub_id)
-    if not data: return []
+SEMANTIC_WEIGHT = 0.45
+PRUNE_BLOCK = 256  # Candidates scored per vectorised semantic pass in top-k mode
+LEXICAL_MIN_ACTIVITIES = 2000  # "auto" retrieval only prefilters hubs at least this big
+LEXICAL_TOP_N = 300            # BM25 candidates handed to the semantic rerank
+LEXICAL_MIN_HITS = 20          # Fewer lexical matches than this: score everything instead
+
+def _rank_context(hub_id, layover_hours, arrival_hour, user_query, visa_valid, day_of_week, q_emb=None, vibe=None,
+                  semantic=True):
+    # One version for the whole request: data and embeddings always match
+    version = hub_version(hub_id)
+    data = load_hub_data(hub_id, version)
+    if not data: return None
 
     # 1. Initialize V3 Logic with Day of Week
     airport = Airport(data)
     safe_landside_hours, calc_meta = calculate_safe_exploration_time(airport, layover_hours, arrival_hour, visa_valid, day_of_week)
     
     all_activities = data.get("activities", [])
-    if not all_activities: return []
+    if not all_activities: return None
+
+    # Per-activity city transit: distance bands from the hub, scaled by today's traffic
+    geo = _hub_geo_at(hub_id, version) if calc_meta.get("method") == "V3_DYNAMIC" else None
+    traffic = airport.traffic_multiplier(arrival_hour, day_of_week)
+    fixed_overhead = airport.get_immigration_time(arrival_hour, day_of_week) + airport.get_security_buffer() + SAFETY_PADDING_HOURS
 
-    q_lower = (user_query or "").lower()
-    vibe = analyze_vibe(user_query)
-    detected = set(vibe.get("labels", []))
+    # Callers ranking several hubs for one query pass these in: encoded once, not once per hub
+    if q_emb is None and semantic:
+        q_emb = encode_query(user_query or "")
+    if vibe is None:
+        vibe = analyze_vibe(user_query, q_emb) if semantic else keyword_vibe(user_query)
     
     is_zombie_hours = (arrival_hour >= 22 or arrival_hour <= 5)
-    sleep_mode = is_zombie_hours and (layover_hours < 12.0)
 
-    model = get_model()
-    texts = [f"{a.get('title','')} {a.get('type','')} {a.get('description','')}" for a in all_activities]
-    all_embs = model.encode(texts, convert_to_tensor=True)
-    q_emb = model.encode(user_query, convert_to_tensor=True)
-    
-    scored = []
-    
-    for idx, act in enumerate(all_activities):
-        zone = act["location"]["zone"]
-        min_dur = act["time_constraints"]["min_duration_hours"]
-        act_type = (act.get("type") or "").upper()
-
-        if zone == "LANDSIDE":
-            if not visa_valid: continue
-            if min_dur > safe_landside_hours: continue
-        else:
-            if min_dur > (layover_hours - 1.0): continue
+    return {
+        "version": version,
+        "activities": all_activities,
+        "embs": get_activity_embeddings(hub_id, version) if semantic else None,  # No encode on the degraded paths
+        "q_emb": q_emb,
+        "detected": set(vibe.get("labels", [])),
+        "sleep_mode": is_zombie_hours and (layover_hours < 12.0),
+        "safe_landside_hours": safe_landside_hours,
+        "calc_meta": calc_meta,
+        "geo": geo,
+        "transit_hours": None if geo is None else geo.transit_mins * (traffic / 60.0),
+        "traffic": traffic,
+        "fixed_overhead": fixed_overhead,
+        "layover_hours": layover_hours,
+        "arrival_hour": arrival_hour,
+        "visa_valid": visa_valid,
+    }
+
+def _cheap_terms(ctx, idx):
+    # Hard filters + every score term except semantic similarity (None = filtered out)
+    act = ctx["activities"][idx]
+    zone = act["location"]["zone"]
+    min_dur = act["time_constraints"]["min_duration_hours"]
+    act_type = (act.get("type") or "").upper()
+    layover_hours = ctx["layover_hours"]
+    safe_landside_hours = ctx["safe_landside_hours"]
+    transit_hours = None
 
-        open_factor, open_reasons = _open_score(act, arrival_hour, layover_hours)
-        if open_factor == 0.0: continue
+    if zone == "LANDSIDE":
+        if not ctx["visa_valid"]: return None
+        if ctx["transit_hours"] is not None:
+            # Round trip to *this* activity instead of the hub-wide city average
+            transit_hours = float(ctx["transit_hours"][idx])
+            safe_landside_hours = max(0.0, layover_hours - ctx["fixed_overhead"] - 2 * transit_hours)
+        if min_dur > safe_landside_hours: return None
+    else:
+        if min_dur > (layover_hours - 1.0): return None
 
-        a_emb = all_embs[idx]
-        semantic = float(util.pytorch_cos_sim(q_emb, a_emb).item())
-        semantic = _clamp((semantic + 1) / 2)
-        intent_match = 1.0 if act_type in detected else 0.0
+    open_factor, open_reasons = _open_score(act, ctx["arrival_hour"], layover_hours)
+    if open_factor == 0.0: return None
+
+    intent_match = 1.0 if act_type in ctx["detected"] else 0.0
+    
+    friction = 1.0 if zone == "AIRSIDE" else 0.7
+    if zone == "LANDSIDE" and safe_landside_hours < 2.0: friction = 0.4
         
-        friction = 1.0 if zone == "AIRSIDE" else 0.7
-        if zone == "LANDSIDE" and safe_landside_hours < 2.0: friction = 0.4
-            
-        if sleep_mode:
-            if zone == "LANDSIDE" and act_type in ["SIGHTS", "CULTURE", "SHOPPING"]:
-                friction *= 0.3
-                open_reasons.append("It's late/early. City vibe will be dead.")
-            if zone == "AIRSIDE" and act_type in ["SLEEP", "RELAX"]:
-                intent_match += 0.5 
-            if zone == "LANDSIDE" and act_type == "FOOD":
-                friction *= 0.8 
-
-        final = (0.45 * semantic) + (0.25 * intent_match) + (0.15 * friction) + (0.15 * open_factor)
+    if ctx["sleep_mode"]:
+        if zone == "LANDSIDE" and act_type in ["SIGHTS", "CULTURE", "SHOPPING"]:
+            friction *= 0.3
+            open_reasons.append("It's late/early. City vibe will be dead.")
+        if zone == "AIRSIDE" and act_type in ["SLEEP", "RELAX"]:
+            intent_match += 0.5 
+        if zone == "LANDSIDE" and act_type == "FOOD":
+            friction *= 0.8 
+
+    return {
+        "partial": (0.25 * intent_match) + (0.15 * friction) + (0.15 * open_factor),
+        "intent_match": intent_match,
+        "friction": friction,
+        "open_reasons": open_reasons,
+        "act_type": act_type,
+        "zone": zone,
+        "transit_hours": transit_hours,
+    }
+
+def _candidate_indices(ctx):
+    # Airside activities + landside ones whose own trip fits today's time budget (grid radius query first)
+    geo = ctx["geo"]
+    if geo is None:
+        return range(len(ctx["activities"]))
+    budget = ctx["layover_hours"] - ctx["fixed_overhead"]
+    if not ctx["visa_valid"] or budget <= 0:
+        return geo.airside_idx.tolist()
+    return np.union1d(geo.airside_idx, geo.landside_fitting(budget, ctx["traffic"])).tolist()
+
+@st.cache_resource(show_spinner=False, max_entries=HUB_CACHE_ENTRIES)
+def _activity_positions_at(hub_id: str, version: int) -> Dict[str, int]:
+    data = _load_hub_data_at(hub_id, version) or {}
+    return {a.get("id"): i for i, a in enumerate(data.get("activities", []))}
+
+def _lexical_indices(hub_id, version, user_query) -> Optional[np.ndarray]:
+    # BM25 top-N from the FTS5 index (catalog.py), as activity indices; None = not usable here
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        ids = search_activity_fts(conn, hub_id, user_query, LEXICAL_TOP_N)
+    finally:
+        conn.close()
+    if ids is None or len(ids) < LEXICAL_MIN_HITS:
+        return None
+    positions = _activity_positions_at(hub_id, version)
+    idxs = [positions[i] for i in ids if i in positions]
+    return np.array(sorted(idxs), dtype=np.int64) if len(idxs) >= LEXICAL_MIN_HITS else None
+
+def _candidates(ctx, only=None):
+    out = []
+    idxs = _candidate_indices(ctx)
+    if only is not None:
+        idxs = np.intersect1d(np.asarray(idxs, dtype=np.int64), only).tolist()
+    for idx in idxs:
+        terms = _cheap_terms(ctx, idx)
+        if terms is not None:
+            out.append((idx, terms))
+    return out
+
+def _semantic_scores(ctx, idxs) -> np.ndarray:
+    sims = ctx["embs"].dot(ctx["q_emb"], idxs)
+    return np.clip((sims + 1) / 2, 0.0, 1.0)
+
+def _build_item(ctx, idx, final, terms):
+    act = ctx["activities"][idx]
+    meta = ctx["calc_meta"]
+    if terms["transit_hours"] is not None:
+        # Logistics for this activity's own trip (read by the breakdown and the timeline)
+        meta = dict(meta,
+                    transit_mins=round(terms["transit_hours"] * 120),
+                    total_overhead_hours=round(ctx["fixed_overhead"] + 2 * terms["transit_hours"], 2),
+                    distance_km=round(float(ctx["geo"].dist_km[idx]), 1))
+    reasons = []
+    if terms["intent_match"] > 0.8: reasons.append(f"Matches '{terms['act_type']}' vibe.")
+    if ctx["sleep_mode"] and terms["zone"] == "AIRSIDE": reasons.append("Best option for a short overnight stay.")
         
-        reasons = []
-        if intent_match > 0.8: reasons.append(f"Matches '{act_type}' vibe.")
-        if sleep_mode and zone == "AIRSIDE": reasons.append("Best option for a short overnight stay.")
-            
-        scored.append({
-            "activity": act,
-            "score": round(final * 100, 1),
-            "risk_level": "LOW" if friction > 0.6 else "MED",
-            "explain": {
-                "reasons": reasons,
-                "tradeoffs": open_reasons,
-                "v3_meta": calc_meta
-            }
-        })
+    return {
+        "activity": act,
+        "score": round(final * 100, 1),
+        "risk_level": "LOW" if terms["friction"] > 0.6 else "MED",
+        "explain": {
+            "reasons": reasons,
+            "tradeoffs": terms["open_reasons"],
+            "v3_meta": meta
+        }
+    }
+
+@profiling.profile_calls("plan")
+def filter_and_rank_activities(hub_id, layover_hours, arrival_hour, user_query, visa_valid=False, day_of_week="Monday",
+                               retrieval="auto"):
+    """Every eligible activity, best first.
+
+    retrieval="lexical" scores only the BM25 top LEXICAL_TOP_N (then the
+    semantic rerank); "full" scores everything; "auto" goes lexical for big
+    hubs. Too few lexical matches always falls back to full scoring.
+    """
+    ctx = _rank_context(hub_id, layover_hours, arrival_hour, user_query, visa_valid, day_of_week)
+    if ctx is None: return []
 
+    only = None
+    if retrieval == "lexical" or (retrieval == "auto" and len(ctx["activities"]) >= LEXICAL_MIN_ACTIVITIES):
+        only = _lexical_indices(hub_id, ctx["version"], user_query)
+    cands = _candidates(ctx, only)
+    if not cands: return []
+    semantic = _semantic_scores(ctx, [idx for idx, _ in cands])
+
+    scored = [
+        _build_item(ctx, idx, terms["partial"] + SEMANTIC_WEIGHT * float(sem), terms)
+        for (idx, terms), sem in zip(cands, semantic)
+    ]
     scored.sort(key=lambda x: x["score"], reverse=True)
-    return scored
\ No newline at end of file
+    return scored
+
+# ==========================================
+# 7. TOP-K RANKER (PAGINATED)
+# ==========================================
+def _page_signature(*params) -> str:
+    return hashlib.sha1(repr(params).encode("utf-8")).hexdigest()[:12]
+
+def _encode_page_token(offset: int, sig: str) -> str:
+    raw = json.dumps({"o": offset, "s": sig}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+def _decode_page_token(token: str, sig: str) -> int:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+        offset, token_sig = int(payload["o"]), payload["s"]
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Malformed page token.")
+    if token_sig != sig or offset < 0:
+        raise ValueError("Page token does not belong to this query.")
+    return offset
+
+@profiling.profile_calls("plan_top_k")
+def rank_top_activities(hub_id, layover_hours, arrival_hour, user_query, visa_valid=False,
+                        day_of_week="Monday", k=10, page_token=None, q_emb=None, vibe=None) -> Dict[str, Any]:
+    """Same ranking as filter_and_rank_activities, but only the page asked for.
+
+    Candidates are visited in order of their score without the semantic term;
+    since semantic similarity adds at most SEMANTIC_WEIGHT, a block whose best
+    upper bound cannot beat the current k-th score ends the scan.
+    """
+    sig = _page_signature(hub_id, layover_hours, arrival_hour, user_query, visa_valid, day_of_week)
+    offset = _decode_page_token(page_token, sig) if page_token else 0
+    result = {"items": [], "next_page_token": None, "candidates": 0, "scored": 0}
+
+    ctx = _rank_context(hub_id, layover_hours, arrival_hour, user_query, visa_valid, day_of_week, q_emb, vibe)
+    if ctx is None: return result
+    cands = _candidates(ctx)
+    cands.sort(key=lambda c: (-c[1]["partial"], c[0]))
+    want = offset + k
+
+    heap = []  # Min-heap of the best `want` as (score, -idx, idx, final, terms)
+    scored = 0
+    for start in range(0, len(cands), PRUNE_BLOCK):
+        block = cands[start:start + PRUNE_BLOCK]
+        if len(heap) >= want:
+            bound = round((block[0][1]["partial"] + SEMANTIC_WEIGHT) * 100, 1)
+            if bound < heap[0][0]:
+                break
+        semantic = _semantic_scores(ctx, [idx for idx, _ in block])
+        scored += len(block)
+        for (idx, terms), sem in zip(block, semantic):
+            final = terms["partial"] + SEMANTIC_WEIGHT * float(sem)
+            entry = (round(final * 100, 1), -idx, idx, final, terms)
+            if len(heap) < want:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+
+    top = sorted(heap, key=lambda e: (e[0], e[1]), reverse=True)[offset:want]
+    result["items"] = [_build_item(ctx, idx, final, terms) for _, _, idx, final, terms in top]
+    result["candidates"] = len(cands)
+    result["scored"] = scored
+    if len(cands) > want:
+        result["next_page_token"] = _encode_page_token(want, sig)
+    return result
+
+# ==========================================
+# 8. MATERIALIZED PLAN TABLE (plantable.py)
+# ==========================================
+# Grid built offline by scripts/build_plan_table.py. Passports only matter
+# through the visa outcome, so both outcomes are materialized for every hub.
+PLAN_TABLE_HOURS = [4.0, 6.0, 8.0, 12.0, 24.0]
+PLAN_TABLE_K = 5  # The app's first results page
+PLAN_TABLE_QUERIES = [apply_refinement(DEFAULT_QUERY, mode) for mode in REFINE_MODES]
+
+def plan_table_axes(hub_ids: List[str]) -> Dict[str, List[Any]]:
+    return {
+        "hub": list(hub_ids),
+        "arrival_hour": list(range(24)),
+        "day": list(DAYS),
+        "hours": list(PLAN_TABLE_HOURS),
+        "visa_valid": [False, True],
+        "query": list(PLAN_TABLE_QUERIES),
+    }
+
+def materialize_plan(hub, arrival_hour, day, hours, visa_valid, query, q_emb, vibe) -> Dict[str, Any]:
+    # One grid cell: first page, itinerary and risk, with activity indices instead of item dicts
+    page = rank_top_activities(hub, hours, arrival_hour, query, visa_valid, day,
+                               k=PLAN_TABLE_K, q_emb=q_emb, vibe=vibe)
+    items = page["items"]
+    positions = _activity_positions_at(hub, hub_version(hub))
+    plan = plan_itinerary(items, arrival_hour, hours) if items else None
+    rec = {
+        "idxs": [positions[it["activity"]["id"]] for it in items],
+        "scores": [it["score"] for it in items],
+        "has_more": page["next_page_token"] is not None,
+        "risk": plan_risk(items, hours, hub, arrival_hour, day, plan),
+        "plan": None,
+    }
+    if plan is not None:
+        slot = {id(it): i for i, it in enumerate(items)}
+        rec["plan"] = dict(plan, stops=[(slot[id(s["item"])], s) for s in plan["stops"]])
+    return rec
+
+_plan_table_hits = {"hits": 0, "misses": 0}
+_plan_table_lock = threading.Lock()
+
+def _plan_from_table(hub_id, layover_hours, arrival_hour, user_query, visa_valid, day_of_week, k):
+    # Exact grid hit: rebuild the page, itinerary and risk without the model (None = compute live)
+    table = get_plan_table()
+    if table is None or k != table.k:
+        return None
+    version = hub_version(hub_id)
+    rec = table.lookup(hub_id, version, arrival_hour, day_of_week, layover_hours, visa_valid, user_query)
+    with _plan_table_lock:
+        _plan_table_hits["hits" if rec is not None else "misses"] += 1
+    if rec is None:
+        return None
+    vibe = {"intents": [], "labels": table.vibes.get(user_query, [])}
+    # semantic=False: no query encode and no hub embeddings, so a hit never loads the model
+    ctx = _rank_context(hub_id, layover_hours, arrival_hour, user_query, visa_valid, day_of_week,
+                        vibe=vibe, semantic=False)
+    if ctx is None or ctx["version"] != version:
+        return None
+    items = []
+    for idx, score in zip(rec["idxs"], rec["scores"]):
+        terms = _cheap_terms(ctx, idx)
+        if terms is None:
+            return None  # Table and catalog disagree: compute live
+        items.append(_build_item(ctx, idx, score / 100, terms))
+    plan = None
+    if rec["plan"] is not None:
+        plan = dict(rec["plan"], solve_ms=0.0,
+                    stops=[dict(stop, item=items[pos]) for pos, stop in rec["plan"]["stops"]])
+    sig = _page_signature(hub_id, layover_hours, arrival_hour, user_query, visa_valid, day_of_week)
+    level, reason, _ = rec["risk"]
+    return {
+        "items": items,
+        "next_page_token": _encode_page_token(k, sig) if rec["has_more"] else None,
+        "candidates": 0,
+        "scored": 0,
+        "plan": plan,
+        "risk": (level, reason),
+    }
+
+# ==========================================
+# 9. ADMISSION CONTROL (GRACEFUL DEGRADATION)
+# ==========================================
+PLAN_CACHE_ENTRIES = 512   # Full-quality pages, keyed by request + hub version
+SHORTLIST_SCAN = 200       # Precomputed airside rows checked per degraded request
+
+@st.cache_resource(show_spinner=False)
+def get_admission() -> AdmissionController:
+    # One controller per process: every session's planning requests share the budget
+    return AdmissionController(queue_depth=get_query_batcher().pending)
+
+_plan_cache: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+_plan_cache_lock = threading.Lock()
+_plan_cache_hits = {"hits": 0, "misses": 0}
+
+def _plan_cache_get(key) -> Optional[Dict[str, Any]]:
+    with _plan_cache_lock:
+        result = _plan_cache.get(key)
+        if result is not None:
+            _plan_cache.move_to_end(key)
+        _plan_cache_hits["hits" if result is not None else "misses"] += 1
+        return result
+
+def _plan_cache_put(key, result):
+    with _plan_cache_lock:
+        _plan_cache[key] = result
+        _plan_cache.move_to_end(key)
+        while len(_plan_cache) > PLAN_CACHE_ENTRIES:
+            _plan_cache.popitem(last=False)
+
+def _lexical_ranks(hub_id, version, user_query) -> Dict[int, float]:
+    # BM25 order mapped onto [0, 1] (best = 1), standing in for semantic similarity
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        ids = search_activity_fts(conn, hub_id, user_query, LEXICAL_TOP_N) or []
+    finally:
+        conn.close()
+    positions = _activity_positions_at(hub_id, version)
+    idxs = [positions[i] for i in ids if i in positions]
+    return {idx: 1.0 - r / len(idxs) for r, idx in enumerate(idxs)}
+
+@st.cache_resource(show_spinner=False, max_entries=HUB_CACHE_ENTRIES)
+def _airside_shortlist_at(hub_id: str, version: int) -> np.ndarray:
+    # Airside activities, round-the-clock first, then quickest: the last-resort plan table
+    cols = dict(zip(NUMERIC_COLUMNS, _activity_columns_at(hub_id, version).T))
+    idx = np.flatnonzero(cols["is_landside"] == 0)
+    order = np.lexsort((idx, cols["min_duration_hours"][idx], -cols["is_24h"][idx]))
+    table = idx[order]
+    table.setflags(write=False)
+    return table
+
+def _degraded_page(hub_id, layover_hours, arrival_hour, user_query, visa_valid, day_of_week, k, level):
+    # No encode: BM25 rank (LEXICAL) or nothing (SHORTLIST) in place of the semantic term
+    result = {"items": [], "next_page_token": None, "candidates": 0, "scored": 0}
+    ctx = _rank_context(hub_id, layover_hours, arrival_hour, user_query, visa_valid, day_of_week, semantic=False)
+    if ctx is None: return result
+    if level == LEXICAL:
+        lexical = _lexical_ranks(hub_id, ctx["version"], user_query)
+        cands = _candidates(ctx)
+    else:
+        lexical = {}
+        table = _airside_shortlist_at(hub_id, ctx["version"])[:SHORTLIST_SCAN].tolist()
+        cands = [(idx, terms) for idx, terms in ((i, _cheap_terms(ctx, i)) for i in table) if terms is not None]
+    top = heapq.nlargest(k, ((terms["partial"] + SEMANTIC_WEIGHT * lexical.get(idx, 0.0), -idx, idx, terms)
+                             for idx, terms in cands))
+    result["items"] = [_build_item(ctx, idx, final, terms) for final, _, idx, terms in top]
+    result["candidates"] = len(cands)
+    return result
+
+def plan_activities(hub_id, layover_hours, arrival_hour, user_query, visa_valid=False,
+                    day_of_week="Monday", k=10, page_token=None) -> Dict[str, Any]:
+    """rank_top_activities behind the admission controller (admission.py).
+
+    Exact grid hits of the materialized plan table come first and also carry
+    "plan" and "risk". The result's "degradation" names the level served.
+    A cached page wins at every level. Under load, first pages are ranked
+    lexically or from the airside shortlist without a continuation token, and
+    a "load more" is deferred: no items, same token, degradation "deferred".
+    """
+    args = (hub_id, layover_hours, arrival_hour, user_query, visa_valid, day_of_week)
+    if page_token is None:
+        result = _plan_from_table(*args, k)
+        if result is not None:
+            return dict(result, degradation=LEVELS[FULL])
+    key = (args, hub_version(hub_id), k, page_token)
+    with get_admission().admit() as ticket:
+        result = _plan_cache_get(key)
+        if result is not None:
+            ticket.served = CACHED
+        elif ticket.level <= CACHED:
+            result = rank_top_activities(*args, k=k, page_token=page_token)
+            _plan_cache_put(key, result)
+            ticket.served = FULL
+        elif page_token:
+            result = {"items": [], "next_page_token": page_token, "candidates": 0, "scored": 0}
+            ticket.deferred = True
+        else:
+            result = _degraded_page(*args, k, ticket.level)
+    return dict(result, degradation=ticket.name)
+
+def planning_stats() -> Dict[str, Any]:
+    with _plan_cache_lock:
+        cache = dict(_plan_cache_hits, entries=len(_plan_cache))
+    table = get_plan_table()
+    return {
+        "admission": get_admission().stats(),
+        "plan_cache": cache,
+        "plan_table": dict(_plan_table_hits, version=table.version if table is not None else None),
+        "encoder": get_query_batcher().stats(),
+    }
+
+# ==========================================
+# 10. CROSS-HUB PLAN COMPARISON
+# ==========================================
+COMPARE_WORKERS = 8
+COMPARE_TOP_K = 10  # Ranked items per hub handed to the itinerary solver
+
+def _hub_plan_summary(hub_id, layover_hours, arrival_hour, passport, day_of_week, user_query, q_emb, vibe,
+                      has_visa=False):
+    visa_valid, visa_type, _ = check_visa_status(hub_id, passport)
+    visa_valid = visa_valid or has_visa
+    page = rank_top_activities(hub_id, layover_hours, arrival_hour, user_query, visa_valid, day_of_week,
+                               k=COMPARE_TOP_K, q_emb=q_emb, vibe=vibe)
+    items = page["items"]
+    if not items:
+        return None
+    safe_hours, _ = calculate_safe_exploration_time(Airport(load_hub_data(hub_id)), layover_hours,
+                                                    arrival_hour, visa_valid, day_of_week)
+    plan = plan_itinerary(items, arrival_hour, layover_hours)
+    level, reason, p_miss = plan_risk(items, layover_hours, hub_id, arrival_hour, day_of_week, plan)
+    stops = [s["item"] for s in plan["stops"]]
+    # Plan quality: score of what actually fits, discounted by the chance of missing the flight
+    quality = plan["total_score"] * (1.0 - (p_miss or 0.0))
+    return {
+        "hub_id": hub_id,
+        "quality": round(quality, 1),
+        "plan_score": plan["total_score"],
+        "stops": len(stops),
+        "zone": plan["zone"],
+        "top_pick": items[0]["activity"]["title"],
+        "top_score": items[0]["score"],
+        "safe_hours": round(safe_hours, 1),
+        "visa_valid": visa_valid,
+        "visa_type": visa_type,
+        "risk_level": level,
+        "risk_reason": reason,
+        "p_miss": p_miss,
+        "plan": plan,
+    }
+
+def compare_hubs(hub_ids, layover_hours, arrival_hour, passport="India", day_of_week="Monday", user_query="",
+                 visa_overrides=None):
+    """Full ranking + itinerary + risk per hub, fanned out over a thread pool, best plan first.
+
+    The query is encoded (and its vibe detected) once up front and shared by
+    every hub. Per-hub caches are keyed by version, so workers share them too.
+    `visa_overrides` maps hub ids to True where the traveller already holds a visa.
+    """
+    hub_ids = [h for h in hub_ids if h]
+    if not hub_ids:
+        return []
+    q_emb = encode_query(user_query or "")
+    vibe = analyze_vibe(user_query, q_emb)
+    args = (layover_hours, arrival_hour, passport, day_of_week, user_query, q_emb, vibe)
+    with ThreadPoolExecutor(max_workers=min(COMPARE_WORKERS, len(hub_ids)), thread_name_prefix="layover-compare") as pool:
+        results = list(pool.map(lambda h: _hub_plan_summary(h, *args, has_visa=(visa_overrides or {}).get(h, False)),
+                                 hub_ids))
+    ranked = [r for r in results if r is not None]
+    ranked.sort(key=lambda r: (r["quality"], r["top_score"]), reverse=True)
+    return ranked
+
+# ==========================================
+# 11. GLOBAL ACTIVITY SEARCH (ALL HUBS)
+# ==========================================
+SEARCH_HUB_HITS = 3  # A hub's score is the mean of its best few matches
+
+@st.cache_resource(show_spinner="Indexing activities...", max_entries=1)
+def _activity_index_at(versions: Tuple[Tuple[str, int], ...]) -> Optional[Tuple[ActivityIndex, np.ndarray]]:
+    # Keyed by every hub's version: any catalog write builds a fresh index
+    hub_ids, embs, cols, sizes = [], [], [], []
+    for hub_id, version in versions:
+        e = _activity_embeddings_at(hub_id, version)
+        if len(e):
+            hub_ids.append(hub_id)
+            embs.append(e)
+            cols.append(_activity_columns_at(hub_id, version))
+            sizes.append(len(e))
+    if not embs:
+        return None
+    hub_of_row = np.repeat(np.arange(len(hub_ids)), sizes)
+    index = ActivityIndex(Vectors.concat(embs), hub_ids, hub_of_row, np.concatenate(cols))
+    return index, np.concatenate([[0], np.cumsum(sizes)])
+
+def get_activity_index() -> Optional[Tuple[ActivityIndex, np.ndarray]]:
+    # (index, first global row of each indexed hub)
+    return _activity_index_at(tuple(sorted(get_catalog_watcher().versions().items())))
+
+def search_activities(user_query, k=20, hub_ids=None, zone=None, day_of_week=None, arrival_hour=None):
+    """Best-matching activities across every hub (or just `hub_ids`), optionally open at a given hour."""
+    built = get_activity_index()
+    if built is None:
+        return []
+    index, starts = built
+    how = None
+    if arrival_hour is not None:
+        how = DAYS.index(day_of_week) * 24 + int(arrival_hour) if day_of_week in DAYS else int(arrival_hour)
+    rows, scores = index.search(encode_query(user_query or ""), k, hubs=hub_ids, zone=zone, hour_of_week=how)
+    out = []
+    for row, sim in zip(rows.tolist(), scores.tolist()):
+        h = int(np.searchsorted(starts, row, side="right")) - 1
+        hub_id = index.hub_ids[h]
+        out.append({
+            "hub_id": hub_id,
+            "activity": load_hub_data(hub_id)["activities"][row - starts[h]],
+            "similarity": round(sim, 4),
+        })
+    return out
+
+def hubs_for_query(user_query, k=50, zone=None, day_of_week=None, arrival_hour=None):
+    """Hubs ranked by how well their best activities match the query, e.g. 'spa and street food'."""
+    by_hub: Dict[str, List[Dict[str, Any]]] = {}
+    for hit in search_activities(user_query, k, zone=zone, day_of_week=day_of_week, arrival_hour=arrival_hour):
+        by_hub.setdefault(hit["hub_id"], []).append(hit)
+    ranked = [
+        {"hub_id": h, "score": round(sum(x["similarity"] for x in hits[:SEARCH_HUB_HITS]) / SEARCH_HUB_HITS, 4),
+         "matches": [x["activity"]["title"] for x in hits[:SEARCH_HUB_HITS]]}
+        for h, hits in by_hub.items()
+    ]
+    ranked.sort(key=lambda r: r["score"], reverse=True)
+    return ranked
+
+# ==========================================
+# 12. WHAT-IF SWEEP (VECTORISED)
+# ==========================================
+SWEEP_HOURS = [3.0, 4.0, 6.0, 8.0, 10.0, 12.0, 16.0, 24.0]
+SWEEP_TOP_K = 3
+SWEEP_BLOCK = 1 << 21  # Cells x activities evaluated per vectorised block
+
+@st.cache_resource(show_spinner=False, max_entries=HUB_CACHE_ENTRIES)
+def _sweep_columns_at(hub_id: str, version: int) -> Dict[str, np.ndarray]:
+    # The fields _cheap_terms / _open_score read, as float64 arrays of the exact catalog values
+    acts = (_load_hub_data_at(hub_id, version) or {}).get("activities", [])
+    tcs = [a.get("time_constraints", {}) for a in acts]
+    types = np.array([(a.get("type") or "").upper() for a in acts], dtype=object)
+    cols = {
+        "min_dur": np.array([a["time_constraints"]["min_duration_hours"] for a in acts], dtype=np.float64),
+        "open": np.array([tc.get("opening_hour_24", 0) for tc in tcs], dtype=np.float64),
+        "close": np.array([tc.get("closing_hour_24", 24) for tc in tcs], dtype=np.float64),
+        "is_24h": np.array([bool(tc.get("is_24h", False)) for tc in tcs], dtype=bool),
+        "landside": np.array([a["location"]["zone"] == "LANDSIDE" for a in acts], dtype=bool),
+        "sleep_dull": np.isin(types, ["SIGHTS", "CULTURE", "SHOPPING"]),
+        "sleep_rest": np.isin(types, ["SLEEP", "RELAX"]),
+        "food": types == "FOOD",
+        "types": types,
+    }
+    for arr in cols.values():
+        arr.setflags(write=False)
+    return cols
+
+def _sweep_open_factor(cols, a, h) -> np.ndarray:
+    # _open_score for [cells, 1] arrival hours / layovers against every activity
+    o, c = cols["open"], cols["close"]
+    wait = np.mod(o - a, 24)
+    waits_ok = (h >= 10.0) & (0 < wait) & (wait < h)
+    closed_all = (h >= 10.0) & ~waits_ok & (wait > h)
+    in_window = np.where(c >= o, ((o <= a) & (a <= c)) | ((o <= a + 24) & (a + 24 <= c)), (a >= o) | (a <= c))
+    opens_soon = (wait <= 1.0) & ((h - wait) > 3.0)
+    best_close = np.minimum(np.where(c >= a, c, np.inf), np.where((c < o) & (c + 24.0 >= a), c + 24.0, np.inf))
+    closes_soon = np.isfinite(best_close) & (best_close - a <= 2.0)
+    factor = np.where(in_window, np.where(closes_soon, 0.6, 1.0), np.where(opens_soon, 0.8, 0.0))
+    factor = np.where(closed_all, 0.0, np.where(waits_ok, 1.0, factor))
+    return np.where(cols["is_24h"], 1.0, factor)
+
+def _sweep_scores(base, cols, sem, cells) -> np.ndarray:
+    """Final scores [cells, activities] (-inf = filtered), mirroring _candidate_indices + _cheap_terms."""
+    h = cells["hours"][:, None]
+    a = cells["arrival_hour"][:, None]
+    fixed, traffic = cells["fixed_overhead"][:, None], cells["traffic"][:, None]
+    land = cols["landside"]
+    geo = base["geo"]
+
+    if geo is not None:
+        # Per-activity round trip; the candidate prefilter drops landside picks whose trip cannot fit
+        transit = geo.transit_mins * (traffic / 60.0)
+        safe = np.maximum(0.0, h - fixed - 2 * transit)
+        budget = h - fixed
+        trip = 2 * geo.transit_mins * (traffic / 60.0) + geo.min_duration_hours
+        land_ok = (budget > 0) & (trip <= budget + 1e-4) & (cols["min_dur"] <= safe)
+    else:
+        safe = np.broadcast_to(cells["safe_landside_hours"][:, None], (len(h), len(land)))
+        land_ok = cols["min_dur"] <= safe
+    keep = np.where(land, land_ok & bool(base["visa_valid"]), cols["min_dur"] <= h - 1.0)
+
+    open_factor = _sweep_open_factor(cols, a, h)
+    keep &= open_factor != 0.0
+
+    intent = np.isin(cols["types"], list(base["detected"])).astype(np.float64)
+    friction = np.where(land, np.where(safe < 2.0, 0.4, 0.7), 1.0)
+    sleep = cells["sleep_mode"][:, None]
+    friction = np.where(sleep & land & cols["sleep_dull"], friction * 0.3, friction)
+    friction = np.where(sleep & land & cols["food"], friction * 0.8, friction)
+    intent = np.where(sleep & ~land & cols["sleep_rest"], intent + 0.5, intent)
+
+    partial = (0.25 * intent) + (0.15 * friction) + (0.15 * open_factor)
+    final = partial + SEMANTIC_WEIGHT * sem
+    return np.where(keep, final, -np.inf)
+
+def sweep_activities(hub_id, user_query, visa_valid=False, hours=None, arrival_hours=None, days=None,
+                     k=SWEEP_TOP_K, with_risk=True) -> List[Dict[str, Any]]:
+    """What-if grid: top `k` activities (and plan risk) for every (day, arrival_hour, hours) cell.
+
+    The query is encoded once and its similarity to each activity computed
+    once. Filters and scores for all cells are evaluated as cells x activities
+    arrays; each cell's top k matches rank_top_activities for the same inputs.
+    "quality" is compare_hubs' plan quality (0 when nothing fits); it needs the
+    itinerary and risk, so it is None when `with_risk` is False.
+    """
+    hours = [float(h) for h in (SWEEP_HOURS if hours is None else hours)]
+    arrival_hours = list(range(24) if arrival_hours is None else arrival_hours)
+    days = list(DAYS if days is None else days)
+    q_emb = encode_query(user_query or "")
+    vibe = analyze_vibe(user_query, q_emb)
+    base = _rank_context(hub_id, hours[0], arrival_hours[0], user_query, visa_valid, days[0], q_emb, vibe)
+    if base is None: return []
+    cols = _sweep_columns_at(hub_id, base["version"])
+    n = len(base["activities"])
+    sem = _semantic_scores(base, np.arange(n)).astype(np.float64)
+
+    # Logistics per cell: a few scalar formulas, shared by the vectorised pass and the item details
+    airport = Airport(load_hub_data(hub_id, base["version"]))
+    grid, metas = [], []
+    for day in days:
+        for arr in arrival_hours:
+            traffic = airport.traffic_multiplier(arr, day)
+            fixed = airport.get_immigration_time(arr, day) + airport.get_security_buffer() + SAFETY_PADDING_HOURS
+            for h in hours:
+                safe, meta = calculate_safe_exploration_time(airport, h, arr, visa_valid, day)
+                grid.append((h, arr, fixed, traffic, safe, (arr >= 22 or arr <= 5) and h < 12.0))
+                metas.append((day, meta))
+    cells = {name: np.array(col) for name, col in zip(
+        ("hours", "arrival_hour", "fixed_overhead", "traffic", "safe_landside_hours", "sleep_mode"), zip(*grid))}
+
+    out = []
+    step = max(1, SWEEP_BLOCK // max(n, 1))
+    for start in range(0, len(grid), step):
+        block = {name: col[start:start + step] for name, col in cells.items()}
+        final = _sweep_scores(base, cols, sem, block)
+        # rank_top_activities order: displayed score, then lower index first
+        order = np.argsort(-np.round(final * 100, 1), axis=1, kind="stable")[:, :k]
+        eligible = np.isfinite(final).sum(axis=1)
+        for r in range(len(final)):
+            (h, arr, fixed, traffic, safe, sleep_mode), (day, meta) = grid[start + r], metas[start + r]
+            ctx = dict(base, calc_meta=meta, safe_landside_hours=safe, fixed_overhead=fixed, traffic=traffic,
+                       layover_hours=h, arrival_hour=arr, sleep_mode=sleep_mode,
+                       transit_hours=None if base["geo"] is None else base["geo"].transit_mins * (traffic / 60.0))
+            top = [int(i) for i in order[r, :min(k, int(eligible[r]))]]
+            items = [_build_item(ctx, i, float(final[r, i]), _cheap_terms(ctx, i)) for i in top]
+            cell = {"day": day, "arrival_hour": arr, "hours": h, "items": items, "candidates": int(eligible[r]),
+                    "safe_hours": round(safe, 1), "risk_level": None, "risk_reason": None, "p_miss": None,
+                    "quality": 0.0 if with_risk else None}
+            if with_risk and items:
+                plan = plan_itinerary(items, arr, h)
+                level, reason, p_miss = plan_risk(items, h, hub_id, arr, day, plan)
+                # Same plan quality as compare_hubs: what fits, discounted by the chance of missing the flight
+                cell.update(risk_level=level, risk_reason=reason, p_miss=p_miss,
+                            quality=round(plan["total_score"] * (1.0 - (p_miss or 0.0)), 1))
+            out.append(cell)
+    return out
@@ -0,0 +1,210 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import itertools
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from snapshot import POINTER_FILE, prune_versions, publish_version
+
+# ==========================================
+# 1. LAYOUT
+# ==========================================
+# plantables/
+#   CURRENT                -> name of the active table (swapped with os.replace)
+#   <version>/index.json   -> grid axes, k, hub versions, vibe labels per query
+#   <version>/items.npy    -> int32 [cells, k] activity index per rank (-1 = none)
+#   <version>/scores.npy   -> float32 [cells, k] displayed score
+#   <version>/cells.npy    -> uint8 [cells] FILLED | HAS_MORE | LANDSIDE | EXACT
+#   <version>/risk.npy     -> float32 [cells, 2] RISK_CODES index, P(miss) (NaN = none)
+#   <version>/reasons.npy  -> uint8 UTF-8 risk reasons, sliced by reason_at.npy (int64 [cells + 1])
+#   <version>/plan.npy     -> float32 [cells, len(PLAN_FIELDS)] (NaN = field absent)
+#   <version>/stops.npy    -> float32 [cells, k, 1 + len(STOP_FIELDS)] page position (-1 = none), times
+#
+# The grid is dense and axes are fixed per table, so a request's row is a few
+# dict lookups plus arithmetic, and every worker maps the same pages.
+PLAN_TABLE_DIR = os.environ.get("LAYOVER_PLAN_TABLE_DIR", "plantables")
+AXES = ("hub", "arrival_hour", "day", "hours", "visa_valid", "query")
+FILLED, HAS_MORE, LANDSIDE, EXACT = 1, 2, 4, 8
+RISK_CODES = ("UNKNOWN", "LOW", "MED", "HIGH")
+PLAN_FIELDS = ("total_score", "immigration_mins", "security_mins", "start_mins",
+               "return_by_mins", "departure_mins", "return_transit_mins")
+STOP_FIELDS = ("travel_mins", "wait_mins", "start_mins", "end_mins")
+CHECK_INTERVAL_S = 1.0
+
+def table_version(catalog_version: str, axes: Dict[str, List[Any]], k: int) -> str:
+    # A grid change is a new table even when the catalog did not move
+    grid = hashlib.sha1(json.dumps([axes, k], sort_keys=True).encode("utf-8")).hexdigest()[:8]
+    return f"{catalog_version}-{grid}"
+
+# ==========================================
+# 2. BUILD (OFFLINE)
+# ==========================================
+def build_plan_table(
+    catalog_version: str,
+    hub_versions: Dict[str, int],
+    axes: Dict[str, List[Any]],
+    k: int,
+    solve: Callable[..., Optional[Dict[str, Any]]],
+    vibes: Dict[str, List[str]],
+    table_dir: str = PLAN_TABLE_DIR,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> str:
+    """Materializes `solve(**cell)` for every grid cell and makes the table current.
+
+    `solve` gets one value per axis and returns a record (see PlanTable.record)
+    or None to leave the cell empty. An existing table for the same catalog
+    version and grid is reused as is.
+    """
+    version = table_version(catalog_version, axes, k)
+    final_dir = os.path.join(table_dir, version)
+    if not os.path.isdir(final_dir):
+        shape = [len(axes[a]) for a in AXES]
+        cells = int(np.prod(shape))
+        items = np.full((cells, k), -1, dtype=np.int32)
+        scores = np.zeros((cells, k), dtype=np.float32)
+        flags = np.zeros(cells, dtype=np.uint8)
+        risk = np.full((cells, 2), np.nan, dtype=np.float32)
+        plan = np.full((cells, len(PLAN_FIELDS)), np.nan, dtype=np.float32)
+        stops = np.full((cells, k, 1 + len(STOP_FIELDS)), -1, dtype=np.float32)
+        reasons: List[bytes] = []
+
+        # Row order is itertools.product order: the same strides PlanTable uses
+        for row, values in enumerate(itertools.product(*(axes[a] for a in AXES))):
+            rec = solve(**dict(zip(AXES, values)))
+            if progress is not None and row % 1000 == 0:
+                progress(row, cells)
+            if rec is None:
+                reasons.append(b"")
+                continue
+            n = len(rec["idxs"])
+            items[row, :n] = rec["idxs"]
+            scores[row, :n] = rec["scores"]
+            flags[row] = FILLED | (HAS_MORE if rec["has_more"] else 0)
+            level, reason, p_miss = rec["risk"]
+            risk[row] = (RISK_CODES.index(level), np.nan if p_miss is None else p_miss)
+            reasons.append(reason.encode("utf-8"))
+            if rec["plan"] is not None:
+                p = rec["plan"]
+                flags[row] |= (LANDSIDE if p["zone"] == "LANDSIDE" else 0) | (EXACT if p["exact"] else 0)
+                plan[row] = [p.get(f, np.nan) for f in PLAN_FIELDS]
+                for j, (pos, stop) in enumerate(p["stops"][:k]):
+                    stops[row, j] = [pos] + [stop[f] for f in STOP_FIELDS]
+        if progress is not None:
+            progress(cells, cells)
+
+        reason_at = np.zeros(cells + 1, dtype=np.int64)
+        reason_at[1:] = np.cumsum([len(r) for r in reasons])
+        tmp_dir = os.path.join(table_dir, f".tmp-{version}-{os.getpid()}")
+        os.makedirs(tmp_dir, exist_ok=True)
+        for name, arr in (("items", items), ("scores", scores), ("cells", flags), ("risk", risk), ("plan", plan),
+                          ("stops", stops), ("reason_at", reason_at),
+                          ("reasons", np.frombuffer(b"".join(reasons), dtype=np.uint8))):
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), arr)
+        with open(os.path.join(tmp_dir, "index.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "version": version,
+                "built_at": time.time(),
+                "k": k,
+                "axes": axes,
+                "hubs": hub_versions,
+                "vibes": vibes,
+            }, f)
+        try:
+            os.rename(tmp_dir, final_dir)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)  # A concurrent build won the race
+
+    publish_version(table_dir, version)
+    prune_versions(table_dir, keep=version)
+    return version
+
+# ==========================================
+# 3. READ SIDE (EVERY WORKER PROCESS)
+# ==========================================
+class PlanTable:
+    def __init__(self, path: str):
+        with open(os.path.join(path, "index.json"), "r", encoding="utf-8") as f:
+            self.index = json.load(f)
+        self.version = self.index["version"]
+        self.k = self.index["k"]
+        self.hub_versions: Dict[str, int] = self.index["hubs"]
+        self.vibes: Dict[str, List[str]] = self.index["vibes"]
+        # Value -> position per axis; JSON gives 6.0 == 6 and True == 1 the same keys
+        self._pos = [{v: i for i, v in enumerate(self.index["axes"][a])} for a in AXES]
+        sizes = [len(p) for p in self._pos]
+        self._strides = [int(np.prod(sizes[i + 1:])) for i in range(len(sizes))]
+        load = lambda name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+        self.items, self.scores, self.cells = load("items"), load("scores"), load("cells")
+        self.risk, self.plan, self.stops = load("risk"), load("plan"), load("stops")
+        self.reason_at, self.reasons = load("reason_at"), load("reasons")
+
+    def row(self, hub_id: str, hub_version: int, arrival_hour, day, hours, visa_valid, query) -> Optional[int]:
+        if self.hub_versions.get(hub_id) != hub_version:
+            return None  # Hub edited since the build: its plans are stale
+        row = 0
+        for pos, stride, value in zip(self._pos, self._strides,
+                                      (hub_id, arrival_hour, day, hours, bool(visa_valid), query)):
+            i = pos.get(value)
+            if i is None:
+                return None
+            row += i * stride
+        return row if self.cells[row] & FILLED else None
+
+    def record(self, row: int) -> Dict[str, Any]:
+        """{"idxs", "scores", "has_more", "risk": (level, reason, p_miss), "plan"}.
+
+        "plan" holds PLAN_FIELDS, "zone", "exact" and "stops" as
+        (page position, {STOP_FIELDS}) pairs; None when the page is empty.
+        """
+        flags = int(self.cells[row])
+        idxs = [int(i) for i in self.items[row] if i >= 0]
+        code, p_miss = self.risk[row]
+        reason = bytes(self.reasons[self.reason_at[row]:self.reason_at[row + 1]]).decode("utf-8")
+        plan = None
+        if idxs:
+            plan = {f: float(v) for f, v in zip(PLAN_FIELDS, self.plan[row]) if not np.isnan(v)}
+            plan.update(zone="LANDSIDE" if flags & LANDSIDE else "AIRSIDE", exact=bool(flags & EXACT),
+                        stops=[(int(s[0]), {f: float(v) for f, v in zip(STOP_FIELDS, s[1:])})
+                               for s in self.stops[row] if s[0] >= 0])
+        return {
+            "idxs": idxs,
+            "scores": [float(s) for s in self.scores[row, :len(idxs)]],
+            "has_more": bool(flags & HAS_MORE),
+            "risk": (RISK_CODES[int(code)], reason, None if np.isnan(p_miss) else float(p_miss)),
+            "plan": plan,
+        }
+
+    def lookup(self, *key) -> Optional[Dict[str, Any]]:
+        row = self.row(*key)
+        return None if row is None else self.record(row)
+
+_lock = threading.Lock()
+_mapped: Dict[str, list] = {}  # Per table directory: [PlanTable or None, its name, last CURRENT check]
+
+def get_plan_table(table_dir: str = PLAN_TABLE_DIR) -> Optional[PlanTable]:
+    """Returns the current plan table, remapping when CURRENT points somewhere new."""
+    key = os.path.abspath(table_dir)
+    state = _mapped.get(key)
+    now = time.monotonic()
+    if state is not None and now - state[2] < CHECK_INTERVAL_S:
+        return state[0]
+    with _lock:
+        state = _mapped.setdefault(key, [None, None, 0.0])
+        state[2] = now
+        try:
+            with open(os.path.join(table_dir, POINTER_FILE), "r", encoding="utf-8") as f:
+                name = f.read().strip()
+        except OSError:
+            return state[0]
+        if name and name != state[1]:
+            try:
+                table = PlanTable(os.path.join(table_dir, name))
+            except (OSError, ValueError, KeyError):
+                return state[0]  # Half-pruned or corrupt: keep serving the old one
+            state[0], state[1] = table, name
+        return state[0]
@@ -0,0 +1,271 @@
+import os
+import sys
+import time
+import random
+import threading
+import tracemalloc
+import cProfile
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, Optional
+
+# ==========================================
+# 1. CONFIG (ENVIRONMENT CONTROLLED)
+# ==========================================
+# LAYOVER_PROFILE=off|sample|cprofile   -> profiler used for captured runs
+# LAYOVER_PROFILE_RATE=0.05             -> fraction of reruns/requests captured
+# LAYOVER_PROFILE_TRACEMALLOC=1         -> also dump top allocation sites
+PROFILE_MODE = os.environ.get("LAYOVER_PROFILE", "off").strip().lower()
+PROFILE_RATE = float(os.environ.get("LAYOVER_PROFILE_RATE", "0.05"))
+PROFILE_DIR = os.environ.get("LAYOVER_PROFILE_DIR", "profiles")
+PROFILE_KEEP = int(os.environ.get("LAYOVER_PROFILE_KEEP", "50"))
+SAMPLE_INTERVAL_MS = float(os.environ.get("LAYOVER_PROFILE_INTERVAL_MS", "5"))
+TRACE_ALLOCATIONS = os.environ.get("LAYOVER_PROFILE_TRACEMALLOC", "0") == "1"
+TRACE_FRAMES = int(os.environ.get("LAYOVER_PROFILE_TRACEMALLOC_FRAMES", "8"))
+TOP_ALLOCATIONS = 40
+
+def is_enabled() -> bool:
+    return PROFILE_MODE in ("sample", "cprofile")
+
+# ==========================================
+# 2. SAMPLING PROFILER (LOW OVERHEAD)
+# ==========================================
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class _StackSampler(threading.Thread):
+    """Polls one thread's stack on an interval and folds it into flamegraph stacks."""
+
+    def __init__(self, target_ident: int, interval_s: float):
+        super().__init__(name="layover-profiler", daemon=True)
+        self.target_ident = target_ident
+        self.interval_s = interval_s
+        self.stacks: Counter = Counter()
+        self._halt = threading.Event()
+
+    def run(self):
+        while not self._halt.wait(self.interval_s):
+            frame = sys._current_frames().get(self.target_ident)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def halt(self):
+        self._halt.set()
+        self.join()
+
+# ==========================================
+# 3. ALLOCATION TRACKING (SHARED TRACEMALLOC)
+# ==========================================
+# tracemalloc is process-wide, so overlapping captures share one session.
+_trace_lock = threading.Lock()
+_trace_users = 0
+_trace_owned = False
+
+def _tracemalloc_acquire():
+    global _trace_users, _trace_owned
+    with _trace_lock:
+        if _trace_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+            _trace_owned = True
+        _trace_users += 1
+
+def _tracemalloc_release():
+    global _trace_users, _trace_owned
+    with _trace_lock:
+        _trace_users = max(0, _trace_users - 1)
+        if _trace_users == 0 and _trace_owned:
+            tracemalloc.stop()
+            _trace_owned = False
+
+def _top_allocations(snapshot) -> str:
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    lines = [f"{'SIZE (KiB)':>12} | {'BLOCKS':>8} | SITE"]
+    for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]:
+        frame = stat.traceback[0]
+        lines.append(f"{stat.size / 1024:>12.1f} | {stat.count:>8} | {frame.filename}:{frame.lineno}")
+    return "\n".join(lines) + "\n"
+
+# ==========================================
+# 4. CAPTURE LIFECYCLE
+# ==========================================
+_active: Dict[int, "ProfileRun"] = {}
+_active_lock = threading.Lock()
+_seq_lock = threading.Lock()
+_run_seq = 0
+
+class ProfileRun:
+    def __init__(self, label: str):
+        global _run_seq
+        with _seq_lock:
+            _run_seq += 1
+            self.seq = _run_seq
+        self.label = label
+        self.thread_ident = threading.get_ident()
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self._sampler: Optional[_StackSampler] = None
+        self._cprofile: Optional[cProfile.Profile] = None
+        self._tracing = False
+
+    def start(self):
+        if TRACE_ALLOCATIONS:
+            _tracemalloc_acquire()
+            self._tracing = True
+        if PROFILE_MODE == "cprofile":
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        else:
+            self._sampler = _StackSampler(self.thread_ident, SAMPLE_INTERVAL_MS / 1000.0)
+            self._sampler.start()
+
+    def stop(self, status: str = "ok"):
+        elapsed_ms = (time.perf_counter() - self._t0) * 1000
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if self._sampler is not None:
+            self._sampler.halt()
+        snapshot = tracemalloc.take_snapshot() if self._tracing else None
+        if self._tracing:
+            _tracemalloc_release()
+        try:
+            self._write(elapsed_ms, status, snapshot)
+        except OSError:
+            pass  # Profiling must never take the request down with it
+
+    def _write(self, elapsed_ms: float, status: str, snapshot):
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started_at))
+        safe_label = "".join(ch if ch.isalnum() or ch in "-_" else "-" for ch in self.label)
+        stem = os.path.join(
+            PROFILE_DIR,
+            f"{stamp}_{os.getpid()}-{self.seq:06d}_{safe_label}_{status}_{int(elapsed_ms)}ms",
+        )
+        if self._cprofile is not None:
+            # Render with snakeviz, or `flameprof <file>.prof > flame.svg`
+            self._cprofile.dump_stats(stem + ".prof")
+        if self._sampler is not None:
+            # Collapsed stacks: feed to flamegraph.pl or speedscope as-is
+            with open(stem + ".folded", "w", encoding="utf-8") as f:
+                for stack, count in self._sampler.stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+        if snapshot is not None:
+            with open(stem + ".alloc.txt", "w", encoding="utf-8") as f:
+                f.write(_top_allocations(snapshot))
+        _rotate()
+
+def _rotate():
+    # Keep only the newest PROFILE_KEEP captures (a capture = all files sharing a stem)
+    try:
+        names = os.listdir(PROFILE_DIR)
+    except OSError:
+        return
+    stems = sorted({n.split(".", 1)[0] for n in names if n.endswith((".prof", ".folded", ".alloc.txt"))})
+    for stem in stems[:max(0, len(stems) - PROFILE_KEEP)]:
+        for name in names:
+            if name.split(".", 1)[0] == stem:
+                try:
+                    os.remove(os.path.join(PROFILE_DIR, name))
+                except OSError:
+                    pass
+
+def start_run(label: str) -> Optional[ProfileRun]:
+    """Starts a capture on the current thread, or returns None when not sampled."""
+    if not is_enabled() or random.random() >= PROFILE_RATE:
+        return None
+    ident = threading.get_ident()
+    with _active_lock:
+        if ident in _active:
+            return None  # Already inside a capture (e.g. a ranker call within a rerun)
+        run = ProfileRun(label)
+        _active[ident] = run
+    run.start()
+    return run
+
+def stop_run(run: Optional[ProfileRun], status: str = "ok"):
+    if run is None:
+        return
+    with _active_lock:
+        if _active.get(run.thread_ident) is run:
+            del _active[run.thread_ident]
+    run.stop(status)
+
+@contextmanager
+def profiled(label: str):
+    run = start_run(label)
+    status = "ok"
+    try:
+        yield run
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        stop_run(run, status)
+
+def profile_calls(label: str):
+    """Decorator for batch/API entry points: each call is one sampled capture."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with profiled(label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+# ==========================================
+# 5. STREAMLIT RERUN HOOKS
+# ==========================================
+# A Streamlit script has no single exit point (st.rerun / st.stop raise), so a
+# rerun is bracketed by begin/end and a capture left open by an interrupted
+# rerun is closed when the next rerun starts on the same script thread. Captures
+# whose script thread has exited (session closed mid-run) are closed then too.
+def _sweep_dead_runs():
+    alive = {t.ident for t in threading.enumerate()}
+    with _active_lock:
+        dead = [run for ident, run in _active.items() if ident not in alive]
+    for run in dead:
+        stop_run(run, "abandoned")
+
+def begin_rerun(label: str = "app") -> Optional[ProfileRun]:
+    if not is_enabled():
+        return None
+    _sweep_dead_runs()
+    with _active_lock:
+        dangling = _active.get(threading.get_ident())
+    if dangling is not None:
+        stop_run(dangling, "interrupted")
+    return start_run(label)
+
+def end_rerun():
+    if not is_enabled():
+        return
+    with _active_lock:
+        run = _active.get(threading.get_ident())
+    stop_run(run)
+
+_scope = threading.local()
+
+@contextmanager
+def rerun_scope(label: str):
+    """One capture for a partial rerun with its own exit (a fragment rerun); nested scopes join the outer one."""
+    depth = getattr(_scope, "depth", 0)
+    # The outermost scope always closes itself, so anything still open on this thread is dangling
+    run = begin_rerun(label) if depth == 0 else None
+    _scope.depth = depth + 1
+    status = "ok"
+    try:
+        yield run
+    except BaseException:
+        status = "interrupted"  # Includes st.rerun / st.stop
+        raise
+    finally:
+        _scope.depth = depth
+        stop_run(run, status)
@@ -0,0 +1,133 @@
+import math
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+# ==========================================
+# 1. CONFIG
+# ==========================================
+N_SAMPLES = 100_000
+BOARDING_BUFFER_MINS = 15       # Security must be cleared this long before departure
+DEFAULT_CONFIDENCE = 0.95
+
+IMMIGRATION_CV = 0.35           # Queue times: right-skewed, wide
+SECURITY_CV = 0.30
+TRANSIT_BASE_CV = 0.10          # A perfectly reliable train still varies a little
+TRANSIT_RELIABILITY_CV = 0.50   # Added spread per point of unreliability
+DISRUPTION_MEAN_MINS = 30.0     # Signal failure / traffic jam, when one happens
+DEFAULT_RELIABILITY = 0.85
+Z_90 = 1.2815515655446004       # Standard normal 90th percentile
+
+# ==========================================
+# 2. SAMPLING
+# ==========================================
+# Every model transforms the same standard draws (common random numbers):
+# building one is a few vectorized exps instead of fresh sampling, and the
+# differences between hubs, hours and days are never sampling noise.
+@lru_cache(maxsize=2)
+def base_draws(n: int = N_SAMPLES, seed: int = 0) -> Dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    draws = {name: rng.standard_normal(n, dtype=np.float32)
+             for name in ("immigration", "security", "transit_in", "transit_back")}
+    draws["disruption_u"] = rng.random(n, dtype=np.float32)
+    draws["disruption_mins"] = rng.standard_exponential(n, dtype=np.float32)
+    for arr in draws.values():
+        arr.setflags(write=False)
+    return draws
+
+def lognormal(z: np.ndarray, mean: float, cv: float) -> np.ndarray:
+    # Parameterised by mean and coefficient of variation rather than mu/sigma
+    sigma2 = math.log1p(cv * cv)
+    return np.exp(np.float32(math.log(max(mean, 1e-6)) - sigma2 / 2) + np.float32(math.sqrt(sigma2)) * z)
+
+def lognormal_from_quantiles(p50: float, p90: float):
+    """(mean, cv) of the lognormal through an observed median and p90."""
+    sigma = max(math.log(max(p90, p50) / p50), 1e-6) / Z_90
+    return p50 * math.exp(sigma * sigma / 2), math.sqrt(math.expm1(sigma * sigma))
+
+class RiskModel:
+    """Sampled logistics times for one hub, arrival hour and day.
+
+    Immigration and security are lognormal around the Airport point
+    estimates. Transit is sampled as a unit-mean multiplier (scaled by each
+    trip's own minutes at assess time) plus an occasional disruption whose
+    odds grow as `transport_reliability_score` drops.
+
+    Spreads measured from live observations (`immigration_cv`, `transit_cv`)
+    replace the modelled ones; observed transit already includes its
+    disruptions, so the separate tail is dropped then.
+    """
+
+    def __init__(self, immigration_mins: float, security_mins: float, reliability: float,
+                 traffic: float = 1.0, efficiency: Optional[float] = None,
+                 immigration_cv: Optional[float] = None, transit_cv: Optional[float] = None,
+                 n: int = N_SAMPLES):
+        z = base_draws(n)
+        reliability = float(np.clip(reliability, 0.0, 1.0))
+        if immigration_cv is None:
+            immigration_cv = IMMIGRATION_CV if efficiency is None else IMMIGRATION_CV * (1.5 - float(efficiency))
+        if transit_cv is None:
+            # Rush hour is slower *and* less predictable; weekends the opposite
+            transit_cv = (TRANSIT_BASE_CV + TRANSIT_RELIABILITY_CV * (1.0 - reliability)) * math.sqrt(traffic)
+            p_disruption = 0.5 * (1.0 - reliability)
+        else:
+            p_disruption = 0.0
+
+        self.immigration_mean = float(immigration_mins)
+        self.security_mean = float(security_mins)
+        self.immigration = lognormal(z["immigration"], immigration_mins, immigration_cv)
+        self.security = lognormal(z["security"], security_mins, SECURITY_CV)
+        # Two independent legs (to the city and back), each a unit-mean multiplier
+        self.transit_in = lognormal(z["transit_in"], 1.0, transit_cv)
+        self.transit_back = lognormal(z["transit_back"], 1.0, transit_cv)
+        hit = z["disruption_u"] < p_disruption
+        self.disruption_back = np.where(hit, z["disruption_mins"] * np.float32(DISRUPTION_MEAN_MINS), np.float32(0.0))
+        for arr in (self.immigration, self.security, self.transit_in, self.transit_back, self.disruption_back):
+            arr.setflags(write=False)  # Shared across sessions
+        self._leg_quantiles: Dict[Tuple[float, float], float] = {}
+
+    def return_leg(self, transit_mins: float) -> np.ndarray:
+        """Minutes from leaving the last stop to clearing security."""
+        if transit_mins <= 0:
+            return self.security
+        return self.transit_back * np.float32(transit_mins) + self.disruption_back + self.security
+
+    def return_leg_quantile(self, transit_mins: float, confidence: float) -> float:
+        # np.quantile is the slow part of assess(); trips repeat across reruns
+        key = (round(float(transit_mins), 1), confidence)
+        if key not in self._leg_quantiles:
+            self._leg_quantiles[key] = float(np.quantile(self.return_leg(key[0]), confidence))
+        return self._leg_quantiles[key]
+
+    def assess(self, plan: Dict[str, Any], layover_hours: float, confidence: float = DEFAULT_CONFIDENCE) -> Dict[str, Any]:
+        """P(missing the security cutoff) for an itinerary.plan_itinerary plan, plus a safe leave time.
+
+        Late inbound logistics first eat the plan's waits for openings; any
+        remaining delay pushes the departure from the last stop back.
+        """
+        cutoff = layover_hours * 60 - BOARDING_BUFFER_MINS
+        stops = plan.get("stops", [])
+        landside = plan.get("zone") == "LANDSIDE"
+        back_mins = plan.get("return_transit_mins", 0.0) if landside else 0.0
+        planned_leave = stops[-1]["end_mins"] if stops else plan.get("start_mins", 0.0)
+
+        leave = np.full(len(self.security), planned_leave, dtype=np.float32)
+        if landside and stops:
+            in_mins = stops[0]["travel_mins"]
+            # Delay against what the plan budgeted (the observed p50 with live stats, not the lognormal mean)
+            planned_imm = np.float32(plan.get("immigration_mins", self.immigration_mean))
+            inbound_delay = (self.immigration - planned_imm) + (self.transit_in - 1.0) * np.float32(in_mins)
+            absorbed = sum(s["wait_mins"] for s in stops)
+            leave += np.maximum(inbound_delay - np.float32(absorbed), 0.0)
+        done = leave + self.return_leg(back_mins)
+
+        # Latest leave time that still clears security with `confidence`
+        leg_q = self.return_leg_quantile(back_mins, confidence)
+        return {
+            "p_miss": float(np.mean(done > cutoff)),
+            "confidence": confidence,
+            "planned_leave_mins": float(planned_leave),
+            "recommended_leave_mins": cutoff - leg_q,
+            "expected_slack_mins": float(cutoff - np.mean(done)),
+        }
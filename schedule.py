@@ -0,0 +1,69 @@
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from itinerary import plan_itinerary
+
+# ==========================================
+# 1. BLOCK RECORDS
+# ==========================================
+# A schedule is plain data (no pandas / plotly): minute offsets from arrival,
+# so batch jobs and APIs can take it as is and viz.py only draws it.
+LOGISTICS, ACTIVITY, BUFFER = "Logistics", "Activity", "Buffer"
+
+class Block(NamedTuple):
+    task: str
+    start_mins: float
+    end_mins: float
+    kind: str  # LOGISTICS | ACTIVITY | BUFFER
+
+class Schedule(NamedTuple):
+    arrival_hour: float
+    layover_hours: float
+    return_by_mins: float  # Latest time to leave the last stop ("MUST RETURN")
+    blocks: Tuple[Block, ...]
+
+# ==========================================
+# 2. BUILD
+# ==========================================
+def build_schedule(activities: List[Dict[str, Any]], arrival_hour: float, total_layover_hours: float,
+                   itinerary: Optional[Dict[str, Any]] = None) -> Optional[Schedule]:
+    """Logistics, travel, activity and buffer blocks for a ranked list (None when it is empty).
+
+    Stops, order and waits come from itinerary.plan_itinerary (pass `itinerary`
+    to reuse one). Schedules are hashable, so they can key caches directly.
+    """
+    if not activities:
+        return None
+
+    plan = itinerary or plan_itinerary(activities, arrival_hour, total_layover_hours)
+    departure = total_layover_hours * 60
+    is_landside = plan["zone"] == "LANDSIDE"
+    transit_back_mins = plan.get("return_transit_mins", 0) if is_landside else 0
+    # Departure - (Security + Transit Back + 15m Boarding Buffer)
+    return_by = plan["return_by_mins"] - transit_back_mins
+
+    blocks = []
+    if is_landside:
+        blocks.append(Block("🛂 Immigration & Customs", 0.0, plan["immigration_mins"], LOGISTICS))
+    cursor = plan["start_mins"]
+
+    for n, stop in enumerate(plan["stops"]):
+        if stop["travel_mins"] > 0:
+            task = "🚆 Transit to City" if (n == 0 and is_landside) else "🚶 Travel Between Stops"
+            blocks.append(Block(task, cursor, cursor + stop["travel_mins"], LOGISTICS))
+            cursor += stop["travel_mins"]
+        if stop["wait_mins"] > 0:
+            blocks.append(Block("⏳ Wait for Opening", cursor, stop["start_mins"], BUFFER))
+        blocks.append(Block(f"📍 {stop['item']['activity']['title']}", stop["start_mins"], stop["end_mins"], ACTIVITY))
+        cursor = stop["end_mins"]
+
+    # Any time left before the "Must Leave" time is pure safety buffer
+    if cursor < return_by:
+        blocks.append(Block("☕ Safe Buffer / Free Time", cursor, return_by, BUFFER))
+        cursor = return_by
+
+    if is_landside and transit_back_mins > 0:
+        blocks.append(Block("🚆 Return Transit", cursor, cursor + transit_back_mins, LOGISTICS))
+        cursor += transit_back_mins
+
+    blocks.append(Block("🛡️ Security & Gate", cursor, departure, LOGISTICS))
+    return Schedule(float(arrival_hour), float(total_layover_hours), float(return_by), tuple(blocks))
@@ -0,0 +1,78 @@
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from airports import AIRPORTS_PATH, AirportResolver, load_airports, normalize
+
+# Lookup latency of the airport resolver (airports.py) over the bundled data,
+# and how often a one-typo city name still lands on an airport in that city.
+
+def typo(word: str, rng: np.random.Generator) -> str:
+    i = int(rng.integers(1, len(word) - 1))
+    kind = rng.integers(4)
+    if kind == 0:
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]               # swap
+    if kind == 1:
+        return word[:i] + word[i + 1:]                                       # drop
+    letter = "abcdefghijklmnopqrstuvwxyz"[rng.integers(26)]
+    if kind == 2:
+        return word[:i] + letter + word[i + 1:]                              # substitute
+    return word[:i] + letter + word[i:]                                      # insert
+
+def timed(fn, queries):
+    ms, out = [], []
+    for q in queries:
+        t0 = time.perf_counter()
+        out.append(fn(q))
+        ms.append((time.perf_counter() - t0) * 1000)
+    return np.array(ms), out
+
+def main():
+    parser = argparse.ArgumentParser(description="Airport resolver benchmark")
+    parser.add_argument("--path", default=os.path.join(BASE_DIR, AIRPORTS_PATH))
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    airports = load_airports(args.path)
+    resolver = AirportResolver(airports)
+    print(f"🏗️  Indexed {len(airports):,} airports under {len(resolver):,} names in {time.perf_counter() - t0:.2f}s")
+
+    rng = np.random.default_rng(0)
+    cities = sorted({normalize(a["city"]) for a in airports if a["size"] >= 2 and len(normalize(a["city"])) >= 6})
+    picked = [cities[i] for i in rng.integers(len(cities), size=args.queries)]
+    typos = [typo(c, rng) for c in picked]
+    codes = [a["iata"] for a in airports]
+    workloads = {
+        "exact code": [codes[i] for i in rng.integers(len(codes), size=args.queries)],
+        "exact city": picked,
+        "prefix (4 chars)": [c[:4] for c in picked],
+        "one typo": typos,
+    }
+
+    print(f"\n{'LOOKUP':<18} | {'p50 ms':>7} | {'p95 ms':>7} | {'p99 ms':>7} | {'RESOLVED':>8}")
+    print("-" * 60)
+    results = {}
+    for name, queries in workloads.items():
+        ms, out = timed(resolver.resolve, queries)
+        results[name] = out
+        print(f"{name:<18} | {np.percentile(ms, 50):>7.3f} | {np.percentile(ms, 95):>7.3f} | "
+              f"{np.percentile(ms, 99):>7.3f} | {sum(o is not None for o in out) / len(out):>8.1%}")
+    ms, _ = timed(lambda q: resolver.suggest(q, 8), [c[:3] for c in picked])
+    print(f"{'suggest (3 chars)':<18} | {np.percentile(ms, 50):>7.3f} | {np.percentile(ms, 95):>7.3f} | "
+          f"{np.percentile(ms, 99):>7.3f} | {'':>8}")
+
+    # A typo counts as fixed when it resolves to an airport serving the intended city
+    city_of = {a["iata"]: normalize(a["city"]) for a in airports}
+    fixed = sum(o is not None and (city_of[o["code"]] == c or city_of[o["code"]].endswith(" " + c))
+                for o, c in zip(results["one typo"], picked))
+    print(f"\n✅ One-typo city names resolved to the intended city: {fixed / len(picked):.1%}")
+
+if __name__ == "__main__":
+    main()
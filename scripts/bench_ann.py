@@ -0,0 +1,87 @@
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from ann import DEFAULT_NPROBE, ActivityIndex
+from snapshot import NUMERIC_COLUMNS
+
+# Latency and recall@k of the global activity index (ann.py) against its own
+# brute-force scan, on synthetic clustered embeddings (real activity vectors
+# cluster by theme; uniform random ones would make any IVF look bad).
+
+def synth_catalog(n: int, dim: int, hubs: int, topics: int, noise: float = 0.8, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((topics, dim), dtype=np.float32)
+    centers /= np.linalg.norm(centers, axis=1, keepdims=True)
+    embs = np.empty((n, dim), dtype=np.float32)
+    for s in range(0, n, 100_000):
+        m = min(100_000, n - s)
+        x = centers[rng.integers(topics, size=m)] + rng.standard_normal((m, dim), dtype=np.float32) * np.float32(noise / np.sqrt(dim))
+        embs[s:s + m] = x / np.linalg.norm(x, axis=1, keepdims=True)
+    cols = np.zeros((n, len(NUMERIC_COLUMNS)), dtype=np.float32)
+    c = {name: i for i, name in enumerate(NUMERIC_COLUMNS)}
+    cols[:, c["opening_hour_24"]] = rng.integers(0, 12, n)
+    cols[:, c["closing_hour_24"]] = rng.integers(12, 25, n)
+    cols[:, c["is_24h"]] = rng.random(n) < 0.3
+    cols[:, c["is_landside"]] = rng.random(n) < 0.6
+    hub_of_row = np.sort(rng.integers(hubs, size=n))
+    return embs, [f"h{i:03d}" for i in range(hubs)], hub_of_row, cols
+
+def main():
+    parser = argparse.ArgumentParser(description="Global activity index benchmark")
+    parser.add_argument("--activities", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--hubs", type=int, default=500)
+    parser.add_argument("--topics", type=int, default=2000)
+    parser.add_argument("--noise", type=float, default=0.8, help="spread around each topic (higher = harder)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[8, DEFAULT_NPROBE, 64])
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    embs, hub_ids, hub_of_row, cols = synth_catalog(args.activities, args.dim, args.hubs, args.topics, args.noise)
+    print(f"🧪 Generated {args.activities:,} x {args.dim} embeddings over {args.hubs} hubs in {time.perf_counter() - t0:.1f}s")
+    t0 = time.perf_counter()
+    index = ActivityIndex(embs, hub_ids, hub_of_row, cols)
+    print(f"🏗️  Built {index.cells:,} cells in {time.perf_counter() - t0:.1f}s")
+    del embs  # The index keeps its own (cell-ordered) copy
+
+    rng = np.random.default_rng(1)
+    queries = index.embs[rng.integers(len(index), size=args.queries)]
+    queries = queries + rng.standard_normal(queries.shape, dtype=np.float32) * np.float32(0.6 / np.sqrt(args.dim))
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    filters = {
+        "no filter": lambda i: {},
+        "3 hubs": lambda i: {"hubs": [hub_ids[(i * 7 + j) % len(hub_ids)] for j in range(3)]},
+        "landside, 03:00": lambda i: {"zone": "LANDSIDE", "hour_of_week": 3},
+    }
+
+    print(f"\n{'FILTER':<18} | {'NPROBE':>6} | {'p50 ms':>8} | {'p95 ms':>8} | {'RECALL@' + str(args.k):>9}")
+    print("-" * 62)
+    for name, make in filters.items():
+        truth, exact_ms = [], []
+        for i, q in enumerate(queries):
+            t0 = time.perf_counter()
+            rows, _ = index.search_exact(q, args.k, **make(i))
+            exact_ms.append((time.perf_counter() - t0) * 1000)
+            truth.append(set(rows.tolist()))
+        print(f"{name:<18} | {'exact':>6} | {np.percentile(exact_ms, 50):>8.2f} | {np.percentile(exact_ms, 95):>8.2f} | {1.0:>9.3f}")
+        for nprobe in args.nprobe:
+            ms, hits = [], 0
+            for i, q in enumerate(queries):
+                t0 = time.perf_counter()
+                rows, _ = index.search(q, args.k, nprobe=nprobe, **make(i))
+                ms.append((time.perf_counter() - t0) * 1000)
+                hits += len(truth[i] & set(rows.tolist()))
+            recall = hits / max(sum(len(t) for t in truth), 1)
+            print(f"{name:<18} | {nprobe:>6} | {np.percentile(ms, 50):>8.2f} | {np.percentile(ms, 95):>8.2f} | {recall:>9.3f}")
+
+if __name__ == "__main__":
+    main()
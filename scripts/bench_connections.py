@@ -0,0 +1,112 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from connections import MINUTES_PER_DAY, load_timetable
+
+# Load + query timings of the connection engine on a synthetic timetable,
+# checked against a brute-force scan of every departure for sampled arrivals.
+
+def synth_timetable(path: str, flights: int, hub_codes, airports: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    others = np.array([f"X{i:02d}" if i < 100 else f"{chr(65 + i // 676 % 26)}{chr(65 + i // 26 % 26)}{chr(65 + i % 26)}"
+                       for i in range(airports)])
+    codes = np.concatenate([np.array(hub_codes), others])
+    # Half the traffic touches a hub, like a hub-and-spoke network
+    hub_side = rng.integers(0, len(hub_codes), flights)
+    other = rng.choice(codes, flights)
+    inbound = rng.random(flights) < 0.5
+    origin = np.where(inbound, other, np.array(hub_codes)[hub_side])
+    dest = np.where(inbound, np.array(hub_codes)[hub_side], other)
+    touch = rng.random(flights) < 0.5
+    origin = np.where(touch, origin, rng.choice(others, flights))
+    dep = rng.integers(0, MINUTES_PER_DAY, flights)
+    arr = dep + rng.integers(45, 16 * 60, flights)
+    days = np.where(rng.random(flights) < 0.7, "1234567", rng.choice(["135", "246", "7", "12345"], flights))
+    pd.DataFrame({
+        "flight": [f"ZZ{n}" for n in range(flights)],
+        "origin": origin, "destination": dest,
+        "dep_time": [f"{d // 60:02d}:{d % 60:02d}" for d in dep],
+        "arr_time": [f"{a % MINUTES_PER_DAY // 60:02d}:{a % 60:02d}" for a in arr],
+        "arr_day_offset": arr // MINUTES_PER_DAY,
+        "days": days,
+        "dep_terminal": rng.choice(["1", "2", "3"], flights),
+        "arr_terminal": rng.choice(["1", "2", "3"], flights),
+    }).to_csv(path, index=False)
+
+def brute_force(sched, pos, max_hours):
+    # Every outbound instance this week and next, no binary search
+    gap = sched.out_t.astype(np.int64) - int(sched.in_t[pos])
+    need = sched.required_minutes(np.full(len(gap), sched.in_row[pos]), sched.out_row)
+    return int(np.count_nonzero((gap >= 0) & (gap <= max_hours * 60) & (gap >= need)))
+
+def main():
+    parser = argparse.ArgumentParser(description="Connection engine benchmark")
+    parser.add_argument("--flights", type=int, default=1_000_000, help="timetable rows (per operating day pattern)")
+    parser.add_argument("--airports", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--min-hours", type=float, default=6.0)
+    parser.add_argument("--timetable", help="existing timetable CSV (skips generation)")
+    args = parser.parse_args()
+
+    with open(os.path.join(BASE_DIR, "data", "hubs.json"), "r", encoding="utf-8") as f:
+        hubs_meta = json.load(f)
+    path = args.timetable
+    if not path:
+        path = os.path.join(tempfile.mkdtemp(), "timetable.csv")
+        t0 = time.perf_counter()
+        synth_timetable(path, args.flights, [m["code"] for m in hubs_meta.values()], args.airports)
+        print(f"🧪 Generated {args.flights:,} flights in {time.perf_counter() - t0:.1f}s -> {path}")
+
+    t0 = time.perf_counter()
+    tt = load_timetable(path, hubs_meta)
+    load_s = time.perf_counter() - t0
+    instances = sum(len(s) for s in tt.hubs.values())
+    print(f"📂 Loaded {tt.flights:,} rows -> {instances:,} weekly hub movements in {load_s:.1f}s")
+
+    rng = np.random.default_rng(1)
+    lat = {"count all (24h)": [], "first 100 (24h)": [], f"windows >= {args.min_hours:g}h": []}
+    found = 0
+    hubs = [h for h, s in tt.hubs.items() if len(s.in_t)]
+    for _ in range(args.queries):
+        sched = tt.hubs[hubs[rng.integers(len(hubs))]]
+        pos = int(rng.integers(len(sched.in_t)))
+        origin = sched.cols["origin"][sched.in_row[pos]]
+        calls = (
+            lambda: sched.count_connections(pos, max_hours=24),
+            lambda: sched.connections(pos, max_hours=24, limit=100),
+            lambda: sched.layover_windows(args.min_hours, day=int(rng.integers(7)), origin=origin, limit=50),
+        )
+        for name, call in zip(lat, calls):
+            t0 = time.perf_counter()
+            result = call()
+            lat[name].append((time.perf_counter() - t0) * 1000)
+            if name == "count all (24h)":
+                found += result
+
+    print(f"\n{'QUERY':<24} | {'p50 ms':>8} | {'p95 ms':>8}")
+    print("-" * 46)
+    for name, ms in lat.items():
+        print(f"{name:<24} | {np.percentile(ms, 50):>8.2f} | {np.percentile(ms, 95):>8.2f}")
+    print(f"   {found / args.queries:,.0f} feasible connections per arrival on average")
+
+    # Correctness: binary-search results vs a full scan on a few small samples
+    mismatches = 0
+    for _ in range(5):
+        sched = tt.hubs[hubs[rng.integers(len(hubs))]]
+        pos = int(rng.integers(len(sched.in_t)))
+        if sched.count_connections(pos, max_hours=3) != brute_force(sched, pos, 3):
+            mismatches += 1
+    print(f"{'✅' if not mismatches else '❌'} Brute-force check: {mismatches} mismatches in 5 arrivals")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import os
+import sys
+import time
+import random
+import argparse
+import threading
+from typing import List
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from encoder import EncodeBatcher
+
+# Throughput vs added latency of the query micro-batcher under synthetic concurrency.
+VIBES = [
+    "I want local food and sightseeing", "quiet lounge and a shower", "halal street food",
+    "museum and history", "sleep pod near the gate", "duty free shopping", "skyline photos",
+    "cheap eats and a walk", "spa and massage", "temple and culture tour",
+]
+
+def make_encoder(args):
+    if args.synthetic:
+        # Cost model of a small transformer: fixed launch cost + per-row cost.
+        # time.sleep releases the GIL the way torch kernels do.
+        lock = threading.Lock()
+        def encode(texts: List[str]) -> np.ndarray:
+            with lock:  # One forward pass at a time, like a single model instance
+                time.sleep((args.fixed_ms + args.per_item_ms * len(texts)) / 1000.0)
+            return np.zeros((len(texts), 384), dtype=np.float32)
+        return encode
+    from logic import encode_texts, get_model
+    get_model()
+    encode_texts(["warm-up"])
+    return encode_texts
+
+def run(encode_one, users: int, requests_per_user: int):
+    latencies, lock = [], threading.Lock()
+    def user(seed):
+        rnd = random.Random(seed)
+        for _ in range(requests_per_user):
+            text = f"{rnd.choice(VIBES)} #{rnd.randint(0, 10_000)}"
+            t0 = time.perf_counter()
+            encode_one(text)
+            with lock:
+                latencies.append((time.perf_counter() - t0) * 1000)
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=user, args=(i,)) for i in range(users)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    wall = time.perf_counter() - t0
+    lat = np.array(latencies)
+    return len(lat) / wall, np.percentile(lat, 50), np.percentile(lat, 95), np.percentile(lat, 99)
+
+def main():
+    parser = argparse.ArgumentParser(description="Encoder micro-batching benchmark")
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--requests", type=int, default=50, help="requests per virtual user")
+    parser.add_argument("--windows", type=float, nargs="+", default=[1, 3, 10], help="batch windows (ms)")
+    parser.add_argument("--max-batch", type=int, default=32)
+    parser.add_argument("--synthetic", action="store_true", help="use a timed stand-in instead of the real model")
+    parser.add_argument("--fixed-ms", type=float, default=8.0)
+    parser.add_argument("--per-item-ms", type=float, default=0.4)
+    args = parser.parse_args()
+
+    encode = make_encoder(args)
+    print(f"{'USERS':>5} | {'MODE':<14} | {'QPS':>8} | {'P50 ms':>8} | {'P95 ms':>8} | {'P99 ms':>8} | {'BATCH':>5}")
+    print("-" * 74)
+    for users in args.users:
+        qps, p50, p95, p99 = run(lambda t: encode([t])[0], users, args.requests)
+        print(f"{users:>5} | {'direct':<14} | {qps:>8.1f} | {p50:>8.2f} | {p95:>8.2f} | {p99:>8.2f} | {1:>5}")
+        for window in args.windows:
+            batcher = EncodeBatcher(encode, window, args.max_batch)
+            qps, p50, p95, p99 = run(batcher.encode, users, args.requests)
+            mean_batch = batcher.stats()["mean_batch"]
+            print(f"{users:>5} | {f'batched {window:g}ms':<14} | {qps:>8.1f} | {p50:>8.2f} | {p95:>8.2f} | {p99:>8.2f} | {mean_batch:>5.1f}")
+
+if __name__ == "__main__":
+    main()
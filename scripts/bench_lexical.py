@@ -0,0 +1,129 @@
+import os
+import sys
+import json
+import time
+import shutil
+import sqlite3
+import argparse
+import tempfile
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+# Recall vs latency of the BM25 prefilter + semantic rerank against scoring
+# every activity, on one hub padded with synthetic POIs in a scratch copy of
+# the catalog (layover.db is never written).
+
+THEMES = {
+    "FOOD": ["halal", "street food", "noodles", "satay", "dim sum", "vegan", "bakery", "seafood", "curry", "coffee"],
+    "RELAX": ["spa", "massage", "lounge", "nap", "shower", "sauna", "quiet", "garden", "pool", "yoga"],
+    "SIGHTS": ["skyline", "viewpoint", "harbour", "bridge", "tower", "park", "waterfall", "river", "beach", "photos"],
+    "CULTURE": ["temple", "museum", "gallery", "heritage", "mosque", "history", "art", "old town", "palace", "craft"],
+    "SHOPPING": ["market", "mall", "duty free", "souvenirs", "electronics", "fashion", "bazaar", "night market", "books", "tea"],
+}
+FILLER = ["near the terminal", "short walk", "popular with locals", "open late", "good for a quick stop",
+          "easy by metro", "family friendly", "budget", "hidden gem", "busy at weekends"]
+QUERIES = [
+    "halal food near the airport", "spa and massage", "quiet place to nap", "street food and a night market",
+    "temple and museum", "duty free shopping", "skyline photos at the harbour", "vegan bakery and coffee",
+    "art gallery and heritage walk", "sauna and pool",
+]
+
+def synth_activities(n: int, lat: float, lon: float, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    types = list(THEMES)
+    acts = []
+    for i in range(n):
+        t = types[rng.integers(len(types))]
+        words = list(rng.choice(THEMES[t], 2, replace=False))
+        filler = list(rng.choice(FILLER, 2, replace=False))
+        landside = rng.random() < 0.7
+        opens = int(rng.integers(0, 12))
+        acts.append({
+            "id": f"bench_{i}",
+            "title": f"{words[0].title()} {t.lower()} stop #{i}",
+            "type": t,
+            "description": f"{words[0]} and {words[1]}, {filler[0]}, {filler[1]}.",
+            "founders_tip": f"Go early for the {words[1]}.",
+            "location": {"lat": lat + float(rng.normal(0, 0.05)), "lon": lon + float(rng.normal(0, 0.05)),
+                         "zone": "LANDSIDE" if landside else "AIRSIDE"},
+            "time_constraints": {"min_duration_hours": float(rng.choice([0.5, 1, 1.5, 2, 3])),
+                                 "is_24h": bool(rng.random() < 0.3),
+                                 "opening_hour_24": opens, "closing_hour_24": int(rng.integers(opens + 8, 25))},
+            "cost_tier": "LOW",
+        })
+    return acts
+
+def main():
+    parser = argparse.ArgumentParser(description="Lexical prefilter benchmark (BM25 top-N + rerank vs exhaustive)")
+    parser.add_argument("--hub", default="sin")
+    parser.add_argument("--activities", type=int, default=20_000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per query")
+    parser.add_argument("--db", default=os.path.join(BASE_DIR, "layover.db"), help="catalog to copy the hub from")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    db = os.path.join(tmp, "bench.db")
+    shutil.copy(args.db, db)
+    # Point the app modules at the scratch copy before they are imported
+    os.environ["LAYOVER_DB_PATH"] = db
+    os.environ["LAYOVER_CATALOG_POLL_SECS"] = "0"
+    os.environ["LAYOVER_SNAPSHOT_DIR"] = os.path.join(tmp, "snapshots")
+    import logic
+    from catalog import EMBEDDING_MODEL, activity_text, bump_hub_versions, ensure_schema
+
+    coords = logic.HUB_COORDS.get(args.hub, {"lat": 0.0, "lon": 0.0})
+    acts = synth_activities(args.activities, coords["lat"], coords["lon"])
+    t0 = time.perf_counter()
+    embs = np.concatenate([logic.encode_texts([activity_text(a) for a in acts[i:i + 512]])
+                           for i in range(0, len(acts), 512)])
+    print(f"🧠 Encoded {len(acts):,} synthetic activities in {time.perf_counter() - t0:.1f}s")
+
+    conn = sqlite3.connect(db)
+    try:
+        ensure_schema(conn)
+        with conn:
+            conn.execute("DELETE FROM activities WHERE hub_id = ?", (args.hub,))
+            conn.executemany(
+                "INSERT INTO activities (id, hub_id, position, content_hash, data, embedding, embedding_model, source) "
+                "VALUES (?, ?, ?, '', ?, ?, ?, 'bench')",
+                [(a["id"], args.hub, i, json.dumps(a), np.ascontiguousarray(e, dtype=np.float32).tobytes(), EMBEDDING_MODEL)
+                 for i, (a, e) in enumerate(zip(acts, embs))],
+            )
+            bump_hub_versions(conn, [args.hub])
+    finally:
+        conn.close()
+    print(f"📂 Wrote them to {args.hub.upper()} in {db}")
+
+    plan_args = (args.hub, 12.0, 10, None, True, "Monday")
+    logic.filter_and_rank_activities(*plan_args[:3], "warm-up", *plan_args[4:], retrieval="full")
+
+    print(f"\n{'QUERY':<34} | {'FULL ms':>8} | {'BM25 ms':>8} | {'RECALL@' + str(args.k):>9}")
+    print("-" * 70)
+    full_ms, lex_ms, recalls = [], [], []
+    for q in QUERIES:
+        timings = {}
+        for mode in ("full", "lexical"):
+            runs = []
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                ranked = logic.filter_and_rank_activities(*plan_args[:3], q, *plan_args[4:], retrieval=mode)
+                runs.append((time.perf_counter() - t0) * 1000)
+            timings[mode] = (float(np.median(runs)), [r["score"] for r in ranked[:args.k]])
+        # Tie-aware: scores are rounded, so many activities share the k-th score.
+        # A lexical pick counts when it scores at least as well as the exhaustive k-th.
+        truth, got = timings["full"][1], timings["lexical"][1]
+        recall = sum(s >= truth[-1] for s in got) / max(len(truth), 1) if truth else 1.0
+        full_ms.append(timings["full"][0])
+        lex_ms.append(timings["lexical"][0])
+        recalls.append(recall)
+        print(f"{q[:34]:<34} | {timings['full'][0]:>8.1f} | {timings['lexical'][0]:>8.1f} | {recall:>9.2f}")
+    print("-" * 70)
+    print(f"{'mean':<34} | {np.mean(full_ms):>8.1f} | {np.mean(lex_ms):>8.1f} | {np.mean(recalls):>9.2f}")
+    shutil.rmtree(tmp, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from geo import MAX_CLUSTERS, ZoomClusters
+from viz import MAP_ZOOM, create_map, create_map_layer
+
+# Results-map payload by catalog size: the old st.map call (every point, every
+# rerun) against the clustered layer (logic.map_clusters + viz.create_map_layer)
+# at a few zoom levels. Catalogs are synthetic: a dense city around the hub plus
+# a sparse regional tail, so the low zooms have few cells and the high zooms many.
+
+HUB = (25.25, 55.36)
+ZOOMS = (MAP_ZOOM - 2, MAP_ZOOM, MAP_ZOOM + 3, MAP_ZOOM + 6)
+VIEW_DEG = 0.25  # Roughly what a 400 px tall map shows at MAP_ZOOM
+
+def synthetic_catalog(n, rng):
+    city = rng.random(n) < 0.8
+    lat = np.where(city, rng.normal(HUB[0], 0.05, n), rng.normal(HUB[0], 0.6, n))
+    lon = np.where(city, rng.normal(HUB[1], 0.07, n), rng.normal(HUB[1], 0.8, n))
+    return lat, lon
+
+def layer_bytes(layer):
+    # Rendered marker JS only: the base map is the same on every rerun
+    m = create_map(*HUB)
+    base = len(m.get_root().render())
+    m = create_map(*HUB)
+    layer.add_to(m)
+    return len(m.get_root().render()) - base
+
+def main():
+    parser = argparse.ArgumentParser(description="Results-map payload benchmark")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[100, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--pins", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    print(f"🗺️  {args.pins} pins, view {VIEW_DEG * 2:.1f}° around the hub (half-screen padding on each side)\n")
+    print(f"{'POINTS':>9} | {'st.map KB':>9} | {'BUILD s':>7} | "
+          + " | ".join(f"{f'z{z} KB/ms':>12}" for z in ZOOMS))
+    print("-" * (34 + 15 * len(ZOOMS)))
+    for n in args.sizes:
+        lat, lon = synthetic_catalog(n, rng)
+        legacy = len(json.dumps([{"lat": a, "lon": b} for a, b in zip(lat.tolist(), lon.tolist())])) / 1e3
+
+        t0 = time.perf_counter()
+        clusters = ZoomClusters(lat, lon)
+        build = time.perf_counter() - t0
+
+        pins = [{"activity": {"title": f"Pick {i}", "location": {"lat": float(lat[i]), "lon": float(lon[i])}},
+                 "score": 90.0} for i in range(args.pins)]
+        cols = []
+        for z in ZOOMS:
+            half = VIEW_DEG * 2 ** (MAP_ZOOM - z) * 2  # Padded view
+            bounds = (HUB[0] - half, HUB[1] - half, HUB[0] + half, HUB[1] + half)
+            t0 = time.perf_counter()
+            view = clusters.query(z, bounds, np.arange(args.pins), limit=MAX_CLUSTERS)
+            layer = create_map_layer(pins, view)
+            ms = (time.perf_counter() - t0) * 1000
+            cols.append(f"{layer_bytes(layer) / 1e3:>5.1f}/{ms:>5.1f}")
+        print(f"{n:>9,} | {legacy:>9,.0f} | {build:>7.2f} | " + " | ".join(f"{c:>12}" for c in cols))
+
+    print(f"\n✅ Layer size is capped by pins + {MAX_CLUSTERS} clusters; st.map grows with the catalog")
+
+if __name__ == "__main__":
+    main()
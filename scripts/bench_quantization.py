@@ -0,0 +1,108 @@
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from vectors import EMBEDDING_DTYPES, Vectors
+
+# Memory, scoring latency and ranking agreement of compact embedding storage
+# (vectors.py) against float32. Agreement is measured on the real catalog (every
+# hub's stored/encoded vectors, queried with its own activity texts) and on a
+# synthetic clustered catalog, where near-ties make rounding errors visible.
+# Exits non-zero when a dtype's mean top-k overlap falls below --min-overlap.
+
+def synth(n: int, dim: int, topics: int, noise: float, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((topics, dim)).astype(np.float32)
+    x = centers[rng.integers(topics, size=n)] + noise * rng.standard_normal((n, dim)).astype(np.float32)
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+def overlap(exact: Vectors, compact: Vectors, queries: np.ndarray, k: int) -> float:
+    # Tie-aware: a compact pick counts when its exact score reaches the exact k-th best
+    hits = []
+    for q in queries:
+        truth = exact.dot(q)
+        kth = np.partition(truth, len(truth) - k)[len(truth) - k]
+        got = np.argpartition(-compact.dot(q), k - 1)[:k]
+        hits.append(float(np.mean(truth[got] >= kth - 1e-6)))
+    return float(np.mean(hits))
+
+def real_catalog():
+    # Imported here so the synthetic run never pays for torch
+    import logic
+    embs, queries = [], []
+    for hub_id in logic.list_hub_ids():
+        e = logic.get_activity_embeddings(hub_id)
+        if len(e):
+            embs.append(e.to_float32())
+            texts = [logic.activity_text(a) for a in (logic.load_hub_data(hub_id) or {}).get("activities", [])]
+            queries.append(logic.encode_texts(texts[:20]))
+    if not embs:
+        return None, None
+    return np.concatenate(embs), np.concatenate(queries)
+
+def main():
+    parser = argparse.ArgumentParser(description="Reduced-precision embedding benchmark")
+    parser.add_argument("--activities", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--topics", type=int, default=200)
+    parser.add_argument("--noise", type=float, default=0.6)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--min-overlap", type=float, default=0.9, help="fail below this mean top-k overlap")
+    parser.add_argument("--skip-real", action="store_true", help="synthetic data only (no DB, no encoder)")
+    args = parser.parse_args()
+
+    x = synth(args.activities, args.dim, args.topics, args.noise)
+    rng = np.random.default_rng(1)
+    queries = synth(args.queries, args.dim, args.topics, args.noise, seed=1)
+    exact = Vectors(x)
+
+    print(f"🧮 {args.activities:,} activities x {args.dim} dims, {args.queries} queries, top-{args.k}")
+    print(f"\n{'DTYPE':<8} | {'MB':>7} | {'MB/100k':>7} | {'SCORE ms':>8} | {'SUBSET ms':>9} | {'OVERLAP':>7}")
+    print("-" * 62)
+    subset = np.sort(rng.choice(args.activities, min(args.activities, 2000), replace=False))
+    failed = []
+    for dtype in EMBEDDING_DTYPES:
+        vecs = Vectors.quantize(x, dtype)
+        vecs.dot(queries[0])
+        t0 = time.perf_counter()
+        for q in queries[:20]:
+            vecs.dot(q)
+        full_ms = (time.perf_counter() - t0) * 1000 / 20
+        t0 = time.perf_counter()
+        for q in queries[:20]:
+            vecs.dot(q, subset)  # One hub's candidate rows, as logic._semantic_scores does
+        sub_ms = (time.perf_counter() - t0) * 1000 / 20
+        agree = overlap(exact, vecs, queries, args.k)
+        if agree < args.min_overlap:
+            failed.append(f"synthetic {dtype}")
+        print(f"{dtype:<8} | {vecs.nbytes / 1e6:>7.1f} | {vecs.nbytes / 1e6 * 100_000 / args.activities:>7.1f} | "
+              f"{full_ms:>8.2f} | {sub_ms:>9.3f} | {agree:>7.3f}")
+
+    if not args.skip_real:
+        embs, real_q = real_catalog()
+        if embs is None:
+            print("\n⚠️  No activities in the catalog; skipped the real-data check.")
+        else:
+            print(f"\n📂 Real catalog: {len(embs):,} activities, {len(real_q)} activity-text queries")
+            exact = Vectors(embs)
+            for dtype in EMBEDDING_DTYPES[1:]:
+                agree = overlap(exact, Vectors.quantize(embs, dtype), real_q, min(args.k, len(embs)))
+                if agree < args.min_overlap:
+                    failed.append(f"catalog {dtype}")
+                print(f"   {dtype:<8} top-{args.k} overlap with float32: {agree:.3f}")
+
+    if failed:
+        print(f"\n❌ Below {args.min_overlap:.2f} overlap: {', '.join(failed)}")
+        return 1
+    print(f"\n✅ Every dtype keeps >= {args.min_overlap:.2f} of the float32 top-{args.k}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
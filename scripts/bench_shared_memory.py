@@ -0,0 +1,94 @@
+import os
+import sys
+import argparse
+import tempfile
+import multiprocessing as mp
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from snapshot import NUMERIC_COLUMNS
+
+# Measures what N workers cost in memory when each keeps a private copy of the
+# embedding matrix (today's behaviour) versus mapping the shared snapshot.
+
+def _mem_kb() -> dict:
+    out = {}
+    with open("/proc/self/status", "r") as f:
+        for line in f:
+            if line.startswith(("VmRSS:", "RssAnon:", "RssFile:")):
+                key, val = line.split(":", 1)
+                out[key] = int(val.split()[0])
+    try:
+        # PSS splits shared pages between the processes mapping them
+        with open("/proc/self/smaps_rollup", "r") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    out["Pss"] = int(line.split()[1])
+    except OSError:
+        out["Pss"] = out.get("VmRSS", 0)
+    return out
+
+def _worker(mode: str, emb_path: str, num_path: str, barrier, results):
+    before = _mem_kb()
+    if mode == "private":
+        embs = np.array(np.load(emb_path))
+        cols = np.array(np.load(num_path))
+    else:
+        embs = np.load(emb_path, mmap_mode="r")
+        cols = np.load(num_path, mmap_mode="r")
+    # Touch every page the way a full scoring pass would
+    q = np.ones(embs.shape[1], dtype=np.float32)
+    checksum = float(embs @ q @ np.ones(embs.shape[0], dtype=np.float32)) + float(cols.sum())
+    barrier.wait()  # Measure while every worker is alive and holding its data
+    after = _mem_kb()
+    results.put(dict({k: after.get(k, 0) - before.get(k, 0) for k in after}, checksum=checksum))
+    barrier.wait()
+
+def run(mode: str, workers: int, emb_path: str, num_path: str) -> dict:
+    ctx = mp.get_context("spawn")
+    barrier, results = ctx.Barrier(workers), ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(mode, emb_path, num_path, barrier, results)) for _ in range(workers)]
+    for p in procs: p.start()
+    samples = [results.get() for _ in procs]
+    for p in procs: p.join()
+    if len({s["checksum"] for s in samples}) != 1:
+        raise RuntimeError(f"{mode} workers read different data")  # Same file, same pass: must agree
+    return {k: sum(s.get(k, 0) for s in samples) for k in samples[0] if k != "checksum"}
+
+def main():
+    parser = argparse.ArgumentParser(description="RSS/PSS of N workers: private copies vs shared snapshot")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--activities", type=int, default=100_000, help="synthetic rows when --snapshot is not given")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--snapshot", help="path to an existing snapshots/<version> directory")
+    args = parser.parse_args()
+
+    tmp = None
+    if args.snapshot:
+        emb_path = os.path.join(args.snapshot, "embeddings.npy")
+        num_path = os.path.join(args.snapshot, "numeric.npy")
+    else:
+        tmp = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        emb_path = os.path.join(tmp.name, "embeddings.npy")
+        num_path = os.path.join(tmp.name, "numeric.npy")
+        np.save(emb_path, rng.standard_normal((args.activities, args.dim), dtype=np.float32))
+        np.save(num_path, rng.random((args.activities, len(NUMERIC_COLUMNS)), dtype=np.float32))
+
+    size_mb = (os.path.getsize(emb_path) + os.path.getsize(num_path)) / 1e6
+    print(f"📦 Catalog matrices: {size_mb:.1f} MB, {args.workers} workers\n")
+    print(f"{'MODE':<8} | {'RSS (MB)':>9} | {'ANON (MB)':>9} | {'FILE (MB)':>9} | {'PSS (MB)':>9}")
+    print("-" * 56)
+    for mode in ("private", "mmap"):
+        totals = run(mode, args.workers, emb_path, num_path)
+        print(f"{mode:<8} | {totals.get('VmRSS', 0)/1024:>9.1f} | {totals.get('RssAnon', 0)/1024:>9.1f} | "
+              f"{totals.get('RssFile', 0)/1024:>9.1f} | {totals.get('Pss', 0)/1024:>9.1f}")
+    print("\nRSS counts shared file pages once per worker; PSS is the real host cost.")
+    if tmp is not None:
+        tmp.cleanup()
+
+if __name__ == "__main__":
+    main()
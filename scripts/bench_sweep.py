@@ -0,0 +1,71 @@
+import os
+import sys
+import time
+import argparse
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+# What-if sweep (logic.sweep_activities) against one live ranking per cell.
+# Every hub gets a full day grid (SWEEP_HOURS x 24 arrival hours) for each
+# query and visa outcome; each cell's top k is checked against
+# rank_top_activities, and the per-cell loop is timed with
+# filter_and_rank_activities as the app did before the sweep existed.
+
+QUERIES = ["I want local food and sightseeing", "quiet lounge and a shower", "museum and history"]
+
+def main():
+    parser = argparse.ArgumentParser(description="What-if sweep benchmark")
+    parser.add_argument("--hubs", nargs="*", help="hub ids (default: all)")
+    parser.add_argument("--day", default="Friday")
+    parser.add_argument("--k", type=int, default=3)
+    args = parser.parse_args()
+
+    import logic
+    hub_ids = args.hubs or logic.list_hub_ids()
+    for q in QUERIES:
+        logic.encode_query(q)  # Warm the encoder so both sides time ranking only
+
+    print(f"🔀 {len(logic.SWEEP_HOURS)} layovers x 24 arrivals on {args.day}, top-{args.k}, "
+          f"{len(QUERIES)} queries x 2 visa outcomes per hub\n")
+    print(f"{'HUB':<5} | {'ACTS':>5} | {'SWEEP ms':>8} | {'+RISK ms':>8} | {'LOOP ms':>8} | {'SPEEDUP':>7} | {'MISMATCH':>8}")
+    print("-" * 67)
+    failed = 0
+    for hub_id in hub_ids:
+        acts = len((logic.load_hub_data(hub_id) or {}).get("activities", []))
+        sweep_s = risk_s = loop_s = 0.0
+        mismatches = cells = 0
+        for q in QUERIES:
+            for visa in (False, True):
+                t0 = time.perf_counter()
+                grid = logic.sweep_activities(hub_id, q, visa, days=[args.day], k=args.k, with_risk=False)
+                sweep_s += time.perf_counter() - t0
+                t0 = time.perf_counter()
+                logic.sweep_activities(hub_id, q, visa, days=[args.day], k=args.k, with_risk=True)
+                risk_s += time.perf_counter() - t0
+
+                t0 = time.perf_counter()
+                for c in grid:
+                    logic.filter_and_rank_activities(hub_id, c["hours"], c["arrival_hour"], q, visa, args.day,
+                                                     retrieval="full")
+                loop_s += time.perf_counter() - t0
+
+                for c in grid:
+                    live = logic.rank_top_activities(hub_id, c["hours"], c["arrival_hour"], q, visa, args.day, k=args.k)
+                    got = [(it["activity"]["id"], it["score"]) for it in c["items"]]
+                    want = [(it["activity"]["id"], it["score"]) for it in live["items"]]
+                    mismatches += got != want
+                    cells += 1
+        failed += mismatches
+        runs = len(QUERIES) * 2
+        print(f"{hub_id:<5} | {acts:>5} | {sweep_s * 1000 / runs:>8.1f} | {risk_s * 1000 / runs:>8.1f} | "
+              f"{loop_s * 1000 / runs:>8.1f} | {loop_s / max(sweep_s, 1e-9):>6.1f}x | {mismatches:>4}/{cells}")
+
+    if failed:
+        print(f"\n❌ {failed} cells differ from rank_top_activities")
+        return 1
+    print("\n✅ Every cell's top-k matches rank_top_activities")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
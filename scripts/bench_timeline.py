@@ -0,0 +1,86 @@
+import os
+import sys
+import time
+import argparse
+import subprocess
+from datetime import date, datetime, timedelta
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+# Per-call cost of the results timeline: the old DataFrame + plotly.express
+# recipe (reproduced below from the schedule blocks) against schedule.py's pure
+# schedule, viz.py's graph_objects figure, and the memoized figure a rerun with
+# unchanged inputs gets. Plans come from the real ranker and itinerary solver.
+
+def legacy_timeline(schedule, day):
+    # What viz.create_timeline did before: DataFrame + px.timeline on every call
+    import pandas as pd
+    import plotly.express as px
+    arrival = datetime.combine(day, datetime.min.time()) + timedelta(hours=schedule.arrival_hour)
+    at = lambda m: arrival + timedelta(minutes=m)
+    df = pd.DataFrame([dict(Task=b.task, Start=at(b.start_mins), Finish=at(b.end_mins), Type=b.kind)
+                       for b in schedule.blocks])
+    fig = px.timeline(df, x_start="Start", x_end="Finish", y="Task", color="Type",
+                      color_discrete_map={"Logistics": "#7f8c8d", "Activity": "#00d4ff", "Buffer": "#2ecc71"},
+                      height=350)
+    fig.add_vline(x=at(schedule.return_by_mins).timestamp() * 1000, line_width=2, line_dash="dash",
+                  line_color="#ff4b4b", annotation_text="🚨 MUST RETURN", annotation_position="top right",
+                  annotation_font_color="#ff4b4b")
+    fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(255, 255, 255, 0.05)",
+                      font=dict(color="#E0E0E0", size=13, family="Outfit"), margin=dict(l=20, r=20, t=40, b=20),
+                      showlegend=False, hovermode="x")
+    fig.update_xaxes(tickformat="%H:%M", gridcolor="rgba(255, 255, 255, 0.1)", title=None)
+    fig.update_yaxes(autorange="reversed", gridcolor="rgba(255, 255, 255, 0.1)", title=None)
+    return fig
+
+def per_call_ms(fn, cases, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for case in cases:
+            fn(*case)
+    return (time.perf_counter() - t0) * 1000 / (repeat * len(cases))
+
+def main():
+    parser = argparse.ArgumentParser(description="Timeline construction benchmark")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # A schedule-only caller must not pay for pandas or plotly
+    probe = "import sys, schedule; print(', '.join(m for m in ('pandas', 'plotly') if m in sys.modules) or 'neither')"
+    loaded = subprocess.run([sys.executable, "-c", probe], cwd=BASE_DIR, capture_output=True, text=True).stdout.strip()
+    print(f"📦 `import schedule` loads pandas/plotly: {loaded or '?'}")
+
+    import logic
+    import viz
+    from itinerary import plan_itinerary
+    from schedule import build_schedule
+
+    cases = []
+    for hub_id in logic.list_hub_ids():
+        for arrival, hours in ((2, 6.0), (9, 12.0), (14, 6.0), (20, 16.0)):
+            items = logic.rank_top_activities(hub_id, hours, arrival, logic.DEFAULT_QUERY, True, "Monday", k=5)["items"]
+            if items:
+                cases.append((items, arrival, hours, plan_itinerary(items, arrival, hours)))
+    schedules = [(build_schedule(*c),) for c in cases]
+    today = date.today()
+    print(f"⏳ {len(cases)} plans, {sum(len(s[0].blocks) for s in schedules) / len(schedules):.1f} blocks each\n")
+
+    legacy = per_call_ms(lambda s: legacy_timeline(s, today), schedules, args.repeat)
+    sched = per_call_ms(build_schedule, cases, args.repeat * 20)
+    cold = per_call_ms(lambda s: viz._timeline_figure.__wrapped__(s, today), schedules, args.repeat)
+    viz.create_timeline(*cases[0])
+    for c in cases:
+        viz.create_timeline(*c)
+    warm = per_call_ms(viz.create_timeline, cases, args.repeat * 20)
+
+    print(f"{'PATH':<44} | {'ms/call':>8}")
+    print("-" * 56)
+    print(f"{'before: DataFrame + px.timeline':<44} | {legacy:>8.3f}")
+    print(f"{'after: schedule only (schedule.py)':<44} | {sched:>8.3f}")
+    print(f"{'after: schedule + go figure (cold)':<44} | {sched + cold:>8.3f}")
+    print(f"{'after: create_timeline, unchanged plan':<44} | {warm:>8.3f}")
+    print(f"\n⚡ Cold figure {legacy / (sched + cold):.1f}x faster, memoized {legacy / warm:.0f}x faster")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import os
+import sys
+import csv
+import argparse
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OUT_PATH = os.path.join(BASE_DIR, "data", "airports.csv")
+
+# Builds data/airports.csv (read by airports.py) from the MIT-licensed
+# `airportsdata` package files (https://github.com/mborsetti/airportsdata):
+#   python scripts/build_airports.py path/to/airportsdata/airports.csv [--macs .../iata_macs.csv]
+# Only airports with an IATA code are kept (the routing speaks IATA). The
+# source has no traffic figures, so `size` is a tier: 3 = one of the busiest
+# passenger airports below, 2 = an "International" airport, 1 = the rest.
+
+# Roughly the world's busiest passenger airports (ACI rankings), busiest first
+BUSIEST = [
+    "ATL", "DXB", "DFW", "LHR", "HND", "DEN", "IST", "LAX", "ORD", "DEL", "CDG", "JFK", "AMS", "CAN", "FRA",
+    "MAD", "LAS", "PVG", "DOH", "SEA", "MCO", "CTU", "SZX", "SFO", "MIA", "CLT", "EWR", "PHX", "IAH", "BOS",
+    "BCN", "ICN", "SIN", "MUC", "KMG", "BKK", "CGK", "FCO", "MEX", "YYZ", "DMK", "MSP", "DTW", "LGW", "PEK",
+    "PKX", "SHA", "XIY", "CKG", "HGH", "BOM", "BLR", "MNL", "SGN", "HAN", "KUL", "HKG", "TPE", "SYD", "MEL",
+    "JED", "RUH", "AUH", "NRT", "KIX", "GRU", "BOG", "LIM", "CUN", "ZRH", "VIE", "CPH", "OSL", "ARN", "DUB",
+    "BRU", "LIS", "PMI", "AYT", "SAW", "ATH", "MAN", "STN", "ORY", "BER", "WAW", "PRG", "SVO", "DME", "LED",
+    "PHL", "BWI", "IAD", "SLC", "SAN", "TPA", "BNA", "AUS", "HNL", "FLL", "YVR", "YUL", "BNE", "AKL", "PER",
+    "HYD", "MAA", "CCU", "COK", "CAI", "JNB", "SCL", "GIG", "EZE", "CJU", "GMP", "CTS", "FUK", "WUH", "XMN",
+]
+
+def main():
+    parser = argparse.ArgumentParser(description="Build data/airports.csv from the airportsdata package")
+    parser.add_argument("source", help="airportsdata/airports.csv")
+    parser.add_argument("--macs", help="airportsdata/iata_macs.csv (metropolitan area codes, e.g. LON)")
+    parser.add_argument("--out", default=OUT_PATH)
+    args = parser.parse_args()
+
+    metro = {}
+    if args.macs:
+        with open(args.macs, "r", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                metro[row["Airport Code"]] = row["City Code"]
+
+    busiest = {code: i + 1 for i, code in enumerate(BUSIEST)}
+    rows = []
+    with open(args.source, "r", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            iata = row["iata"].strip().upper()
+            if len(iata) != 3:
+                continue
+            name = row["name"].strip()
+            if iata in busiest:
+                size = 3
+            elif "international" in name.lower():
+                size = 2
+            else:
+                size = 1
+            rows.append({
+                "iata": iata, "icao": row["icao"], "name": name, "city": row["city"].strip(),
+                "country": row["country"], "lat": row["lat"], "lon": row["lon"],
+                "size": size, "traffic_rank": busiest.get(iata, ""), "metro": metro.get(iata, ""),
+            })
+
+    rows.sort(key=lambda r: r["iata"])
+    with open(args.out, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    missing = sorted(set(BUSIEST) - {r["iata"] for r in rows})
+    print(f"✅ {len(rows):,} airports -> {args.out}")
+    if missing:
+        print(f"   ⚠️  Busiest codes missing from the source: {', '.join(missing)}")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+import os
+import sys
+import json
+import time
+import glob
+import sqlite3
+import hashlib
+import argparse
+from typing import Any, Dict
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_PATH = os.path.join(BASE_DIR, "layover.db")
+SOURCE_DIR = os.path.join(BASE_DIR, "data", "catalog")
+sys.path.insert(0, BASE_DIR)
+
+from catalog import EMBEDDING_MODEL, activity_text, bump_hub_versions, ensure_schema
+from vectors import EMBEDDING_DTYPE, EMBEDDING_DTYPES, Vectors, pack_rows
+
+# Catalog ETL: data/catalog/<hub>.json -> layover.db
+# Only curated rows (source = 'catalog') are diffed; bulk POI imports
+# (scripts/import_pois.py) live alongside them untouched.
+#   1. load    read and validate every hub source
+#   2. diff    per-activity content hashes vs the rows already in the DB
+#   3. embed   encode only new/changed activity texts, in batches
+#   4. write   one transaction, executemany for every table
+
+def _hash(obj: Any) -> str:
+    return hashlib.sha1(json.dumps(obj, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+def _hub_name_code(hub_id: str, hub: Dict[str, Any]):
+    meta = hub.get("meta", {})
+    name = hub.get("name") or hub.get("city_name") or meta.get("name") or hub_id.upper()
+    code = hub.get("airport_code") or meta.get("code") or hub_id.upper()
+    return name, code
+
+# ==========================================
+# 1. LOAD SOURCES
+# ==========================================
+def load_sources(source_dir: str) -> Dict[str, Dict[str, Any]]:
+    hubs = {}
+    for path in sorted(glob.glob(os.path.join(source_dir, "*.json"))):
+        hub_id = os.path.splitext(os.path.basename(path))[0].lower()
+        with open(path, "r", encoding="utf-8") as f:
+            hub = json.load(f)
+        seen = set()
+        for i, act in enumerate(hub.get("activities", [])):
+            act_id = act.get("id")
+            if not act_id:
+                raise ValueError(f"{path}: activity #{i} ({act.get('title', '?')}) has no id")
+            if act_id in seen:
+                raise ValueError(f"{path}: duplicate activity id {act_id}")
+            seen.add(act_id)
+        hubs[hub_id] = hub
+    return hubs
+
+# ==========================================
+# 2. DIFF AGAINST THE DB
+# ==========================================
+def diff(conn: sqlite3.Connection, sources: Dict[str, Dict[str, Any]], model: str, prune: bool,
+         dtype: str = EMBEDDING_DTYPE) -> Dict[str, Any]:
+    db_hubs = {hub_id: _hash(json.loads(fd or "{}")) for hub_id, fd in conn.execute("SELECT id, full_data FROM hubs")}
+    db_acts = {}
+    for act_id, hub_id, pos, c_hash, e_hash, e_model, e_dtype, has_emb in conn.execute(
+        "SELECT id, hub_id, position, content_hash, embed_hash, embedding_model, COALESCE(embedding_dtype, 'float32'), "
+        "embedding IS NOT NULL FROM activities WHERE source = 'catalog'"
+    ):
+        # A vector stored at another precision is re-encoded like a stale one
+        current = has_emb and e_model == model and e_dtype == dtype
+        db_acts[act_id] = (hub_id, pos, c_hash, e_hash if current else None)
+
+    plan = {"hubs": [], "upserts": [], "embed": [], "deletes": [], "drop_hubs": [], "touched": set(), "per_hub": {}}
+    source_ids = set()
+    for hub_id, hub in sources.items():
+        hub_doc = {k: v for k, v in hub.items() if k != "activities"}
+        counts = {"new": 0, "changed": 0, "removed": 0, "unchanged": 0, "embed": 0}
+        if db_hubs.get(hub_id) != _hash(hub_doc):
+            plan["hubs"].append((hub_id, hub_doc))
+        for pos, act in enumerate(hub.get("activities", [])):
+            act_id = act["id"]
+            source_ids.add(act_id)
+            c_hash, e_hash = _hash(act), _text_hash(activity_text(act))
+            old = db_acts.get(act_id)
+            if old is not None and old[:3] == (hub_id, pos, c_hash):
+                counts["unchanged"] += 1
+            else:
+                counts["new" if old is None else "changed"] += 1
+                plan["upserts"].append({"id": act_id, "hub_id": hub_id, "position": pos,
+                                        "content_hash": c_hash, "data": act})
+                plan["touched"].add(hub_id)
+                if old is not None and old[0] != hub_id:
+                    plan["touched"].add(old[0])  # Moved between hubs
+            if old is None or old[3] != e_hash:
+                # Only the embedded text matters: a new opening hour doesn't re-encode
+                counts["embed"] += 1
+                plan["embed"].append((act_id, e_hash, activity_text(act)))
+        plan["per_hub"][hub_id] = counts
+
+    for act_id, (hub_id, _, _, _) in db_acts.items():
+        if act_id not in source_ids and (hub_id in sources or prune):
+            plan["deletes"].append(act_id)
+            plan["touched"].add(hub_id)
+            if hub_id in plan["per_hub"]:
+                plan["per_hub"][hub_id]["removed"] += 1
+    if prune:
+        plan["drop_hubs"] = sorted(set(db_hubs) - set(sources))
+    return plan
+
+# ==========================================
+# 3. EMBED CHANGED ACTIVITIES
+# ==========================================
+def embed(plan: Dict[str, Any], batch_size: int, dtype: str = EMBEDDING_DTYPE) -> Dict[str, bytes]:
+    if not plan["embed"]:
+        return {}
+    # Imported here so a no-op run never pays for torch
+    from logic import encode_texts
+    blobs = {}
+    for i in range(0, len(plan["embed"]), batch_size):
+        batch = plan["embed"][i:i + batch_size]
+        embs = Vectors.quantize(encode_texts([text for _, _, text in batch]), dtype)
+        for (act_id, _, _), blob in zip(batch, pack_rows(embs)):
+            blobs[act_id] = blob
+        print(f"   🧠 Embedded {min(i + batch_size, len(plan['embed']))}/{len(plan['embed'])}")
+    return blobs
+
+# ==========================================
+# 4. WRITE (ONE TRANSACTION)
+# ==========================================
+def write(conn: sqlite3.Connection, plan: Dict[str, Any], blobs: Dict[str, bytes], model: str,
+          dtype: str = EMBEDDING_DTYPE):
+    embed_hashes = {act_id: e_hash for act_id, e_hash, _ in plan["embed"]}
+    with conn:
+        conn.executemany(
+            "INSERT INTO hubs (id, name, code, full_data) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET name = excluded.name, code = excluded.code, full_data = excluded.full_data",
+            [(hub_id, *_hub_name_code(hub_id, doc), json.dumps(doc, ensure_ascii=False)) for hub_id, doc in plan["hubs"]],
+        )
+        conn.executemany(
+            "INSERT INTO activities (id, hub_id, position, content_hash, data) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET hub_id = excluded.hub_id, position = excluded.position, "
+            "content_hash = excluded.content_hash, data = excluded.data",
+            [(u["id"], u["hub_id"], u["position"], u["content_hash"], json.dumps(u["data"], ensure_ascii=False))
+             for u in plan["upserts"]],
+        )
+        # Stale vectors are cleared even when --skip-embed leaves them for later
+        conn.executemany(
+            "UPDATE activities SET embed_hash = ?, embedding = ?, embedding_model = ?, embedding_dtype = ? WHERE id = ?",
+            [(embed_hashes[a] if a in blobs else None, blobs.get(a), model if a in blobs else None,
+              dtype if a in blobs else None, a)
+             for a in embed_hashes],
+        )
+        conn.executemany("DELETE FROM activities WHERE id = ?", [(a,) for a in plan["deletes"]])
+        conn.executemany("DELETE FROM activities WHERE hub_id = ?", [(h,) for h in plan["drop_hubs"]])
+        conn.executemany("DELETE FROM hubs WHERE id = ?", [(h,) for h in plan["drop_hubs"]])
+        # Hub rows rewritten above already bumped through their trigger
+        rewritten = {hub_id for hub_id, _ in plan["hubs"]}
+        bump_hub_versions(conn, sorted(plan["touched"] - rewritten - set(plan["drop_hubs"])))
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental catalog ETL (data/catalog -> layover.db)")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--source-dir", default=SOURCE_DIR)
+    parser.add_argument("--batch-size", type=int, default=64, help="activities per encode call")
+    parser.add_argument("--skip-embed", action="store_true", help="write rows now, embed on a later run")
+    parser.add_argument("--prune", action="store_true", help="delete hubs that have no source file")
+    parser.add_argument("--dry-run", action="store_true", help="print the diff without writing")
+    parser.add_argument("--embedding-dtype", choices=EMBEDDING_DTYPES, default=EMBEDDING_DTYPE,
+                        help="storage precision of the vectors; changing it re-embeds every activity")
+    args = parser.parse_args()
+
+    timings = {}
+    t0 = time.perf_counter()
+    sources = load_sources(args.source_dir)
+    timings["load"] = time.perf_counter() - t0
+    print(f"📂 Loaded {len(sources)} hub sources from {args.source_dir}")
+
+    conn = sqlite3.connect(args.db)
+    try:
+        ensure_schema(conn)
+        t0 = time.perf_counter()
+        plan = diff(conn, sources, EMBEDDING_MODEL, args.prune, args.embedding_dtype)
+        timings["diff"] = time.perf_counter() - t0
+
+        print(f"\n{'HUB':<6} | {'NEW':>5} | {'CHANGED':>7} | {'REMOVED':>7} | {'SAME':>5} | {'EMBED':>5}")
+        print("-" * 50)
+        for hub_id, c in sorted(plan["per_hub"].items()):
+            print(f"{hub_id.upper():<6} | {c['new']:>5} | {c['changed']:>7} | {c['removed']:>7} | {c['unchanged']:>5} | {c['embed']:>5}")
+        for hub_id in plan["drop_hubs"]:
+            print(f"{hub_id.upper():<6} | 🗑️  removed (no source file)")
+        print(f"\n   Hub rows to rewrite: {len(plan['hubs'])}, activity upserts: {len(plan['upserts'])}, "
+              f"deletes: {len(plan['deletes'])}, to embed: {len(plan['embed'])}")
+
+        if args.dry_run:
+            print("\n🔎 Dry run: nothing written.")
+            return
+
+        t0 = time.perf_counter()
+        blobs = {} if args.skip_embed else embed(plan, args.batch_size, args.embedding_dtype)
+        timings["embed"] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        write(conn, plan, blobs, EMBEDDING_MODEL, args.embedding_dtype)
+        timings["write"] = time.perf_counter() - t0
+    finally:
+        conn.close()
+
+    changed = sorted(plan["touched"] | {h for h, _ in plan["hubs"]})
+    print(f"\n✅ Catalog updated. Hubs with a new version: {', '.join(h.upper() for h in changed) or 'none'}")
+    print("⏱️  " + " | ".join(f"{stage} {secs * 1000:.0f} ms" for stage, secs in timings.items()))
+
+if __name__ == "__main__":
+    main()
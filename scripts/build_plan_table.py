@@ -0,0 +1,73 @@
+import os
+import sys
+import time
+import sqlite3
+import argparse
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_PATH = os.path.join(BASE_DIR, "layover.db")
+sys.path.insert(0, BASE_DIR)
+
+from catalog import catalog_version, read_hub_versions
+from plantable import PLAN_TABLE_DIR, build_plan_table, get_plan_table, table_version
+
+# Materializes first pages, itineraries and risk for the common request grid
+# (logic.plan_table_axes) into plantables/. Run it after every catalog build: it
+# only rebuilds when the catalog version (or the grid) changed since the
+# current table, and the app serves a hub from the table only while that hub's
+# version still matches.
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the materialized plan table")
+    parser.add_argument("--force", action="store_true", help="rebuild even if the current table is up to date")
+    args = parser.parse_args()
+
+    if not os.path.exists(DB_PATH):
+        print("❌ DB not found.")
+        return
+
+    # Imported here so --help style failures don't pay for torch
+    import logic
+
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        version, hub_versions = catalog_version(conn), read_hub_versions(conn)
+    finally:
+        conn.close()
+    hub_ids = [h for h in logic.list_hub_ids() if h in hub_versions]
+    axes = logic.plan_table_axes(hub_ids)
+
+    table_dir = os.path.join(BASE_DIR, PLAN_TABLE_DIR)
+    target = table_version(version, axes, logic.PLAN_TABLE_K)
+    current = get_plan_table(table_dir)
+    if current is not None and current.version == target and not args.force:
+        print(f"✅ Plan table {target} is up to date.")
+        return
+    if args.force:
+        import shutil
+        shutil.rmtree(os.path.join(table_dir, target), ignore_errors=True)
+
+    # Canned queries are encoded once; their vibe labels ride along for serving
+    queries = {q: logic.encode_query(q) for q in axes["query"]}
+    vibes = {q: logic.analyze_vibe(q, e) for q, e in queries.items()}
+
+    def solve(hub, arrival_hour, day, hours, visa_valid, query):
+        return logic.materialize_plan(hub, arrival_hour, day, hours, visa_valid, query, queries[query], vibes[query])
+
+    t0 = time.perf_counter()
+
+    def progress(done, total):
+        rate = done / max(time.perf_counter() - t0, 1e-9)
+        print(f"\r   {done:,}/{total:,} cells ({rate:,.0f}/s)", end="", flush=True)
+
+    print(f"🗂️  Materializing {' x '.join(str(len(v)) for v in axes.values())} plan grid into {table_dir} ...")
+    built = build_plan_table(version, {h: hub_versions[h] for h in hub_ids}, axes, logic.PLAN_TABLE_K, solve,
+                             {q: v["labels"] for q, v in vibes.items()}, table_dir=table_dir, progress=progress)
+    elapsed = time.perf_counter() - t0
+
+    folder = os.path.join(table_dir, built)
+    size_mb = sum(os.path.getsize(os.path.join(folder, f)) for f in os.listdir(folder)) / 1e6
+    print(f"\n   ✅ Plan table {built}: {size_mb:.1f} MB on disk ({elapsed:.0f}s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_PATH = os.path.join(BASE_DIR, "layover.db")
+sys.path.insert(0, BASE_DIR)
+
+from snapshot import SNAPSHOT_DIR, build_snapshot, get_snapshot
+from vectors import EMBEDDING_DTYPE
+
+def main():
+    if not os.path.exists(DB_PATH):
+        print("❌ DB not found.")
+        return
+
+    # Imported here so --help style failures don't pay for torch
+    from logic import MODEL_NAME, encode_texts
+
+    snapshot_dir = os.path.join(BASE_DIR, SNAPSHOT_DIR)
+    print(f"🧊 Building shared embedding snapshot in {snapshot_dir} ...")
+    t0 = time.perf_counter()
+    version = build_snapshot(DB_PATH, encode_texts, MODEL_NAME, snapshot_dir=snapshot_dir, dtype=EMBEDDING_DTYPE)
+    elapsed = time.perf_counter() - t0
+
+    snap = get_snapshot(snapshot_dir)
+    rows, dim = snap.embeddings.shape if snap is not None else (0, 0)
+    size_mb = (snap.vectors.nbytes + snap.numeric.nbytes) / 1e6 if snap is not None else 0
+    dtype = snap.vectors.dtype if snap is not None else EMBEDDING_DTYPE
+    print(f"   ✅ Snapshot {version}: {rows} activities x {dim} dims ({dtype}), {size_mb:.1f} MB mapped ({elapsed:.1f}s)")
+
+if __name__ == "__main__":
+    main()
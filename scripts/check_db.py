@@ -1,10 +1,13 @@
 import sqlite3
-import json
 import os
+import sys
 
 # Path to your DB
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DB_PATH = os.path.join(BASE_DIR, "layover.db")
+sys.path.insert(0, BASE_DIR)
+
+from catalog import read_hub
 
 def check_database():
     if not os.path.exists(DB_PATH):
@@ -16,16 +19,13 @@ def check_database():
     print("-" * 65)
 
     conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
 
     try:
-        c.execute("SELECT id, full_data FROM hubs")
-        rows = c.fetchall()
+        hub_ids = [r[0] for r in conn.execute("SELECT id FROM hubs ORDER BY id")]
 
-        for row in rows:
-            hub_id = row['id'].upper()
-            data = json.loads(row['full_data'])
+        for hub_id in hub_ids:
+            data = read_hub(conn, hub_id) or {}
+            hub_id = hub_id.upper()
             
             # Count activities
             activities = data.get("activities", [])
@@ -0,0 +1,342 @@
+import os
+import re
+import sys
+import csv
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+import itertools
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_PATH = os.path.join(BASE_DIR, "layover.db")
+sys.path.insert(0, BASE_DIR)
+
+from catalog import EMBEDDING_MODEL, activity_text, bump_hub_versions, ensure_schema
+from vectors import EMBEDDING_DTYPE, EMBEDDING_DTYPES, Vectors, pack_rows
+
+# Streams a large POI export (CSV / JSONL / GeoJSON) into one hub's activities.
+# Memory stays bounded by --batch-size: records are read, mapped, embedded and
+# committed one chunk at a time, and the chunk's commit also records progress
+# so an interrupted run resumes where it stopped.
+
+IMPORT_POSITION_BASE = 1_000_000  # Imported POIs sort after the curated activities
+
+# ==========================================
+# 1. STREAMING READERS
+# ==========================================
+def iter_csv(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        yield from csv.DictReader(f)
+
+def iter_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+def iter_geojson(path: str, chunk_size: int = 1 << 20) -> Iterator[Dict[str, Any]]:
+    # Walks the "features" array object by object instead of json.load()ing the whole file
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf, pos, started = "", 0, False
+        while True:
+            chunk = f.read(chunk_size)
+            buf, pos = buf[pos:] + chunk, 0
+            if not started:
+                start = buf.find('"features"')
+                bracket = buf.find("[", start) if start >= 0 else -1
+                if bracket < 0:
+                    if not chunk:
+                        return
+                    if start < 0:
+                        buf = buf[-len('"features"'):]
+                    continue
+                pos, started = bracket + 1, True
+            while True:
+                while pos < len(buf) and buf[pos] in " \t\r\n,":
+                    pos += 1
+                if pos >= len(buf) or buf[pos] == "]":
+                    break
+                try:
+                    feature, pos = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    break  # Feature split across chunks: read more
+                yield feature
+            if pos < len(buf) and buf[pos] == "]":
+                return
+            if not chunk:
+                raise ValueError(f"{path}: truncated GeoJSON feature collection")
+
+READERS = {".csv": iter_csv, ".jsonl": iter_jsonl, ".ndjson": iter_jsonl, ".geojson": iter_geojson, ".json": iter_geojson}
+
+# ==========================================
+# 2. MAPPING & VALIDATION
+# ==========================================
+ACTIVITY_TYPES = ("FOOD", "SIGHTS", "CULTURE", "RELAX", "SLEEP", "SHOPPING", "ADVENTURE", "NATURE")
+
+# OSM-style tags and common export categories -> activity type
+CATEGORY_TYPES = {
+    "FOOD": ("restaurant", "cafe", "fast_food", "food_court", "bar", "pub", "food", "bakery", "hawker", "street_food"),
+    "CULTURE": ("museum", "gallery", "arts_centre", "place_of_worship", "temple", "mosque", "church", "shrine",
+                "heritage", "monument", "memorial", "castle", "theatre", "library"),
+    "SIGHTS": ("viewpoint", "attraction", "landmark", "tower", "sightseeing", "square", "fountain"),
+    "NATURE": ("park", "garden", "nature_reserve", "beach", "zoo", "botanical_garden", "forest"),
+    "SHOPPING": ("mall", "marketplace", "market", "shop", "department_store", "shopping", "souvenir"),
+    "RELAX": ("spa", "massage", "lounge", "sauna", "bathhouse", "onsen", "hammam"),
+    "SLEEP": ("hotel", "hostel", "capsule", "motel", "guest_house", "sleep"),
+    "ADVENTURE": ("theme_park", "water_park", "climbing", "escape_game", "amusement_arcade", "sports_centre"),
+}
+_CATEGORY_LOOKUP = {tag: t for t, tags in CATEGORY_TYPES.items() for tag in tags}
+DEFAULT_DURATION_HOURS = {"FOOD": 1.0, "SIGHTS": 1.5, "CULTURE": 2.0, "RELAX": 1.5,
+                          "SLEEP": 4.0, "SHOPPING": 1.5, "ADVENTURE": 2.5, "NATURE": 2.0}
+_HOURS_RE = re.compile(r"(\d{1,2}):?(\d{2})?\s*-\s*(\d{1,2}):?(\d{2})?")
+
+def _first(rec: Dict[str, Any], *keys: str) -> Any:
+    for k in keys:
+        v = rec.get(k)
+        if v not in (None, ""):
+            return v
+    return None
+
+def _flag(v: Any) -> bool:
+    return str(v).strip().lower() in ("1", "true", "yes", "y")
+
+def _activity_type(raw: Any) -> Optional[str]:
+    if raw is None:
+        return None
+    for token in re.split(r"[;,|/]", str(raw)):
+        token = token.strip()
+        if token.upper() in ACTIVITY_TYPES:
+            return token.upper()
+        t = _CATEGORY_LOOKUP.get(token.lower().replace(" ", "_"))
+        if t:
+            return t
+    return None
+
+def _hours(props: Dict[str, Any]) -> Tuple[bool, int, int]:
+    if _flag(props.get("is_24h")):
+        return True, 0, 24
+    spec = props.get("opening_hours")
+    if spec is not None:
+        spec = str(spec)
+        if "24/7" in spec or "00:00-24:00" in spec:
+            return True, 0, 24
+        m = _HOURS_RE.search(spec)
+        if m:
+            # First range only: "Mo-Fr 09:00-18:00; Sa 10:00-16:00" -> 9..18
+            return False, int(m.group(1)), int(m.group(3))
+    open_h = _first(props, "opening_hour_24", "open_hour", "opens")
+    close_h = _first(props, "closing_hour_24", "close_hour", "closes")
+    if open_h is not None and close_h is not None:
+        return False, int(float(open_h)), int(float(close_h))
+    return False, 9, 18  # Unknown hours: assume daytime so nothing is shown as open at 3am
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", str(text).lower()).strip("_")
+
+def map_record(rec: Dict[str, Any], hub_id: str, default_zone: str) -> Tuple[Optional[Dict[str, Any]], str]:
+    """Maps one raw record into the activity schema. Returns (activity, "") or (None, reject_reason)."""
+    props = rec.get("properties") if isinstance(rec.get("properties"), dict) else rec
+    lat, lon = _first(props, "lat", "latitude", "y"), _first(props, "lon", "lng", "longitude", "x")
+    geom = rec.get("geometry") or {}
+    if (lat is None or lon is None) and geom.get("type") == "Point":
+        lon, lat = (geom.get("coordinates") or [None, None])[:2]
+
+    title = _first(props, "title", "name:en", "name")
+    if not title or not str(title).strip():
+        return None, "no_title"
+    try:
+        lat, lon = float(lat), float(lon)
+    except (TypeError, ValueError):
+        return None, "no_coordinates"
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180) or (lat == 0 and lon == 0):
+        return None, "bad_coordinates"
+
+    category = _first(props, "type", "category", "amenity", "tourism", "leisure", "historic", "shop")
+    act_type = _activity_type(category)
+    if act_type is None:
+        return None, "unmapped_type"
+
+    zone = str(_first(props, "zone") or default_zone).upper()
+    if zone not in ("AIRSIDE", "LANDSIDE"):
+        return None, "bad_zone"
+    try:
+        is_24h, open_h, close_h = _hours(props)
+        duration = float(_first(props, "min_duration_hours", "duration_hours") or DEFAULT_DURATION_HOURS[act_type])
+    except (TypeError, ValueError):
+        return None, "bad_hours"
+    if not (0 <= open_h <= 24 and 0 <= close_h <= 24) or not (0 < duration <= 24):
+        return None, "bad_hours"
+
+    source_id = _first(props, "id", "poi_id", "osm_id", "@id") or rec.get("id")
+    if source_id is None:
+        source_id = hashlib.sha1(f"{title}|{lat:.5f}|{lon:.5f}".encode("utf-8")).hexdigest()[:12]
+    description = _first(props, "description") or f"{str(category).replace('_', ' ').title()}. Keywords: {act_type.lower()}."
+
+    time_constraints = {"min_duration_hours": duration, "is_24h": is_24h}
+    if not is_24h:
+        time_constraints.update({"opening_hour_24": open_h, "closing_hour_24": close_h})
+    return {
+        "id": f"{hub_id}_poi_{_slug(source_id)}",
+        "title": str(title).strip(),
+        "type": act_type,
+        "description": str(description),
+        "location": {"lat": round(lat, 6), "lon": round(lon, 6), "zone": zone},
+        "time_constraints": time_constraints,
+        "cost_tier": str(_first(props, "cost_tier") or "MEDIUM").upper(),
+    }, ""
+
+# ==========================================
+# 3. RESUMABLE CHUNKED WRITES
+# ==========================================
+def _ensure_progress_table(conn: sqlite3.Connection):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS import_progress (
+            hub_id TEXT NOT NULL,
+            source TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            records_done INTEGER NOT NULL,
+            imported INTEGER NOT NULL,
+            finished_at INTEGER,
+            PRIMARY KEY (hub_id, source)
+        )
+    """)
+    conn.commit()
+
+def _fingerprint(path: str) -> str:
+    st = os.stat(path)
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+def _content_hash(act: Dict[str, Any]) -> str:
+    return hashlib.sha1(json.dumps(act, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+def write_chunk(conn: sqlite3.Connection, hub_id: str, source: str, rows: List[Tuple[int, Dict[str, Any]]],
+                embs: Optional[Vectors], records_done: int, imported: int):
+    blobs = pack_rows(embs) if embs is not None else None
+    params = []
+    for i, (record_no, act) in enumerate(rows):
+        text = activity_text(act)
+        params.append((
+            act["id"], hub_id, IMPORT_POSITION_BASE + record_no, _content_hash(act),
+            json.dumps(act, ensure_ascii=False),
+            hashlib.sha1(text.encode("utf-8")).hexdigest() if embs is not None else None,
+            blobs[i] if blobs is not None else None,
+            EMBEDDING_MODEL if embs is not None else None,
+            embs.dtype if embs is not None else None,
+            source,
+        ))
+    with conn:  # Rows and the resume point commit together
+        conn.executemany(
+            "INSERT INTO activities (id, hub_id, position, content_hash, data, embed_hash, embedding, embedding_model, "
+            "embedding_dtype, source) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(id) DO UPDATE SET hub_id = excluded.hub_id, "
+            "position = excluded.position, content_hash = excluded.content_hash, data = excluded.data, "
+            "embed_hash = excluded.embed_hash, embedding = excluded.embedding, "
+            "embedding_model = excluded.embedding_model, embedding_dtype = excluded.embedding_dtype, source = excluded.source",
+            params,
+        )
+        conn.execute("UPDATE import_progress SET records_done = ?, imported = ? WHERE hub_id = ? AND source = ?",
+                     (records_done, imported, hub_id, source))
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream a POI export (CSV/JSONL/GeoJSON) into a hub's activities")
+    parser.add_argument("hub", help="hub id, e.g. sin (must already exist in the catalog)")
+    parser.add_argument("path", help="export file (.csv, .jsonl/.ndjson, .geojson/.json)")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--batch-size", type=int, default=1000, help="records per transaction and encode call")
+    parser.add_argument("--zone", default="LANDSIDE", help="zone for records without one")
+    parser.add_argument("--skip-embed", action="store_true", help="import rows only; the app encodes on first use")
+    parser.add_argument("--embedding-dtype", choices=EMBEDDING_DTYPES, default=EMBEDDING_DTYPE,
+                        help="storage precision of the vectors (see vectors.py)")
+    parser.add_argument("--restart", action="store_true", help="ignore saved progress and start from record 0")
+    parser.add_argument("--replace", action="store_true", help="delete rows from an earlier import of this file first")
+    args = parser.parse_args()
+
+    hub_id = args.hub.lower()
+    ext = os.path.splitext(args.path)[1].lower()
+    if ext not in READERS:
+        print(f"❌ Unsupported format '{ext}'. Use one of: {', '.join(sorted(READERS))}")
+        return
+    source = f"import:{os.path.basename(args.path)}"
+    fingerprint = _fingerprint(args.path)
+
+    conn = sqlite3.connect(args.db)
+    try:
+        ensure_schema(conn)
+        _ensure_progress_table(conn)
+        if conn.execute("SELECT 1 FROM hubs WHERE id = ?", (hub_id,)).fetchone() is None:
+            print(f"❌ Hub '{hub_id}' not found. Add it with scripts/build_catalog.py first.")
+            return
+
+        row = conn.execute("SELECT fingerprint, records_done, imported, finished_at FROM import_progress "
+                           "WHERE hub_id = ? AND source = ?", (hub_id, source)).fetchone()
+        start, imported = 0, 0
+        if row and row[0] == fingerprint and not args.restart:
+            if row[3] is not None:
+                print(f"✅ {args.path} already imported into {hub_id.upper()} ({row[2]} activities). Use --restart to re-run.")
+                return
+            start, imported = row[1], row[2]
+            print(f"⏩ Resuming {args.path} at record {start} ({imported} already imported)")
+        with conn:
+            if args.replace and start == 0:
+                n = conn.execute("DELETE FROM activities WHERE hub_id = ? AND source = ?", (hub_id, source)).rowcount
+                print(f"🗑️  Removed {n} rows from the previous import")
+            conn.execute("INSERT OR REPLACE INTO import_progress (hub_id, source, fingerprint, records_done, imported, finished_at) "
+                         "VALUES (?, ?, ?, ?, ?, NULL)", (hub_id, source, fingerprint, start, imported))
+
+        encode_texts = None
+        if not args.skip_embed:
+            from logic import encode_texts  # Imported here so --skip-embed never pays for torch
+
+        print(f"📥 Importing {args.path} -> {hub_id.upper()} in chunks of {args.batch_size}")
+        rejects: Counter = Counter()
+        records = itertools.islice(READERS[ext](args.path), start, None)
+        record_no, t0, embed_s = start, time.perf_counter(), 0.0
+        while True:
+            chunk = list(itertools.islice(records, args.batch_size))
+            if not chunk:
+                break
+            rows, seen = [], set()
+            for rec in chunk:
+                act, reason = map_record(rec, hub_id, args.zone.upper())
+                if act is None:
+                    rejects[reason] += 1
+                elif act["id"] in seen:
+                    rejects["duplicate_id"] += 1
+                else:
+                    seen.add(act["id"])
+                    rows.append((record_no, act))
+                record_no += 1
+            embs = None
+            if encode_texts is not None and rows:
+                te = time.perf_counter()
+                embs = Vectors.quantize(encode_texts([activity_text(a) for _, a in rows]), args.embedding_dtype)
+                embed_s += time.perf_counter() - te
+            imported += len(rows)
+            write_chunk(conn, hub_id, source, rows, embs, record_no, imported)
+            rate = (record_no - start) / max(time.perf_counter() - t0, 1e-9)
+            print(f"   ... {record_no} records read, {imported} imported ({rate:,.0f} records/s)")
+
+        with conn:
+            # One version bump per import: the app reloads the hub once, not once per chunk
+            bump_hub_versions(conn, [hub_id])
+            conn.execute("UPDATE import_progress SET finished_at = strftime('%s', 'now') WHERE hub_id = ? AND source = ?",
+                         (hub_id, source))
+    finally:
+        conn.close()
+
+    elapsed = time.perf_counter() - t0
+    read = record_no - start
+    print(f"\n✅ {read} records in {elapsed:.1f}s ({read / max(elapsed, 1e-9):,.0f} records/s), "
+          f"{imported} activities in {hub_id.upper()}")
+    if not args.skip_embed:
+        print(f"   🧠 Embedding: {embed_s:.1f}s")
+    if rejects:
+        print("   ⚠️  Rejected: " + ", ".join(f"{reason} {n}" for reason, n in rejects.most_common()))
+
+if __name__ == "__main__":
+    main()
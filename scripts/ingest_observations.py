@@ -0,0 +1,205 @@
+import os
+import sys
+import time
+import sqlite3
+import argparse
+from collections import Counter
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_PATH = os.path.join(BASE_DIR, "layover.db")
+sys.path.insert(0, BASE_DIR)
+
+from catalog import bump_hub_versions, ensure_schema
+from sketch import QuantileSketch
+
+# Streams queue-time / travel-time logs into per hub x metric x hour-of-week
+# quantile sketches (sketch.py) and publishes their p50/p90 to `live_stats`,
+# where logic.Airport picks them up instead of the static multipliers.
+#   - Files are read in --chunk-size row chunks (pandas C parser, .gz ok), so
+#     memory is bounded by one chunk plus ~hubs x 2 x 168 small sketches.
+#   - Each file merges into the stored sketches and commits on its own, and is
+#     recorded in `ingest_log`: re-runs skip files already ingested.
+#   - Timestamps are hub-local wall-clock times (any UTC offset is dropped).
+
+METRICS = ("immigration", "transit")
+HOURS_PER_WEEK = 168
+MAX_MINUTES = 24 * 60           # Anything longer is a logging error, not a queue
+
+# ==========================================
+# 1. STREAMING READERS
+# ==========================================
+def iter_chunks(path: str, columns: List[str], chunk_size: int) -> Iterator[pd.DataFrame]:
+    name = path[:-3] if path.endswith(".gz") else path
+    ext = os.path.splitext(name)[1].lower()
+    if ext == ".csv":
+        reader = pd.read_csv(path, usecols=lambda c: c in columns, chunksize=chunk_size, dtype=str)
+    elif ext in (".jsonl", ".ndjson"):
+        reader = pd.read_json(path, lines=True, chunksize=chunk_size, dtype=False)
+    else:
+        raise ValueError(f"Unsupported format '{ext}'. Use .csv or .jsonl/.ndjson (optionally .gz)")
+    for chunk in reader:
+        yield chunk
+
+def _hour_of_week(raw: pd.Series) -> np.ndarray:
+    ts = pd.to_datetime(raw, errors="coerce", utc=False)
+    if getattr(ts.dt, "tz", None) is not None:
+        ts = ts.dt.tz_localize(None)
+    how = ts.dt.dayofweek * 24 + ts.dt.hour
+    return how.fillna(-1).to_numpy(dtype=np.int64)
+
+# ==========================================
+# 2. SKETCHING
+# ==========================================
+Key = Tuple[str, str, int]  # (hub_id, metric, hour_of_week)
+
+def _column(chunk: pd.DataFrame, name: str, constant=None) -> pd.Series:
+    if constant is not None:
+        return pd.Series(constant, index=chunk.index)
+    return chunk[name] if name in chunk else pd.Series(np.nan, index=chunk.index, dtype=object)
+
+def sketch_chunk(chunk: pd.DataFrame, args, hubs: set, sketches: Dict[Key, QuantileSketch], rejects: Counter) -> int:
+    n = len(chunk)
+    hub = _column(chunk, args.hub_col, args.hub).astype(str).str.strip().str.lower()
+    metric = _column(chunk, args.metric_col, args.metric).astype(str).str.strip().str.lower()
+    minutes = pd.to_numeric(_column(chunk, args.value_col), errors="coerce").to_numpy(dtype=np.float64)
+    how = _hour_of_week(_column(chunk, args.time_col))
+
+    checks = [
+        ("unknown_hub", hub.isin(hubs).to_numpy()),
+        ("unknown_metric", metric.isin(METRICS).to_numpy()),
+        ("bad_time", how >= 0),
+        ("bad_minutes", np.isfinite(minutes) & (minutes >= 0) & (minutes <= MAX_MINUTES)),
+    ]
+    ok = np.ones(n, dtype=bool)
+    for reason, passed in checks:
+        rejects[reason] += int(np.count_nonzero(ok & ~passed))
+        ok &= passed
+    if not ok.any():
+        return 0
+
+    # Sort once by group, then hand each contiguous slice to its sketch
+    hub_codes, hub_names = pd.factorize(hub[ok])
+    metric_codes = pd.Categorical(metric[ok], categories=METRICS).codes.astype(np.int64)
+    group = (hub_codes.astype(np.int64) * len(METRICS) + metric_codes) * HOURS_PER_WEEK + how[ok]
+    order = np.argsort(group, kind="stable")
+    group, values = group[order], minutes[ok][order]
+    bounds = np.flatnonzero(np.diff(group)) + 1
+    for g, vals in zip(group[np.r_[0, bounds]], np.split(values, bounds)):
+        hm, h = divmod(int(g), HOURS_PER_WEEK)
+        key = (hub_names[hm // len(METRICS)], METRICS[hm % len(METRICS)], h)
+        if key not in sketches:
+            sketches[key] = QuantileSketch()
+        sketches[key].add(vals)
+    return int(np.count_nonzero(ok))
+
+# ==========================================
+# 3. PUBLISH (ONE TRANSACTION PER FILE)
+# ==========================================
+def _ensure_log_table(conn: sqlite3.Connection):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS ingest_log (
+            path TEXT PRIMARY KEY,
+            fingerprint TEXT NOT NULL,
+            rows INTEGER NOT NULL,
+            accepted INTEGER NOT NULL,
+            finished_at INTEGER
+        )
+    """)
+    conn.commit()
+
+def _fingerprint(path: str) -> str:
+    st = os.stat(path)
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+def publish(conn: sqlite3.Connection, sketches: Dict[Key, QuantileSketch], path: str, rows: int, accepted: int):
+    params = []
+    for (hub_id, metric, how), sk in sketches.items():
+        row = conn.execute("SELECT sketch FROM live_stats WHERE hub_id = ? AND metric = ? AND hour_of_week = ?",
+                           (hub_id, metric, how)).fetchone()
+        if row is not None:
+            sk.merge(QuantileSketch.from_bytes(row[0]))
+        params.append((hub_id, metric, how, sk.count, sk.quantile(0.5), sk.quantile(0.9), sk.to_bytes()))
+    with conn:  # Stats and the ingest record commit together
+        conn.executemany(
+            "INSERT OR REPLACE INTO live_stats (hub_id, metric, hour_of_week, n, p50, p90, sketch, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, strftime('%s', 'now'))",
+            params,
+        )
+        conn.execute("INSERT OR REPLACE INTO ingest_log (path, fingerprint, rows, accepted, finished_at) "
+                     "VALUES (?, ?, ?, ?, strftime('%s', 'now'))", (os.path.abspath(path), _fingerprint(path), rows, accepted))
+        # Cached Airport models are keyed by hub version
+        bump_hub_versions(conn, sorted({hub_id for hub_id, _, _ in sketches}))
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream queue/travel-time logs into live p50/p90 per hub and hour of week")
+    parser.add_argument("paths", nargs="+", help="log files (.csv, .jsonl/.ndjson, optionally .gz)")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--chunk-size", type=int, default=500_000, help="rows held in memory at once")
+    parser.add_argument("--hub", help="hub id for every row (files split per hub)")
+    parser.add_argument("--metric", choices=METRICS, help="metric for every row (files split per metric)")
+    parser.add_argument("--hub-col", default="hub")
+    parser.add_argument("--metric-col", default="metric")
+    parser.add_argument("--time-col", default="observed_at")
+    parser.add_argument("--value-col", default="minutes")
+    parser.add_argument("--reset", action="store_true", help="drop all published stats (and the ingest log) first")
+    parser.add_argument("--force", action="store_true", help="re-ingest logged files (their rows count again; pair with --reset to rebuild)")
+    args = parser.parse_args()
+    if args.hub:
+        args.hub = args.hub.lower()
+    columns = [args.hub_col, args.metric_col, args.time_col, args.value_col]
+
+    conn = sqlite3.connect(args.db)
+    try:
+        ensure_schema(conn)
+        _ensure_log_table(conn)
+        hubs = {h for (h,) in conn.execute("SELECT id FROM hubs")}
+        if args.reset:
+            with conn:
+                stale = [h for (h,) in conn.execute("SELECT DISTINCT hub_id FROM live_stats")]
+                conn.execute("DELETE FROM live_stats")
+                conn.execute("DELETE FROM ingest_log")
+                bump_hub_versions(conn, stale)
+            print(f"🗑️  Cleared live stats for {len(stale)} hubs")
+
+        total_rows, total_accepted, t_start = 0, 0, time.perf_counter()
+        rejects: Counter = Counter()
+        for path in args.paths:
+            done = conn.execute("SELECT fingerprint, accepted FROM ingest_log WHERE path = ?", (os.path.abspath(path),)).fetchone()
+            if done and done[0] == _fingerprint(path) and not args.force:
+                print(f"⏩ {path} already ingested ({done[1]:,} observations). Use --force to re-run.")
+                continue
+            print(f"📥 {path}")
+            sketches: Dict[Key, QuantileSketch] = {}
+            rows, accepted, t0 = 0, 0, time.perf_counter()
+            for chunk in iter_chunks(path, columns, args.chunk_size):
+                accepted += sketch_chunk(chunk, args, hubs, sketches, rejects)
+                rows += len(chunk)
+                rate = rows / max(time.perf_counter() - t0, 1e-9)
+                print(f"   ... {rows:,} rows, {accepted:,} accepted ({rate:,.0f} rows/s)")
+            publish(conn, sketches, path, rows, accepted)
+            total_rows += rows
+            total_accepted += accepted
+            print(f"   ✅ {len(sketches)} hub/metric/hour slots updated")
+
+        summary = conn.execute(
+            "SELECT hub_id, metric, COUNT(*), SUM(n) FROM live_stats GROUP BY hub_id, metric ORDER BY hub_id, metric"
+        ).fetchall()
+    finally:
+        conn.close()
+
+    elapsed = time.perf_counter() - t_start
+    print(f"\n✅ {total_rows:,} rows in {elapsed:.1f}s ({total_rows / max(elapsed, 1e-9):,.0f} rows/s), {total_accepted:,} accepted")
+    if rejects:
+        print("   ⚠️  Rejected: " + ", ".join(f"{reason} {n:,}" for reason, n in rejects.most_common() if n))
+    if summary:
+        print(f"\n{'HUB':<6} | {'METRIC':<12} | {'HOURS':>5} | {'OBSERVATIONS':>12}")
+        print("-" * 45)
+        for hub_id, metric, hours, n in summary:
+            print(f"{hub_id.upper():<6} | {metric:<12} | {hours:>5} | {n:>12,}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+import os
+import sys
+import time
+import random
+import argparse
+import threading
+import contextlib
+from typing import Dict, List
+from unittest import mock
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(BASE_DIR, "app.py")
+sys.path.insert(0, BASE_DIR)
+
+# Concurrent-session load test of the real app.py. Every virtual user is its own
+# headless Streamlit session (streamlit.testing AppTest) in this one process,
+# so they share the model, caches and GIL exactly like sessions on one replica.
+# Each user runs scripted journeys; every step is one rerun:
+#   vibe -> find hub -> generate -> refine -> change hub
+# Weather and Lottie requests are answered locally; the encoder is the real one.
+# AppTest reruns the whole page on every interaction (no fragment scoping), so
+# the numbers are an upper bound on what browser sessions see.
+
+VIBES = [
+    "I want local food and sightseeing", "quiet lounge and a shower", "halal street food",
+    "museum and history", "sleep pod near the gate", "duty free shopping", "skyline photos",
+    "cheap eats and a walk", "spa and massage", "temple and culture tour",
+]
+HUBS = ["doh", "dxb", "sin", "bkk", "lhr", "ist", "hnd", "ams", "icn", "cdg"]
+REFINES = ["more_chill", "more_culture", "only_airside", "cheaper", "max_sights"]
+STEPS = ["vibe", "find", "generate", "refine", "hub"]
+
+# ==========================================
+# 1. LOCAL STUBS FOR EXTERNAL CALLS
+# ==========================================
+class _Response:
+    def __init__(self, payload):
+        self.status_code = 200
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        pass
+
+def fake_get(url, *args, **kwargs):
+    if "open-meteo" in url:
+        return _Response({"current": {"temperature_2m": 27, "weather_code": 1, "is_day": 1}})
+    if "lottiefiles" in url:
+        return _Response({"v": "5.5.7", "fr": 30, "ip": 0, "op": 1, "w": 10, "h": 10, "layers": []})
+    raise ConnectionError(f"load test: unexpected outbound request to {url}")
+
+@contextlib.contextmanager
+def shared_runtime():
+    """Makes side-by-side AppTest sessions share process state the way a server's do.
+
+    AppTest installs a mock Runtime per run and clears it afterwards, so with
+    concurrent sessions that global flips under them: keep serving the last one.
+    It also compiles app.py on every run (a server compiles once, and parallel
+    ast.parse calls can crash CPython 3.11): compile once, under a lock.
+    """
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    last, lock, compiled = [], threading.Lock(), {}
+    get_bytecode = ScriptCache.get_bytecode
+
+    def instance(cls):
+        if cls._instance is not None:
+            last[:] = [cls._instance]
+        if not last:
+            raise RuntimeError("Runtime hasn't been created!")
+        return last[0]
+
+    def exists(cls):
+        return cls._instance is not None or bool(last)
+
+    def cached_bytecode(self, script_path):
+        with lock:
+            if script_path not in compiled:
+                compiled[script_path] = get_bytecode(self, script_path)
+            return compiled[script_path]
+
+    with mock.patch.multiple(Runtime, instance=classmethod(instance), exists=classmethod(exists)), \
+            mock.patch.object(ScriptCache, "get_bytecode", cached_bytecode):
+        yield
+
+# ==========================================
+# 2. PROCESS STATS
+# ==========================================
+def rss_mb() -> float:
+    with open("/proc/self/status", "r") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+class Sampler(threading.Thread):
+    """Peak RSS while a level runs (CPU comes from os.times deltas)."""
+
+    def __init__(self, every_s: float = 0.1):
+        super().__init__(daemon=True)
+        self.every_s = every_s
+        self.peak = rss_mb()
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.every_s):
+            self.peak = max(self.peak, rss_mb())
+
+    def stop(self) -> float:
+        self._done.set()
+        self.join()
+        return max(self.peak, rss_mb())
+
+# ==========================================
+# 3. VIRTUAL USERS
+# ==========================================
+def journey(at, rnd: random.Random, record):
+    from streamlit.testing.v1 import AppTest
+    if at is None:
+        at = AppTest.from_file(APP_PATH, default_timeout=120)
+        record("first", at.run)
+    record("vibe", lambda: at.text_input(key="ui_user_query").set_value(rnd.choice(VIBES)).run())
+    record("find", lambda: at.button(key="btn_find_hub").click().run())
+    record("generate", lambda: at.button(key="btn_generate").click().run())
+    record("refine", lambda: at.button(key=f"btn_refine_{rnd.choice(REFINES)}").click().run())
+    current = at.selectbox(key="ui_selected_hub").value
+    record("hub", lambda: at.selectbox(key="ui_selected_hub").set_value(rnd.choice([h for h in HUBS if h != current])).run())
+    return at
+
+def run_level(users: int, journeys: int, seed: int) -> Dict[str, List]:
+    samples: Dict[str, List] = {"step": [], "ms": [], "ok": []}
+    lock = threading.Lock()
+
+    def user(uid: int):
+        rnd = random.Random(seed * 1000 + uid)
+
+        def record(step, fn):
+            t0 = time.perf_counter()
+            try:
+                at = fn()
+                ok = not (at is not None and len(at.exception))
+            except Exception:
+                ok = False
+            ms = (time.perf_counter() - t0) * 1000
+            with lock:
+                samples["step"].append(step)
+                samples["ms"].append(ms)
+                samples["ok"].append(ok)
+
+        at = None
+        for _ in range(journeys):
+            try:
+                at = journey(at, rnd, record)
+            except Exception:
+                at = None  # Widget missing after a failed rerun: start a fresh session
+
+    threads = [threading.Thread(target=user, args=(i,)) for i in range(users)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    return samples
+
+def served_levels() -> Dict[str, int]:
+    # Admission levels served so far, plus deferred "load more"s (logic.plan_activities); app.py imported logic in-process
+    logic = sys.modules.get("logic")
+    if not logic:
+        return {}
+    admission = logic.planning_stats()["admission"]
+    return dict(admission["served"], deferred=admission["deferred"])
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent session load test of app.py")
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 2, 4, 8], help="concurrency levels")
+    parser.add_argument("--journeys", type=int, default=3, help="journeys per virtual user per level")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    os.chdir(BASE_DIR)  # app.py loads assets and data/ relative to the repo
+    with mock.patch("requests.get", fake_get), shared_runtime():
+        print("🔥 Warm-up journey (model load, caches)...")
+        t0 = time.perf_counter()
+        warm = run_level(1, 1, args.seed)
+        print(f"   done in {time.perf_counter() - t0:.1f}s, {sum(not ok for ok in warm['ok'])} errors\n")
+
+        print(f"{'USERS':>5} | {'RERUNS':>6} | {'p50 ms':>7} | {'p95 ms':>7} | {'p99 ms':>7} | "
+              f"{'RERUN/s':>7} | {'CPU %':>6} | {'RSS MB':>7} | {'ERRORS':>6}")
+        print("-" * 82)
+        per_step, levels = {}, {}
+        for users in args.users:
+            sampler = Sampler()
+            sampler.start()
+            served0 = served_levels()
+            cpu0, t0 = os.times(), time.perf_counter()
+            s = run_level(users, args.journeys, args.seed)
+            wall, cpu1 = time.perf_counter() - t0, os.times()
+            peak = sampler.stop()
+            levels[users] = {k: v - served0.get(k, 0) for k, v in served_levels().items()}
+            cpu = (cpu1.user - cpu0.user + cpu1.system - cpu0.system) / wall * 100  # 100% = one core
+            ms, ok = np.array(s["ms"]), np.array(s["ok"])
+            print(f"{users:>5} | {len(ms):>6} | {np.percentile(ms, 50):>7.0f} | {np.percentile(ms, 95):>7.0f} | "
+                  f"{np.percentile(ms, 99):>7.0f} | {len(ms) / wall:>7.1f} | {cpu:>6.0f} | {peak:>7.0f} | "
+                  f"{1 - ok.mean():>6.1%}")
+            steps = np.array(s["step"])
+            per_step[users] = {step: np.percentile(ms[steps == step], 95) for step in ["first"] + STEPS
+                               if (steps == step).any()}
+
+    print("\np95 rerun latency per step (ms)")
+    names = ["first"] + STEPS
+    print(f"{'USERS':>5} | " + " | ".join(f"{n:>8}" for n in names))
+    print("-" * (8 + 11 * len(names)))
+    for users, row in per_step.items():
+        print(f"{users:>5} | " + " | ".join(f"{row[n]:>8.0f}" if n in row else f"{'-':>8}" for n in names))
+    names = list(next(iter(levels.values()), {}))
+    if names:
+        print("\nPlanning requests per degradation level (admission.py)")
+        print(f"{'USERS':>5} | " + " | ".join(f"{n:>9}" for n in names))
+        print("-" * (8 + 12 * len(names)))
+        for users, row in levels.items():
+            print(f"{users:>5} | " + " | ".join(f"{row[n]:>9}" for n in names))
+    print("\n'generate' includes the app's 1.5s loading animation; CPU % is process time per wall second (100 = one core).")
+
+if __name__ == "__main__":
+    main()
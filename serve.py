@@ -0,0 +1,20 @@
+import os
+from streamlit.web import bootstrap
+
+import warmup
+
+# Container entrypoint: runs Streamlit in this process so the warm-up thread
+# fills the same st.cache_resource / st.cache_data stores the sessions use.
+def main():
+    port = int(os.environ.get("PORT", "8080"))
+    ready_port = int(os.environ.get("LAYOVER_READY_PORT", "8081"))
+
+    warmup.start_readiness_server(ready_port)
+    warmup.start_background_warmup()
+
+    flag_options = {"server_port": port, "server_address": "0.0.0.0"}
+    bootstrap.load_config_options(flag_options=flag_options)
+    bootstrap.run("app.py", False, [], flag_options)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import math
+import struct
+from typing import Optional
+
+import numpy as np
+
+# ==========================================
+# 1. LOG-BUCKET QUANTILE SKETCH (DDSketch)
+# ==========================================
+# Values land in buckets whose edges grow geometrically by `gamma`, so any
+# quantile comes back within `rel_accuracy` of a true sample. Two sketches
+# with the same accuracy merge by adding bucket counts, which lets an
+# ingestion job sketch files (or chunks) independently and fold them
+# together later. Memory is capped at `max_bins`; past that the lowest
+# buckets collapse into one (we care about the slow tail, not the fast one).
+DEFAULT_REL_ACCURACY = 0.01
+DEFAULT_MAX_BINS = 2048
+MIN_VALUE = 1e-3                # Anything faster counts as zero minutes
+
+_HEADER = struct.Struct("<dqq")  # rel_accuracy, offset, zero_count
+
+class QuantileSketch:
+    def __init__(self, rel_accuracy: float = DEFAULT_REL_ACCURACY, max_bins: int = DEFAULT_MAX_BINS):
+        self.rel_accuracy = rel_accuracy
+        self.max_bins = max_bins
+        self.gamma = (1 + rel_accuracy) / (1 - rel_accuracy)
+        self._inv_log_gamma = 1.0 / math.log(self.gamma)
+        self.offset = 0                                   # Bucket key of counts[0]
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.zero_count = 0
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum()) + self.zero_count
+
+    def keys_of(self, values: np.ndarray) -> np.ndarray:
+        return np.ceil(np.log(values) * self._inv_log_gamma).astype(np.int64)
+
+    def add(self, values):
+        v = np.asarray(values, dtype=np.float64)
+        v = v[np.isfinite(v) & (v >= 0)]
+        pos = v[v >= MIN_VALUE]
+        self.zero_count += int(v.size - pos.size)
+        if pos.size:
+            keys, counts = np.unique(self.keys_of(pos), return_counts=True)
+            self.add_bucket_counts(keys, counts)
+
+    def add_bucket_counts(self, keys: np.ndarray, counts: np.ndarray):
+        """Adds pre-bucketed counts (keys from keys_of() on a sketch with the same accuracy)."""
+        if not len(keys):
+            return
+        lo, hi = int(keys.min()), int(keys.max())
+        if self.counts.size:
+            lo, hi = min(lo, self.offset), max(hi, self.offset + self.counts.size - 1)
+        grown = np.zeros(hi - lo + 1, dtype=np.int64)
+        if self.counts.size:
+            grown[self.offset - lo:self.offset - lo + self.counts.size] = self.counts
+        np.add.at(grown, np.asarray(keys, dtype=np.int64) - lo, np.asarray(counts, dtype=np.int64))
+        self.offset, self.counts = lo, grown
+        self._collapse()
+
+    def _collapse(self):
+        extra = self.counts.size - self.max_bins
+        if extra > 0:
+            self.counts[extra] += self.counts[:extra].sum()
+            self.counts = self.counts[extra:].copy()
+            self.offset += extra
+
+    def merge(self, other: "QuantileSketch"):
+        if abs(other.gamma - self.gamma) > 1e-12:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        self.zero_count += other.zero_count
+        if other.counts.size:
+            nz = np.flatnonzero(other.counts)
+            self.add_bucket_counts(nz + other.offset, other.counts[nz])
+
+    def quantile(self, q: float) -> Optional[float]:
+        n = self.count
+        if not n:
+            return None
+        rank = q * (n - 1)
+        if rank < self.zero_count:
+            return 0.0
+        idx = int(np.searchsorted(np.cumsum(self.counts), rank - self.zero_count, side="right"))
+        idx = min(idx, self.counts.size - 1)
+        # Bucket midpoint (in relative terms), which bounds the error at rel_accuracy
+        return float(2 * self.gamma ** (self.offset + idx) / (self.gamma + 1))
+
+    # ==========================================
+    # 2. SERIALIZATION
+    # ==========================================
+    def to_bytes(self) -> bytes:
+        # Trim empty edges so stored sketches stay small
+        nz = np.flatnonzero(self.counts)
+        counts = self.counts[nz[0]:nz[-1] + 1] if nz.size else self.counts[:0]
+        offset = self.offset + (int(nz[0]) if nz.size else 0)
+        return _HEADER.pack(self.rel_accuracy, offset, self.zero_count) + counts.astype("<i8").tobytes()
+
+    @classmethod
+    def from_bytes(cls, blob: bytes, max_bins: int = DEFAULT_MAX_BINS) -> "QuantileSketch":
+        rel_accuracy, offset, zero_count = _HEADER.unpack_from(blob)
+        sk = cls(rel_accuracy, max_bins)
+        sk.offset, sk.zero_count = offset, zero_count
+        sk.counts = np.frombuffer(blob, dtype="<i8", offset=_HEADER.size).astype(np.int64)
+        return sk
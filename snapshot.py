@@ -0,0 +1,209 @@
+import os
+import json
+import time
+import shutil
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from catalog import activity_text, catalog_version, fill_hub_embeddings, read_hub
+from vectors import EMBEDDING_DTYPE, Vectors
+
+# ==========================================
+# 1. LAYOUT
+# ==========================================
+# snapshots/
+#   CURRENT                  -> name of the active snapshot (swapped with os.replace)
+#   <version>/index.json     -> hub -> row range, fingerprints, column names
+#   <version>/embeddings.npy -> [N, dim], L2-normalised; float32, float16 or int8 (vectors.py)
+#   <version>/scales.npy     -> float32 [N], int8 snapshots only
+#   <version>/numeric.npy    -> float32 [N, len(NUMERIC_COLUMNS)]
+#
+# Every process maps the .npy files read-only, so the page cache holds one copy
+# per host no matter how many Streamlit / batch / API workers are running.
+SNAPSHOT_DIR = os.environ.get("LAYOVER_SNAPSHOT_DIR", "snapshots")
+POINTER_FILE = "CURRENT"
+KEEP_SNAPSHOTS = 2
+CHECK_INTERVAL_S = 1.0
+
+NUMERIC_COLUMNS = (
+    "lat", "lon", "min_duration_hours",
+    "opening_hour_24", "closing_hour_24", "is_24h", "is_landside",
+)
+
+def activity_columns(activities: List[Dict[str, Any]]) -> np.ndarray:
+    cols = np.zeros((len(activities), len(NUMERIC_COLUMNS)), dtype=np.float32)
+    for i, act in enumerate(activities):
+        loc = act.get("location", {})
+        tc = act.get("time_constraints", {})
+        cols[i] = (
+            loc.get("lat", 0.0), loc.get("lon", 0.0),
+            tc.get("min_duration_hours", 0.0),
+            tc.get("opening_hour_24", 0), tc.get("closing_hour_24", 24),
+            1.0 if tc.get("is_24h", False) else 0.0,
+            1.0 if loc.get("zone") == "LANDSIDE" else 0.0,
+        )
+    return cols
+
+def activities_fingerprint(texts: List[str]) -> str:
+    # Ties a snapshot slice to the exact activity texts it was encoded from
+    h = hashlib.sha1()
+    for t in texts:
+        h.update(t.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+# ==========================================
+# 2. BUILD (OFFLINE / ETL SIDE)
+# ==========================================
+def build_snapshot(
+    db_path: str,
+    encode_fn: Callable[[List[str]], np.ndarray],
+    model_name: str,
+    snapshot_dir: str = SNAPSHOT_DIR,
+    batch_size: int = 256,
+    dtype: str = EMBEDDING_DTYPE,
+) -> str:
+    """Packs every hub's activity vectors into a new snapshot and makes it current.
+
+    Vectors the catalog ETL already stored are reused; only activities without
+    one for `model_name` go through `encode_fn`. `dtype` is the
+    storage type of the packed matrix (see vectors.py).
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        # The storage type is part of the snapshot's identity
+        version = catalog_version(conn) if dtype == "float32" else f"{catalog_version(conn)}-{dtype}"
+        final_dir = os.path.join(snapshot_dir, version)
+        needs_build = not os.path.isdir(final_dir)
+        if needs_build:
+            hub_ids = [r[0] for r in conn.execute("SELECT id FROM hubs ORDER BY id")]
+            hubs, chunks, activities, start = {}, [], [], 0
+            for hub_id in hub_ids:
+                acts = (read_hub(conn, hub_id) or {}).get("activities", [])
+                hub_texts = [activity_text(a) for a in acts]
+                embs = None
+                if hub_texts:
+                    # Stored vectors are reused; only rows without one are encoded (and stored back)
+                    encode = lambda texts: np.vstack([encode_fn(texts[i:i + batch_size])
+                                                      for i in range(0, len(texts), batch_size)])
+                    embs = fill_hub_embeddings(conn, hub_id, hub_texts, encode, model_name, dtype)
+                if embs is not None:
+                    chunks.append(embs if isinstance(embs, Vectors) and embs.dtype == dtype
+                                  else Vectors.quantize(embs.to_float32() if isinstance(embs, Vectors) else embs, dtype))
+                hubs[hub_id] = {
+                    "start": start,
+                    "end": start + len(acts),
+                    "fingerprint": activities_fingerprint(hub_texts),
+                }
+                start += len(acts)
+                activities.extend(acts)
+    finally:
+        conn.close()
+
+    if needs_build:
+        packed = Vectors.concat(chunks) if chunks else Vectors.quantize(np.zeros((0, 0), np.float32), dtype)
+        embeddings = packed.codes
+
+        tmp_dir = os.path.join(snapshot_dir, f".tmp-{version}-{os.getpid()}")
+        os.makedirs(tmp_dir, exist_ok=True)
+        np.save(os.path.join(tmp_dir, "embeddings.npy"), embeddings)
+        if packed.scales is not None:
+            np.save(os.path.join(tmp_dir, "scales.npy"), packed.scales)
+        np.save(os.path.join(tmp_dir, "numeric.npy"), activity_columns(activities))
+        with open(os.path.join(tmp_dir, "index.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "version": version,
+                "model": model_name,
+                "built_at": time.time(),
+                "dim": int(embeddings.shape[1]) if embeddings.size else 0,
+                "dtype": packed.dtype,
+                "columns": list(NUMERIC_COLUMNS),
+                "hubs": hubs,
+            }, f)
+        try:
+            os.rename(tmp_dir, final_dir)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)  # A concurrent build won the race
+
+    publish_version(snapshot_dir, version)
+    prune_versions(snapshot_dir, keep=version)
+    return version
+
+def publish_version(snapshot_dir: str, version: str):
+    tmp = os.path.join(snapshot_dir, f".{POINTER_FILE}.{os.getpid()}")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(version)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, os.path.join(snapshot_dir, POINTER_FILE))  # Atomic swap for readers
+
+def prune_versions(snapshot_dir: str, keep: str):
+    # Readers that still map an older snapshot keep their pages after unlink
+    versions = [d for d in os.listdir(snapshot_dir)
+                if not d.startswith(".") and os.path.isdir(os.path.join(snapshot_dir, d))]
+    versions.sort(key=lambda d: os.path.getmtime(os.path.join(snapshot_dir, d)), reverse=True)
+    for d in [v for v in versions if v != keep][KEEP_SNAPSHOTS - 1:]:
+        shutil.rmtree(os.path.join(snapshot_dir, d), ignore_errors=True)
+
+# ==========================================
+# 3. READ SIDE (EVERY WORKER PROCESS)
+# ==========================================
+class Snapshot:
+    def __init__(self, path: str):
+        with open(os.path.join(path, "index.json"), "r", encoding="utf-8") as f:
+            self.index = json.load(f)
+        self.version = self.index["version"]
+        self.model = self.index.get("model")
+        # Read-only maps: zero-copy views onto the shared page cache
+        self.embeddings = np.load(os.path.join(path, "embeddings.npy"), mmap_mode="r")
+        scales = os.path.join(path, "scales.npy")
+        self.scales = np.load(scales, mmap_mode="r") if os.path.exists(scales) else None
+        self.vectors = Vectors(self.embeddings, self.scales)
+        self.numeric = np.load(os.path.join(path, "numeric.npy"), mmap_mode="r")
+
+    def _range(self, hub_id: str, fingerprint: Optional[str]):
+        hub = self.index["hubs"].get(hub_id)
+        if hub is None or (fingerprint is not None and hub["fingerprint"] != fingerprint):
+            return None
+        return hub["start"], hub["end"]
+
+    def hub_embeddings(self, hub_id: str, fingerprint: Optional[str] = None) -> Optional[Vectors]:
+        rng = self._range(hub_id, fingerprint)
+        return None if rng is None else self.vectors.take(slice(rng[0], rng[1]))
+
+    def hub_numeric(self, hub_id: str, fingerprint: Optional[str] = None) -> Optional[np.ndarray]:
+        rng = self._range(hub_id, fingerprint)
+        return None if rng is None else self.numeric[rng[0]:rng[1]]
+
+_lock = threading.Lock()
+_mapped: Dict[str, list] = {}  # abspath(dir) -> [Snapshot or None, its name, last CURRENT check]
+
+def get_snapshot(snapshot_dir: str = SNAPSHOT_DIR) -> Optional[Snapshot]:
+    """Returns the current snapshot, remapping when CURRENT points somewhere new.
+
+    Each directory keeps its own mapping and check interval.
+    """
+    key = os.path.abspath(snapshot_dir)
+    state = _mapped.get(key)
+    now = time.monotonic()
+    if state is not None and now - state[2] < CHECK_INTERVAL_S:
+        return state[0]
+    with _lock:
+        state = _mapped.setdefault(key, [None, None, 0.0])
+        state[2] = now
+        try:
+            with open(os.path.join(snapshot_dir, POINTER_FILE), "r", encoding="utf-8") as f:
+                name = f.read().strip()
+        except OSError:
+            return state[0]
+        if name and name != state[1]:
+            try:
+                snap = Snapshot(os.path.join(snapshot_dir, name))
+            except (OSError, ValueError, KeyError):
+                return state[0]  # Half-pruned or corrupt: keep serving the old one
+            state[0], state[1] = snap, name
+        return state[0]
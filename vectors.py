@@ -0,0 +1,118 @@
+import os
+import struct
+from typing import Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+# ==========================================
+# 1. COMPACT EMBEDDING STORAGE
+# ==========================================
+# Activity vectors can be kept as:
+#   float32  4 bytes/dim, exact
+#   float16  2 bytes/dim, ~3 significant digits (plenty for unit vectors)
+#   int8     1 byte/dim + one float32 scale per row (row / scale rounds into -127..127)
+# Scoring reads the compact rows chunk by chunk, widens each chunk to float32
+# and accumulates in float32, so only SCORE_CHUNK rows are ever expanded.
+EMBEDDING_DTYPES = ("float32", "float16", "int8")
+EMBEDDING_DTYPE = os.environ.get("LAYOVER_EMBEDDING_DTYPE", "float32")  # What catalog writers store
+SCORE_CHUNK = 16_384
+_SCALE = struct.Struct("<f")
+
+Rows = Union[slice, np.ndarray, Sequence[int], None]
+
+class Vectors:
+    """Row-major embedding matrix in one of EMBEDDING_DTYPES (`scales` only for int8)."""
+
+    def __init__(self, codes: np.ndarray, scales: Optional[np.ndarray] = None):
+        self.codes = codes
+        self.scales = scales
+
+    @classmethod
+    def quantize(cls, embs: np.ndarray, dtype: str = "float32") -> "Vectors":
+        embs = np.asarray(embs, dtype=np.float32)
+        if dtype == "float32":
+            return cls(embs)
+        if dtype == "float16":
+            return cls(embs.astype(np.float16))
+        if dtype == "int8":
+            scales = np.abs(embs).max(axis=1) / 127.0 if len(embs) else np.zeros(0, dtype=np.float32)
+            scales = np.where(scales > 0, scales, 1.0).astype(np.float32)
+            codes = np.clip(np.rint(embs / scales[:, None]), -127, 127).astype(np.int8)
+            return cls(codes, scales)
+        raise ValueError(f"Unknown embedding dtype '{dtype}'. Use one of {EMBEDDING_DTYPES}")
+
+    @property
+    def dtype(self) -> str:
+        return "int8" if self.scales is not None else str(self.codes.dtype)
+
+    @property
+    def shape(self):
+        return self.codes.shape
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.codes.nbytes) + (int(self.scales.nbytes) if self.scales is not None else 0)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def take(self, rows: Rows) -> "Vectors":
+        if rows is None:
+            return self
+        return Vectors(self.codes[rows], None if self.scales is None else self.scales[rows])
+
+    def __getitem__(self, rows) -> np.ndarray:
+        # Decoded float32 rows (for the few places that need real vectors)
+        part = self.take(rows)
+        out = np.asarray(part.codes, dtype=np.float32)
+        return out * part.scales[..., None] if part.scales is not None else out
+
+    def to_float32(self) -> np.ndarray:
+        return self[slice(None)]
+
+    def dot(self, q: np.ndarray, rows: Rows = None) -> np.ndarray:
+        """Similarity of every (selected) row to the float32 query `q`."""
+        q = np.asarray(q, dtype=np.float32)
+        part = self.take(rows)
+        if part.codes.dtype == np.float32:
+            return np.asarray(part.codes @ q, dtype=np.float32)
+        out = np.empty(len(part), dtype=np.float32)
+        for s in range(0, len(part), SCORE_CHUNK):
+            out[s:s + SCORE_CHUNK] = part.codes[s:s + SCORE_CHUNK].astype(np.float32) @ q
+        if part.scales is not None:
+            out *= part.scales
+        return out
+
+    def setflags(self, write: bool):
+        self.codes.setflags(write=write)
+        if self.scales is not None:
+            self.scales.setflags(write=write)
+
+    @staticmethod
+    def concat(parts: List["Vectors"]) -> "Vectors":
+        dtypes = {p.dtype for p in parts}
+        if len(dtypes) != 1:
+            return Vectors(np.concatenate([p.to_float32() for p in parts]))  # Mixed: widen
+        scales = None if parts[0].scales is None else np.concatenate([p.scales for p in parts])
+        return Vectors(np.concatenate([p.codes for p in parts]), scales)
+
+def as_vectors(embs) -> "Vectors":
+    return embs if isinstance(embs, Vectors) else Vectors(np.asarray(embs, dtype=np.float32))
+
+# ==========================================
+# 2. DB BLOBS (ONE ROW PER ACTIVITY)
+# ==========================================
+def pack_rows(vecs: Vectors) -> List[bytes]:
+    # int8 rows carry their scale up front so each blob stands alone
+    if vecs.scales is None:
+        return [row.tobytes() for row in np.ascontiguousarray(vecs.codes)]
+    return [_SCALE.pack(float(s)) + row.tobytes() for s, row in zip(vecs.scales, np.ascontiguousarray(vecs.codes))]
+
+def unpack_rows(blobs: Iterable[bytes], dtype: str) -> Vectors:
+    blobs = list(blobs)
+    if dtype == "int8":
+        scales = np.array([_SCALE.unpack_from(b)[0] for b in blobs], dtype=np.float32)
+        codes = np.frombuffer(b"".join(b[_SCALE.size:] for b in blobs), dtype=np.int8)
+        return Vectors(codes.reshape(len(blobs), -1), scales)
+    codes = np.frombuffer(b"".join(blobs), dtype=np.dtype(dtype))
+    return Vectors(codes.reshape(len(blobs), -1))
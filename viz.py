@@ -1,167 +1,174 @@
-import plotly.express as px
+import functools
+import math
+from datetime import date, datetime, timedelta
+
+import folium
 import plotly.graph_objects as go
-import pandas as pd
-from datetime import datetime, timedelta
 
-def create_timeline(activities, arrival_hour, total_layover_hours):
+from schedule import ACTIVITY, BUFFER, LOGISTICS, Schedule, build_schedule
+
+KIND_COLORS = {
+    LOGISTICS: "#7f8c8d",
+    ACTIVITY: "#00d4ff",  # Cyan/Neon
+    BUFFER: "#2ecc71",
+}
+FIGURE_CACHE_ENTRIES = 256  # Built figures are shared: treat them as read-only
+
+def create_timeline(activities, arrival_hour, total_layover_hours, itinerary=None):
     """
     V3 SMART SCHEDULER:
-    - Driven by 'logic.py' calculation engine (Single Source of Truth).
+    - Schedule blocks come from schedule.build_schedule (pure data, no plotting).
+    - Figures are memoized on the schedule itself, so an unchanged plan costs a lookup.
     - Visualizes hard deadlines (Latest Return Time).
     - Explicitly shows Logistics vs. Fun vs. Buffer.
     """
-    if not activities:
+    schedule = build_schedule(activities, arrival_hour, total_layover_hours, itinerary)
+    if schedule is None:
         return None
+    return timeline_figure(schedule)
 
-    # 1. SETUP CLOCK & CANVAS
-    base_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-    arrival_time = base_date + timedelta(hours=arrival_hour)
-    departure_time = arrival_time + timedelta(hours=total_layover_hours)
-    
-    # 2. EXTRACT INTELLIGENCE FROM ENGINE (The "Brain" Link)
-    # We look at the first recommended activity to get the route's logistics metadata
-    top_pick = activities[0]
-    meta = top_pick.get("explain", {}).get("v3_meta", {})
-    
-    # Fallback defaults if engine data is missing (Safety Net)
-    imm_mins = meta.get("immigration_mins", 60)
-    transit_mins_one_way = meta.get("transit_mins", 60) // 2
-    sec_mins = meta.get("security_mins", 60)
-    
-    # Check if we are even going Landside
-    top_zone = top_pick["activity"]["location"]["zone"]
-    is_landside = (top_zone == "LANDSIDE")
-
-    # 3. BUILD THE SCHEDULE BLOCKS
-    schedule = []
-    cursor = arrival_time
-
-    # --- BLOCK A: ARRIVAL & IMMIGRATION ---
-    if is_landside:
-        schedule.append(dict(
-            Task="🛂 Immigration & Customs",
-            Start=cursor,
-            Finish=cursor + timedelta(minutes=imm_mins),
-            Type="Logistics",
-            Color="#7f8c8d" # Grey
-        ))
-        cursor += timedelta(minutes=imm_mins)
-        
-        # --- BLOCK B: TRANSIT TO CITY ---
-        schedule.append(dict(
-            Task="🚆 Transit to City",
-            Start=cursor,
-            Finish=cursor + timedelta(minutes=transit_mins_one_way),
-            Type="Logistics",
-            Color="#3498db" # Blue
-        ))
-        cursor += timedelta(minutes=transit_mins_one_way)
-
-    # --- BLOCK C: ACTIVITIES (The Fun Stuff) ---
-    # Calculate the "Hard Return Time" (When you MUST start heading back)
-    # Formula: Departure - (Security + Transit Back + 15m Boarding Buffer)
-    transit_back_mins = transit_mins_one_way if is_landside else 0
-    safe_return_time = departure_time - timedelta(minutes=sec_mins + transit_back_mins + 15)
-    
-    for item in activities[:3]: # Only map top 3 to keep it readable
-        act = item["activity"]
-        duration_mins = act["time_constraints"]["min_duration_hours"] * 60
-        
-        # Will this activity fit before we have to leave?
-        if cursor + timedelta(minutes=duration_mins) <= safe_return_time:
-            schedule.append(dict(
-                Task=f"📍 {act['title']}",
-                Start=cursor,
-                Finish=cursor + timedelta(minutes=duration_mins),
-                Type="Activity",
-                Color="#00d4ff" # Cyan/Neon
-            ))
-            cursor += timedelta(minutes=duration_mins)
-        else:
-            # If it doesn't fit, we stop scheduling activities
-            break
-
-    # --- BLOCK D: BUFFER / FREE TIME ---
-    # Any time left between now and the "Must Leave" time is pure safety buffer
-    if cursor < safe_return_time:
-        schedule.append(dict(
-            Task="☕ Safe Buffer / Free Time",
-            Start=cursor,
-            Finish=safe_return_time,
-            Type="Buffer",
-            Color="#2ecc71" # Green
-        ))
-        cursor = safe_return_time
-
-    # --- BLOCK E: RETURN TRANSIT ---
-    if is_landside:
-        schedule.append(dict(
-            Task="🚆 Return Transit",
-            Start=cursor,
-            Finish=cursor + timedelta(minutes=transit_mins_one_way),
-            Type="Logistics",
-            Color="#3498db"
+def timeline_figure(schedule: Schedule):
+    # Clock times are today's: the date is part of the key
+    return _timeline_figure(schedule, date.today())
+
+@functools.lru_cache(maxsize=FIGURE_CACHE_ENTRIES)
+def _timeline_figure(schedule: Schedule, day: date):
+    arrival_time = datetime.combine(day, datetime.min.time()) + timedelta(hours=schedule.arrival_hour)
+    def at(mins): return arrival_time + timedelta(minutes=mins)
+
+    # One horizontal bar trace per kind (what px.timeline builds, minus the DataFrame).
+    # Traces and layout go in as plain dicts: one validation pass instead of one per update call.
+    traces = []
+    for kind, color in KIND_COLORS.items():
+        blocks = [b for b in schedule.blocks if b.kind == kind]
+        if not blocks:
+            continue
+        traces.append(dict(
+            type="bar",
+            name=kind,
+            orientation="h",
+            y=[b.task for b in blocks],
+            base=[at(b.start_mins).isoformat() for b in blocks],
+            x=[(b.end_mins - b.start_mins) * 60_000 for b in blocks],  # Duration in ms on a date axis
+            customdata=[(at(b.start_mins).strftime("%H:%M"), at(b.end_mins).strftime("%H:%M")) for b in blocks],
+            hovertemplate="%{y}<br>%{customdata[0]} - %{customdata[1]}<extra></extra>",
+            marker=dict(color=color),
         ))
-        cursor += timedelta(minutes=transit_mins_one_way)
-
-    # --- BLOCK F: SECURITY & BOARDING ---
-    schedule.append(dict(
-        Task="🛡️ Security & Gate",
-        Start=cursor,
-        Finish=departure_time,
-        Type="Logistics",
-        Color="#e74c3c" # Red/Warning color for "Don't Miss This"
+    rows = list(dict.fromkeys(b.task for b in schedule.blocks))  # Chronological, top to bottom
+
+    # "MUST RETURN" vertical line (Plotly needs a ms timestamp on date axes)
+    must_return = at(schedule.return_by_mins).timestamp() * 1000
+    grid = "rgba(255, 255, 255, 0.1)"
+    return go.Figure(data=traces, layout=dict(
+        height=350,
+        barmode="overlay",
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(255, 255, 255, 0.05)",
+        font=dict(color="#E0E0E0", size=13, family="Outfit"),
+        margin=dict(l=20, r=20, t=40, b=20),
+        showlegend=False,
+        hovermode="x",
+        shapes=[dict(type="line", xref="x", yref="y domain", x0=must_return, x1=must_return, y0=0, y1=1,
+                     line=dict(color="#ff4b4b", dash="dash", width=2))],
+        annotations=[dict(text="🚨 MUST RETURN", xref="x", yref="y domain", x=must_return, y=1,
+                          xanchor="left", yanchor="top", showarrow=False, font=dict(color="#ff4b4b"))],
+        xaxis=dict(type="date", tickformat="%H:%M", gridcolor=grid, title=None),
+        yaxis=dict(categoryorder="array", categoryarray=rows, autorange="reversed", gridcolor=grid, title=None),
     ))
 
-    # 4. RENDER WITH PLOTLY
-    df = pd.DataFrame(schedule)
-    
-    fig = px.timeline(
-        df, 
-        x_start="Start", 
-        x_end="Finish", 
-        y="Task", 
-        color="Type",
-        color_discrete_map={
-            "Logistics": "#7f8c8d",
-            "Activity": "#00d4ff",
-            "Buffer": "#2ecc71"
-        },
-        height=350
-    )
+def create_sweep_heatmap(cells, current_hours=None, current_arrival=None):
+    """
+    WHAT-IF HEATMAP:
+    - Plan quality (logic.sweep_activities) for layover length x arrival hour.
+    - Hover shows the top pick and the risk level of each alternative.
+    - The traveller's current inputs are ringed.
+    """
+    if not cells:
+        return None
 
-    # 5. VISUAL INTELLIGENCE (The "Smart" Cues)
-    
-    # Add "MUST RETURN" Vertical Line
-    fig.add_vline(
-        x=safe_return_time.timestamp() * 1000, # Plotly needs ms timestamp for lines
-        line_width=2, 
-        line_dash="dash", 
-        line_color="#ff4b4b",
-        annotation_text="🚨 MUST RETURN", 
-        annotation_position="top right",
-        annotation_font_color="#ff4b4b"
-    )
+    hours = sorted({c["hours"] for c in cells})
+    arrivals = sorted({c["arrival_hour"] for c in cells})
+    by_key = {(c["hours"], c["arrival_hour"]): c for c in cells}
+
+    z, text = [], []
+    for h in hours:
+        z_row, text_row = [], []
+        for a in arrivals:
+            c = by_key.get((h, a))
+            top = c["items"][0]["activity"]["title"] if c and c["items"] else "No safe match"
+            risk = (c or {}).get("risk_level") or "n/a"
+            z_row.append(c["quality"] if c else None)
+            text_row.append(f"{top}<br>Risk: {risk}")
+        z.append(z_row)
+        text.append(text_row)
+
+    fig = go.Figure(go.Heatmap(
+        z=z,
+        x=[f"{a:02d}:00" for a in arrivals],
+        y=[f"{h:g}h" for h in hours],
+        text=text,
+        hovertemplate="Land %{x} · %{y} layover<br>Quality %{z}<br>%{text}<extra></extra>",
+        colorscale=[[0.0, "#1a1a2e"], [0.5, "#0077b6"], [1.0, "#00d4ff"]],
+        colorbar=dict(title="Quality"),
+    ))
+
+    if current_hours in hours and current_arrival in arrivals:
+        fig.add_shape(
+            type="rect",
+            x0=arrivals.index(current_arrival) - 0.5, x1=arrivals.index(current_arrival) + 0.5,
+            y0=hours.index(current_hours) - 0.5, y1=hours.index(current_hours) + 0.5,
+            line=dict(color="#FFD700", width=3),
+        )
 
     fig.update_layout(
         paper_bgcolor="rgba(0,0,0,0)",
         plot_bgcolor="rgba(255, 255, 255, 0.05)",
         font=dict(color="#E0E0E0", size=13, family="Outfit"),
-        margin=dict(l=20, r=20, t=40, b=20),
-        showlegend=False,
-        hovermode="x"
-    )
-    
-    fig.update_xaxes(
-        tickformat="%H:%M", 
-        gridcolor="rgba(255, 255, 255, 0.1)",
-        title=None
-    )
-    
-    fig.update_yaxes(
-        autorange="reversed", 
-        gridcolor="rgba(255, 255, 255, 0.1)",
-        title=None
+        margin=dict(l=20, r=20, t=20, b=20),
+        height=320,
     )
+    fig.update_xaxes(title="Arrival time", gridcolor="rgba(255, 255, 255, 0.1)")
+    fig.update_yaxes(title="Layover", gridcolor="rgba(255, 255, 255, 0.1)")
+    return fig
+
+MAP_ZOOM = 10
+MAP_TILES = "OpenStreetMap"
 
-    return fig
\ No newline at end of file
+def create_map(center_lat, center_lon, zoom=MAP_ZOOM):
+    """Base map (tiles only). Keep it identical across reruns: the browser then keeps its tiles."""
+    return folium.Map(location=[center_lat, center_lon], zoom_start=zoom, tiles=MAP_TILES, control_scale=True)
+
+def create_map_layer(pins, clusters):
+    """
+    MAP LAYER:
+    - One pin per ranked activity (title + match score).
+    - The rest of the hub arrives as cluster bubbles with counts, aggregated
+      server-side for the current zoom (logic.map_clusters), so the payload is
+      bounded by the pin and cluster caps, not by the catalog size.
+    """
+    layer = folium.FeatureGroup(name="activities")
+    if clusters is not None:
+        for lat, lon, n in zip(*clusters[:3]):
+            size = int(min(28 + 6 * math.log10(n), 52))
+            folium.Marker(
+                location=[float(lat), float(lon)],
+                tooltip=f"{n} more activities",
+                icon=folium.DivIcon(
+                    html=(f'<div style="width:{size}px;height:{size}px;line-height:{size}px;border-radius:50%;'
+                          f'background:rgba(46,204,113,0.35);border:2px solid #2ecc71;color:#E0E0E0;'
+                          f'text-align:center;font:600 12px Outfit,sans-serif;">{n}</div>'),
+                    icon_size=(size, size),
+                    icon_anchor=(size // 2, size // 2),
+                ),
+            ).add_to(layer)
+    for item in pins:
+        act = item["activity"]
+        folium.CircleMarker(
+            location=[act["location"]["lat"], act["location"]["lon"]],
+            radius=8,
+            color="#00d4ff",  # Cyan/Neon, as in the timeline
+            fill=True,
+            fill_opacity=0.9,
+            tooltip=f"{act['title']} — {item['score']}% Match",
+        ).add_to(layer)
+    return layer
@@ -0,0 +1,141 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+# ==========================================
+# 1. WARM-UP STATE (READINESS SIGNAL)
+# ==========================================
+READY_FILE = os.environ.get("LAYOVER_READY_FILE", "/tmp/layover.ready")
+
+_ready = threading.Event()
+_state_lock = threading.Lock()
+_state: Dict[str, Any] = {"status": "cold", "steps": {}, "hubs": 0, "error": None}
+_started = False
+
+def is_ready() -> bool:
+    return _ready.is_set()
+
+def get_state() -> Dict[str, Any]:
+    with _state_lock:
+        return {**_state, "steps": dict(_state["steps"])}
+
+def _set_state(**changes):
+    with _state_lock:
+        _state.update(changes)
+
+def _timed_step(name, fn):
+    t0 = time.perf_counter()
+    result = fn()
+    with _state_lock:
+        _state["steps"][name] = round((time.perf_counter() - t0) * 1000, 1)
+    return result
+
+# ==========================================
+# 2. WARM-UP ROUTINE
+# ==========================================
+def _migrate_catalog():
+    # Writers migrate before they write; a DB nobody has written since an upgrade
+    # still needs the newer columns and tables (source, live_stats, FTS) to serve them
+    from catalog import DB_PATH, ensure_schema
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        ensure_schema(conn)
+    finally:
+        conn.close()
+
+def warm_up() -> Dict[str, Any]:
+    """Migrates the catalog, then loads the encoder, every hub and every embedding into the process caches."""
+    # Imported lazily so the readiness endpoint can answer while torch imports
+    from logic import (
+        encode_query,
+        get_activity_embeddings,
+        get_anchor_embeddings,
+        get_hub_geo,
+        get_map_clusters,
+        get_model,
+        list_hub_ids,
+        load_hub_data,
+        load_hubs_meta,
+    )
+
+    _set_state(status="warming", started_at=time.time())
+    try:
+        _timed_step("catalog_schema", _migrate_catalog)
+        _timed_step("model_load", get_model)
+        # First forward pass pays for kernel selection & allocator growth
+        _timed_step("dummy_inference", lambda: encode_query("warm-up: local food and a quick nap"))
+        _timed_step("anchor_embeddings", get_anchor_embeddings)
+        _timed_step("hubs_meta", load_hubs_meta)
+
+        hub_ids = _timed_step("hub_index", list_hub_ids)
+        def load_all_hubs():
+            for hub_id in hub_ids:
+                load_hub_data(hub_id)
+                get_activity_embeddings(hub_id)
+                get_hub_geo(hub_id)
+                get_map_clusters(hub_id)
+        _timed_step("hub_data_and_embeddings", load_all_hubs)
+    except Exception as e:
+        _set_state(status="failed", error=repr(e), finished_at=time.time())
+        raise
+
+    _set_state(status="ready", hubs=len(hub_ids), finished_at=time.time())
+    _ready.set()
+    try:
+        with open(READY_FILE, "w", encoding="utf-8") as f:
+            json.dump(get_state(), f)
+    except OSError:
+        pass
+    return get_state()
+
+def start_background_warmup() -> Optional[threading.Thread]:
+    global _started
+    with _state_lock:
+        already = _started
+        _started = True
+    if already:
+        return None
+    # A stale marker from a previous container run must not report ready
+    try:
+        os.remove(READY_FILE)
+    except OSError:
+        pass
+    thread = threading.Thread(target=warm_up, name="layover-warmup", daemon=True)
+    thread.start()
+    return thread
+
+# ==========================================
+# 3. READINESS ENDPOINT
+# ==========================================
+class _ReadinessHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.startswith("/live"):
+            code, body = 200, {"status": "alive"}
+        elif self.path.startswith("/ready"):
+            body = get_state()
+            code = 200 if is_ready() else 503
+        elif self.path.startswith("/stats"):
+            # Admission levels, plan cache and encoder queue; empty until logic is imported
+            logic = sys.modules.get("logic")
+            code, body = 200, logic.planning_stats() if logic else {}
+        else:
+            code, body = 404, {"error": "not found"}
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass  # Probes hit this every few seconds; keep the logs clean
+
+def start_readiness_server(port: int) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("0.0.0.0", port), _ReadinessHandler)
+    threading.Thread(target=server.serve_forever, name="layover-readiness", daemon=True).start()
+    return server